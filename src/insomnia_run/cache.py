@@ -0,0 +1,130 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from .models import InsoCollectionOptions, InsoRunReport, InsoTestOptions
+
+
+class ResultCache:
+    """
+    On-disk cache of run reports keyed by everything that can change them.
+
+    The key covers the contents of the working directory (and of the
+    iteration data and globals files when they are local paths), the
+    serialized run options and the inso version. Entries expire `ttl`
+    seconds after they were written, and the least recently used entries
+    are evicted once the cache grows beyond `max_bytes`.
+
+    An entry's modification time records when it was written and its
+    access time when it was last read, so reading an entry never extends
+    its lifetime.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 24 * 60 * 60,
+        max_bytes: int = 100 * 1024 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    def _hash_path(self, digest, path: Path) -> None:
+        if path.is_file():
+            files = [path]
+            root = path.parent
+        elif path.is_dir():
+            cache_dir = self.directory.resolve()
+            files = sorted(
+                p
+                for p in path.rglob("*")
+                if p.is_file()
+                and ".git" not in p.parts
+                and not p.resolve().is_relative_to(cache_dir)
+            )
+            root = path
+        else:
+            return
+
+        for file in files:
+            digest.update(file.relative_to(root).as_posix().encode("utf-8"))
+            digest.update(b"\0")
+            with open(file, "rb") as handle:
+                for chunk in iter(lambda: handle.read(self.CHUNK_SIZE), b""):
+                    digest.update(chunk)
+            digest.update(b"\0")
+
+    def key(
+        self, options: InsoCollectionOptions | InsoTestOptions, inso_version: str
+    ) -> str:
+        digest = hashlib.sha256()
+        digest.update(type(options).__name__.encode("utf-8"))
+        digest.update(options.model_dump_json().encode("utf-8"))
+        digest.update(inso_version.encode("utf-8"))
+
+        self._hash_path(digest, Path(options.working_dir))
+        for extra in (
+            getattr(options, "iteration_data", None),
+            getattr(options, "globals", None),
+        ):
+            if extra:
+                self._hash_path(digest, Path(extra))
+
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[InsoRunReport]:
+        entry = self._entry(key)
+        try:
+            written = entry.stat().st_mtime
+            if time.time() - written > self.ttl:
+                entry.unlink()
+                return None
+            report = InsoRunReport.model_validate_json(entry.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+        # Only the access time is refreshed, for least recently used eviction.
+        os.utime(entry, (time.time(), written))
+        report.from_cache = True
+        return report
+
+    def put(self, key: str, report: InsoRunReport) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entry = self._entry(key)
+        partial = entry.with_suffix(".tmp")
+        partial.write_text(report.model_dump_json(), encoding="utf-8")
+        os.replace(partial, entry)
+        self.prune()
+
+    def prune(self) -> None:
+        """
+        Removes expired entries, then the least recently used until under
+        `max_bytes`.
+        """
+        now = time.time()
+        entries = []
+        for entry in self.directory.glob("*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                entry.unlink(missing_ok=True)
+            else:
+                used = max(stat.st_atime, stat.st_mtime)
+                entries.append((used, stat.st_size, entry))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
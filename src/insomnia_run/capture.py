@@ -0,0 +1,126 @@
+import os
+import tempfile
+import threading
+from collections import deque
+from typing import IO, Optional
+
+from .models import RawOutputFile
+
+
+class OutputCapture:
+    """
+    Bounded in-memory capture of process output with spill-to-disk.
+
+    Only the first and last part of the stream are kept in memory (a quarter
+    of `limit` for the head, the rest for the tail). Once the stream outgrows
+    `limit`, everything is also written to a spill file so that the full
+    output remains available as an artifact.
+    """
+
+    def __init__(self, limit: int = 64 * 1024, spill_dir: Optional[str] = None):
+        self.head_limit = limit // 4
+        self.tail_limit = limit - self.head_limit
+        self.spill_dir = spill_dir
+        self.total_chars = 0
+        self.total_bytes = 0
+        self._head: list[str] = []
+        self._head_chars = 0
+        self._head_bytes = 0
+        self._tail: deque[str] = deque()
+        self._tail_chars = 0
+        self._spill: Optional[IO[str]] = None
+        self._spill_path: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> None:
+        if not text:
+            return
+        with self._lock:
+            self.total_chars += len(text)
+            self.total_bytes += len(text.encode("utf-8"))
+
+            if self._head_chars < self.head_limit:
+                room = self.head_limit - self._head_chars
+                head, text = text[:room], text[room:]
+                self._head.append(head)
+                self._head_chars += len(head)
+                self._head_bytes += len(head.encode("utf-8"))
+                if self._spill is not None:
+                    self._spill.write(head)
+                if not text:
+                    return
+
+            self._tail.append(text)
+            self._tail_chars += len(text)
+            if self._spill is None and self._tail_chars > self.tail_limit:
+                self._open_spill()
+            elif self._spill is not None:
+                self._spill.write(text)
+
+            while self._tail_chars - len(self._tail[0]) >= self.tail_limit:
+                self._tail_chars -= len(self._tail.popleft())
+
+    def _open_spill(self) -> None:
+        fd, self._spill_path = tempfile.mkstemp(
+            prefix="insomnia-run-", suffix=".log", dir=self.spill_dir
+        )
+        self._spill = os.fdopen(fd, "w", encoding="utf-8")
+        # Nothing has been dropped yet, so head and tail hold the full stream.
+        self._spill.writelines(self._head)
+        self._spill.writelines(self._tail)
+
+    def _tail_text(self) -> str:
+        tail = "".join(self._tail)
+        if len(tail) > self.tail_limit:
+            tail = tail[-self.tail_limit :]
+        return tail
+
+    def close(self) -> Optional[RawOutputFile]:
+        """Closes the spill file, returning a reference to it if one was written."""
+        with self._lock:
+            if self._spill is None or self._spill_path is None:
+                return None
+            self._spill.close()
+            tail_bytes = len(self._tail_text().encode("utf-8"))
+            return RawOutputFile(
+                path=self._spill_path,
+                size=self.total_bytes,
+                head_end=self._head_bytes,
+                tail_start=self.total_bytes - tail_bytes,
+            )
+
+    def copy_to(self, other: "OutputCapture") -> None:
+        """Appends everything captured here to another capture."""
+        if self._spill_path is None:
+            other.write(self.getvalue())
+            return
+        if self._spill is not None:
+            self._spill.flush()
+        with open(self._spill_path, encoding="utf-8") as spill:
+            for chunk in iter(lambda: spill.read(64 * 1024), ""):
+                other.write(chunk)
+
+    def discard(self) -> None:
+        """Closes and deletes the spill file, if any."""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+            if self._spill_path is not None:
+                os.unlink(self._spill_path)
+
+    def getvalue(self) -> str:
+        """
+        Returns the captured text, or the head and tail around an omission
+        marker when the stream was larger than the in-memory limit.
+        """
+        with self._lock:
+            head = "".join(self._head)
+            if self._spill_path is None:
+                return head + "".join(self._tail)
+
+            tail = self._tail_text()
+            omitted = self.total_chars - len(head) - len(tail)
+            return (
+                f"{head}\n... [{omitted} characters omitted, full output in "
+                f"{self._spill_path}] ...\n{tail}"
+            )
@@ -0,0 +1,173 @@
+import os
+import re
+from pathlib import Path
+from typing import Callable, ClassVar, Dict, Iterable, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from .models import InsoResult
+
+
+class CollectionIndex(BaseModel):
+    """
+    Lightweight index of the requests defined in an Insomnia workspace.
+
+    The export is scanned textually rather than fully parsed, which keeps the
+    runner free of a YAML dependency and is enough to recover request IDs for
+    the `--item` option and to tell which request declared a given test.
+
+    Requests are grouped under the workspace declared before them in the
+    same file, which covers exports with one workspace per file.
+    """
+
+    request_ids: List[str] = Field(default_factory=list)
+    tests: Dict[str, List[str]] = Field(default_factory=dict)
+    # Request IDs per workspace ID, and workspace IDs by workspace name.
+    workspaces: Dict[str, List[str]] = Field(default_factory=dict)
+    workspace_names: Dict[str, str] = Field(default_factory=dict)
+
+    EXPORT_SUFFIXES: ClassVar[tuple[str, ...]] = (".yaml", ".yml", ".json")
+    # Directories that never hold an export and can be very large.
+    SKIPPED_DIRS: ClassVar[frozenset[str]] = frozenset({"node_modules"})
+    # Matches `id: req_x` (v5 YAML), `_id: req_x` (git sync) and
+    # `"_id": "req_x"` (v4 JSON export), plus the same for folders and
+    # workspaces, the top-level `name:` of a v5 YAML export, or an
+    # `insomnia.test('name', ...)` call in a script (quotes may be escaped
+    # inside JSON strings).
+    TOKEN: ClassVar[re.Pattern[str]] = re.compile(
+        r"""^[\s{,-]*"?_?id"?\s*:\s*["']?(?P<id>(?:req|fld|wrk)_[A-Za-z0-9_-]+)"""
+        r"""|^name:[ \t]*(?P<name>[^\n]*?)[ \t]*$"""
+        r"""|insomnia\.test\(\s*\\?(?P<quote>["'`])(?P<test>.*?)\\?(?P=quote)""",
+        re.MULTILINE,
+    )
+
+    @classmethod
+    def _export_files(cls, working_dir: Path) -> List[Path]:
+        if working_dir.is_file():
+            return [working_dir]
+        if not working_dir.is_dir():
+            return []
+        files: List[Path] = []
+        for root, dirs, names in os.walk(working_dir):
+            dirs[:] = [name for name in dirs if name not in cls.SKIPPED_DIRS]
+            files.extend(
+                Path(root, name)
+                for name in names
+                if Path(name).suffix.lower() in cls.EXPORT_SUFFIXES
+            )
+        return sorted(files)
+
+    @classmethod
+    def load(cls, working_dir: str) -> "CollectionIndex":
+        index = cls()
+        seen: set[str] = set()
+        for path in cls._export_files(Path(working_dir)):
+            try:
+                text = path.read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                # Files that cannot be read are left out of the index.
+                continue
+            owner: Optional[str] = None
+            workspace: Optional[str] = None
+            name: Optional[str] = None
+            for match in cls.TOKEN.finditer(text):
+                item_id = match.group("id")
+                if match.group("name") is not None:
+                    name = match.group("name").strip("'\"")
+                    if workspace is not None:
+                        index.workspace_names.setdefault(name, workspace)
+                    continue
+                if item_id is None:
+                    # Tests belong to the request or folder declared before them.
+                    if owner is not None:
+                        owners = index.tests.setdefault(match.group("test"), [])
+                        if owner not in owners:
+                            owners.append(owner)
+                    continue
+
+                if item_id.startswith("wrk_"):
+                    workspace = item_id
+                    index.workspaces.setdefault(workspace, [])
+                    if name:
+                        index.workspace_names.setdefault(name, workspace)
+                    continue
+
+                owner = item_id
+                if item_id.startswith("req_") and item_id not in seen:
+                    seen.add(item_id)
+                    index.request_ids.append(item_id)
+                    if workspace is not None:
+                        index.workspaces[workspace].append(item_id)
+        return index
+
+    def workspace_request_ids(self, identifier: Optional[str] = None) -> List[str]:
+        """
+        Returns the request IDs of the workspace that `identifier`, a
+        workspace ID or name, selects.
+
+        With at most one workspace, that is every request. With several,
+        ValueError is raised when `identifier` matches none of them, since
+        the index cannot tell which requests belong to the collection.
+        """
+        if len(self.workspaces) <= 1:
+            return self.request_ids
+        workspace = self.workspace_names.get(identifier or "", identifier)
+        if workspace in self.workspaces:
+            return self.workspaces[workspace]
+        raise ValueError(
+            f"The working directory holds {len(self.workspaces)} workspaces; "
+            "select one with --identifier or the requests to run with --item."
+        )
+
+    def request_resolver(
+        self, order: Optional[Sequence[str]] = None, cycle: bool = False
+    ) -> Callable[[InsoResult], Optional[str]]:
+        """
+        Returns a function naming the request that declared each result.
+
+        Results must be passed in the order they were reported. A test name
+        declared by several requests is resolved by occurrence: the n-th
+        result with that name goes to the n-th declaring request in
+        execution `order` (defaulting to export order). When `order` is
+        given, requests outside it are only considered if no declaring
+        request ran. Surplus occurrences stay with the last request, or
+        with `cycle` start over from the first, as in iteration runs.
+        """
+        position = {item: i for i, item in enumerate(order or self.request_ids)}
+        ranked: Dict[str, List[str]] = {}
+        occurrences: Dict[str, int] = {}
+
+        def resolve(result: InsoResult) -> Optional[str]:
+            owners = self.tests.get(result.description)
+            if not owners:
+                return None
+            if len(owners) == 1:
+                return owners[0]
+
+            candidates = ranked.get(result.description)
+            if candidates is None:
+                if order:
+                    owners = [owner for owner in owners if owner in position] or owners
+                candidates = ranked[result.description] = sorted(
+                    owners, key=lambda owner: position.get(owner, len(position))
+                )
+            seen = occurrences.get(result.description, 0)
+            occurrences[result.description] = seen + 1
+            if cycle:
+                return candidates[seen % len(candidates)]
+            return candidates[min(seen, len(candidates) - 1)]
+
+        return resolve
+
+    def assign_requests(
+        self, results: Iterable[InsoResult], order: Optional[Sequence[str]] = None
+    ) -> None:
+        """
+        Sets `request_id` on results that do not have one yet.
+
+        See `request_resolver` for how shared test names are resolved.
+        """
+        resolve = self.request_resolver(order)
+        for result in results:
+            if result.request_id is None:
+                result.request_id = resolve(result)
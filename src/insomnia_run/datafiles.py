@@ -0,0 +1,118 @@
+import csv
+import json
+import math
+from pathlib import Path
+from typing import IO, Any, Iterator, List
+
+from pydantic import BaseModel
+
+
+class DataChunk(BaseModel):
+    """A slice of an iteration data file, written to a file of its own."""
+
+    path: str
+    # Number of rows of the original file that come before this chunk.
+    offset: int
+    rows: int
+
+
+def _iter_csv_rows(handle: IO[str]) -> Iterator[List[str]]:
+    reader = csv.reader(handle)
+    next(reader, None)  # header
+    yield from reader
+
+
+def _iter_json_rows(handle: IO[str], chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Yields the items of a top-level JSON array without reading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    at_end = False
+    started = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position >= len(buffer) and not at_end:
+            more = handle.read(chunk_size)
+            at_end = not more
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        if position >= len(buffer):
+            raise ValueError("Unterminated JSON array in iteration data")
+
+        if not started:
+            if buffer[position] != "[":
+                raise ValueError("Iteration data must be a JSON array")
+            started = True
+            position += 1
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            end = None
+        # An item ending exactly at the buffer end may have been cut short.
+        if end is None or (end == len(buffer) and not at_end):
+            if at_end:
+                raise ValueError("Invalid JSON in iteration data")
+            more = handle.read(chunk_size)
+            at_end = not more
+            buffer = buffer[position:] + more
+            position = 0
+            continue
+        yield item
+        position = end
+
+
+def split_iteration_data(path: str, parts: int, directory: str) -> List[DataChunk]:
+    """
+    Splits a CSV or JSON iteration data file into at most `parts` chunks.
+
+    The file is streamed twice, once to count its rows and once to write
+    them out, so it is never held in memory. CSV chunks repeat the header
+    row. Returns an empty list for anything that cannot be split, such as a
+    URL or an unknown format, and a single chunk is never produced.
+    """
+    source = Path(path)
+    suffix = source.suffix.lower()
+    if suffix not in (".csv", ".json") or not source.is_file():
+        return []
+
+    rows = _iter_csv_rows if suffix == ".csv" else _iter_json_rows
+    with open(source, encoding="utf-8", newline="") as handle:
+        total = sum(1 for _ in rows(handle))
+    size = math.ceil(total / parts) if parts > 0 else total
+    if total == 0 or size >= total:
+        return []
+
+    chunks: List[DataChunk] = []
+    with open(source, encoding="utf-8", newline="") as handle:
+        if suffix == ".csv":
+            items: Iterator[Any] = csv.reader(handle)
+            header = next(items)
+        else:
+            items = _iter_json_rows(handle)
+            header = None
+
+        for offset in range(0, total, size):
+            chunk = Path(directory) / f"{source.stem}.{len(chunks) + 1}{suffix}"
+            count = min(size, total - offset)
+            with open(chunk, "w", encoding="utf-8", newline="") as out:
+                if header is not None:
+                    writer = csv.writer(out)
+                    writer.writerow(header)
+                    for _ in range(count):
+                        writer.writerow(next(items))
+                else:
+                    out.write("[")
+                    for index in range(count):
+                        if index:
+                            out.write(",")
+                        out.write(json.dumps(next(items)))
+                    out.write("]")
+            chunks.append(DataChunk(path=str(chunk), offset=offset, rows=count))
+    return chunks
@@ -0,0 +1,88 @@
+from typing import Dict, Optional
+
+from .models import InsoResult, InsoRunReport, InsoStatus, ReportDiff, ResultChange
+
+ResultKey = tuple[Optional[str], str, int]
+
+
+def _keyed(report: InsoRunReport):
+    """
+    Yields each result with its key: request ID, description and occurrence.
+
+    The occurrence tells apart results that share a request and description,
+    such as the same assertion repeated by iterations.
+    """
+    seen: Dict[tuple[Optional[str], str], int] = {}
+    for result in report.results:
+        name = (result.request_id, result.description)
+        occurrence = seen[name] = seen.get(name, 0) + 1
+        yield (result.request_id, result.description, occurrence), result
+
+
+def compare_reports(
+    report: InsoRunReport,
+    baseline: InsoRunReport,
+    baseline_name: str = "baseline",
+    threshold_percent: float = 20.0,
+    min_delta_ms: float = 100.0,
+) -> ReportDiff:
+    """
+    Compares a run against a baseline report of the same tests.
+
+    A result counts as slower when its duration grew by more than
+    `threshold_percent` and by at least `min_delta_ms`, which keeps very
+    fast requests from being reported for noise. Both reports are walked
+    once, so the comparison is linear in their number of results.
+    """
+    # Only what the comparison needs is kept of the baseline.
+    previous: Dict[ResultKey, tuple[InsoStatus, Optional[float]]] = {
+        key: (result.status, result.duration_ms) for key, result in _keyed(baseline)
+    }
+    diff = ReportDiff(baseline=baseline_name)
+
+    for key, result in _keyed(report):
+        known = previous.pop(key, None)
+        if known is None:
+            diff.added.append(_change(result))
+            continue
+
+        status, duration_ms = known
+        change = _change(result, status, duration_ms)
+        if result.status == InsoStatus.FAIL and status != InsoStatus.FAIL:
+            diff.newly_failing.append(change)
+        elif result.status == InsoStatus.PASS and status == InsoStatus.FAIL:
+            diff.newly_passing.append(change)
+
+        if (
+            duration_ms is not None
+            and result.duration_ms is not None
+            and result.duration_ms - duration_ms >= min_delta_ms
+            and result.duration_ms > duration_ms * (1 + threshold_percent / 100)
+        ):
+            diff.slower.append(change)
+
+    for (request_id, description, _), (status, duration_ms) in previous.items():
+        diff.removed.append(
+            ResultChange(
+                description=description,
+                request_id=request_id,
+                baseline_status=status,
+                baseline_duration_ms=duration_ms,
+            )
+        )
+    return diff
+
+
+def _change(
+    result: InsoResult,
+    baseline_status: Optional[InsoStatus] = None,
+    baseline_duration_ms: Optional[float] = None,
+) -> ResultChange:
+    return ResultChange(
+        description=result.description,
+        request_id=result.request_id,
+        status=result.status,
+        baseline_status=baseline_status,
+        duration_ms=result.duration_ms,
+        baseline_duration_ms=baseline_duration_ms,
+    )
@@ -0,0 +1,53 @@
+import os
+import uuid
+from typing import IO, Callable, Mapping, Optional, Union
+
+OutputWriter = Callable[[IO[str]], None]
+
+
+class GitHubActions:
+    """
+    Writes step outputs and the job summary of a GitHub Actions step.
+
+    The files come from the `GITHUB_OUTPUT` and `GITHUB_STEP_SUMMARY`
+    environment variables; whatever is not set is skipped. Values are
+    written straight to the files, never held by the calling shell.
+    """
+
+    def __init__(self, environ: Optional[Mapping[str, str]] = None):
+        environ = os.environ if environ is None else environ
+        self.output_path = environ.get("GITHUB_OUTPUT") or None
+        self.summary_path = environ.get("GITHUB_STEP_SUMMARY") or None
+
+    @property
+    def available(self) -> bool:
+        return self.output_path is not None or self.summary_path is not None
+
+    def set_output(self, name: str, value: Union[str, OutputWriter]) -> None:
+        """
+        Sets a step output to `value`, or to whatever `value` writes when it
+        is a callable taking the output file.
+
+        Multiline values use a random heredoc delimiter, as the runner
+        toolkit does, so no line of the value can end it early.
+        """
+        if self.output_path is None:
+            return
+        with open(self.output_path, "a", encoding="utf-8") as handle:
+            if isinstance(value, str) and "\n" not in value:
+                handle.write(f"{name}={value}\n")
+                return
+            delimiter = f"ghadelimiter_{uuid.uuid4()}"
+            handle.write(f"{name}<<{delimiter}\n")
+            if isinstance(value, str):
+                handle.write(value)
+            else:
+                value(handle)
+            handle.write(f"\n{delimiter}\n")
+
+    def add_summary(self, markdown: str) -> None:
+        if self.summary_path is None:
+            return
+        with open(self.summary_path, "a", encoding="utf-8") as handle:
+            handle.write(markdown)
+            handle.write("\n")
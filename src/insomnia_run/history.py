@@ -0,0 +1,260 @@
+import sqlite3
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .models import FlakyTest, InsoRunReport, InsoStatus
+from .stats import percentile
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL,
+    target_name TEXT,
+    run_type TEXT NOT NULL,
+    environment TEXT,
+    commit_sha TEXT,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    request_id TEXT,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration_ms REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_target ON runs (target_name, id);
+CREATE INDEX IF NOT EXISTS results_by_run ON results (run_id);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (description, request_id, run_id);
+"""
+
+# The most recent runs of a target, newest first.
+_RECENT_RUNS = "SELECT id FROM runs WHERE target_name IS ? ORDER BY id DESC LIMIT ?"
+
+
+class DurationTrend(BaseModel):
+    description: str
+    request_id: Optional[str] = None
+    samples: int
+    p50_ms: float
+    p95_ms: float
+    # Median over the runs before the window, when there are any.
+    previous_p50_ms: Optional[float] = None
+
+
+class RunRecord(BaseModel):
+    id: int
+    recorded_at: float
+    target_name: Optional[str] = None
+    environment: Optional[str] = None
+    commit_sha: Optional[str] = None
+    passed: int
+    failed: int
+    skipped: int
+
+
+class HistoryStore:
+    """
+    Past run results in a local SQLite file.
+
+    Each report is appended in a single transaction. Queries look at the
+    most recent runs of one target (collection or test suite) and use the
+    indexes on runs per target and on results per test.
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(
+        self,
+        report: InsoRunReport,
+        environment: Optional[str] = None,
+        commit_sha: Optional[str] = None,
+        recorded_at: Optional[float] = None,
+    ) -> int:
+        """Appends a report and returns the ID of its run."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (recorded_at, target_name, run_type, environment, "
+                "commit_sha, passed, failed, skipped) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time() if recorded_at is None else recorded_at,
+                    report.target_name,
+                    report.run_type.value,
+                    environment,
+                    commit_sha,
+                    report.passed_count,
+                    report.failed_count,
+                    report.skipped_count,
+                ),
+            )
+            run_id = cursor.lastrowid
+            assert run_id is not None
+            self.connection.executemany(
+                "INSERT INTO results (run_id, request_id, description, status, "
+                "duration_ms) VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        run_id,
+                        result.request_id,
+                        result.description,
+                        result.status.value,
+                        result.duration_ms,
+                    )
+                    for result in report.results
+                ),
+            )
+        return run_id
+
+    def flaky(
+        self,
+        target_name: Optional[str] = None,
+        window: int = 20,
+        min_flips: int = 2,
+        limit: Optional[int] = None,
+    ) -> List[FlakyTest]:
+        """
+        Lists tests whose status changed at least `min_flips` times over
+        the last `window` runs, the most unstable first.
+
+        A test that broke once and stayed broken flips only once, so it is
+        not reported. Skipped results are ignored.
+        """
+        rows = self.connection.execute(
+            f"""
+            WITH recent AS ({_RECENT_RUNS}),
+            statuses AS (
+                SELECT results.request_id, results.description, results.status,
+                    LAG(results.status) OVER (
+                        PARTITION BY results.request_id, results.description
+                        ORDER BY results.run_id, results.rowid
+                    ) AS previous
+                FROM results JOIN recent ON results.run_id = recent.id
+                WHERE results.status != ?
+            )
+            SELECT request_id, description, COUNT(*) AS runs,
+                SUM(status = ?) AS failures,
+                SUM(previous IS NOT NULL AND status != previous) AS flips
+            FROM statuses
+            GROUP BY request_id, description
+            HAVING flips >= ?
+            ORDER BY flips * 1.0 / (runs - 1) DESC, failures DESC, description
+            LIMIT ?
+            """,
+            (
+                target_name,
+                window,
+                InsoStatus.SKIP.value,
+                InsoStatus.FAIL.value,
+                min_flips,
+                -1 if limit is None else limit,
+            ),
+        )
+        return [
+            FlakyTest(
+                request_id=request_id,
+                description=description,
+                runs=runs,
+                failures=failures,
+                flips=flips,
+            )
+            for request_id, description, runs, failures, flips in rows
+        ]
+
+    def durations(
+        self,
+        target_name: Optional[str] = None,
+        window: int = 20,
+        limit: Optional[int] = None,
+    ) -> List[DurationTrend]:
+        """
+        Returns the p50 and p95 duration of each test over the last `window`
+        runs, next to its median over the `window` runs before those. The
+        slowest tests by p95 come first.
+        """
+        recent_runs = self.connection.execute(_RECENT_RUNS, (target_name, 2 * window))
+        run_ids = [row[0] for row in recent_runs]
+        if not run_ids:
+            return []
+        current = set(run_ids[:window])
+
+        rows = self.connection.execute(
+            f"""
+            WITH recent AS ({_RECENT_RUNS})
+            SELECT results.request_id, results.description, results.run_id,
+                results.duration_ms
+            FROM results JOIN recent ON results.run_id = recent.id
+            WHERE results.duration_ms IS NOT NULL
+            ORDER BY results.request_id, results.description, results.duration_ms
+            """,
+            (target_name, 2 * window),
+        )
+
+        trends = []
+        for (request_id, description), group in groupby(
+            rows, key=lambda row: (row[0], row[1])
+        ):
+            recent: List[float] = []
+            previous: List[float] = []
+            for _, _, run_id, duration_ms in group:
+                (recent if run_id in current else previous).append(duration_ms)
+            if not recent:
+                continue
+            trends.append(
+                DurationTrend(
+                    request_id=request_id,
+                    description=description,
+                    samples=len(recent),
+                    p50_ms=percentile(recent, 50),
+                    p95_ms=percentile(recent, 95),
+                    previous_p50_ms=percentile(previous, 50) if previous else None,
+                )
+            )
+        trends.sort(key=lambda trend: trend.p95_ms, reverse=True)
+        return trends[:limit] if limit is not None else trends
+
+    def last_good(
+        self, target_name: Optional[str] = None, description: Optional[str] = None
+    ) -> Optional[RunRecord]:
+        """
+        Returns the most recent run without failures or, given a test
+        `description`, the most recent run in which that test passed.
+        """
+        columns = (
+            "runs.id, runs.recorded_at, runs.target_name, runs.environment, "
+            "runs.commit_sha, runs.passed, runs.failed, runs.skipped"
+        )
+        if description is None:
+            row = self.connection.execute(
+                f"SELECT {columns} FROM runs WHERE target_name IS ? "
+                "AND failed = 0 AND passed > 0 ORDER BY id DESC LIMIT 1",
+                (target_name,),
+            ).fetchone()
+        else:
+            row = self.connection.execute(
+                f"SELECT {columns} FROM results JOIN runs ON results.run_id = runs.id "
+                "WHERE runs.target_name IS ? AND results.description = ? "
+                "AND results.status = ? ORDER BY runs.id DESC LIMIT 1",
+                (target_name, description, InsoStatus.PASS.value),
+            ).fetchone()
+        if row is None:
+            return None
+        return RunRecord(**dict(zip(RunRecord.model_fields, row)))
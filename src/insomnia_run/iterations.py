@@ -0,0 +1,224 @@
+import json
+import os
+import tempfile
+from typing import Callable, Dict, List, Mapping, Optional, Sequence
+
+from .models import (
+    InsoResult,
+    InsoRunReport,
+    InsoStatus,
+    IterationSummary,
+    ResultList,
+    RunType,
+)
+from .sharding import merge_reports
+
+RequestResolver = Callable[[InsoResult], Optional[str]]
+
+
+class IterationAggregator:
+    """
+    Folds the repeated results of an iteration run into one entry per test.
+
+    Results are fed in the order inso reports them. Each one is given its
+    request ID and duration, numbered with the iteration it came from (its
+    occurrence among results of the same test), appended to a JSON Lines
+    log and then dropped, so memory stays proportional to the number of
+    distinct tests rather than to the number of iterations.
+    """
+
+    def __init__(
+        self,
+        log_dir: Optional[str] = None,
+        resolve: Optional[RequestResolver] = None,
+        request_durations: Optional[Mapping[str, float]] = None,
+    ):
+        fd, self.log_path = tempfile.mkstemp(
+            prefix="insomnia-run-iterations-", suffix=".jsonl", dir=log_dir
+        )
+        self._log = os.fdopen(fd, "w", encoding="utf-8")
+        self._resolve = resolve
+        self._request_durations = request_durations or {}
+        self._summaries: Dict[tuple[Optional[str], str], IterationSummary] = {}
+        self._first_failures: Dict[tuple[Optional[str], str], InsoResult] = {}
+        self._pending: Optional[tuple[InsoResult, float]] = None
+        self.runs = 0
+
+    def add(self, result: InsoResult, elapsed: float) -> None:
+        """
+        Queues a result together with the seconds since the previous one.
+
+        A result is recorded once the next one arrives (or on `close`), so
+        the diagnostic block that follows it has already been parsed.
+        """
+        if self._pending is not None:
+            self._record(*self._pending)
+        self._pending = (result, elapsed)
+
+    def _record(self, result: InsoResult, elapsed: float) -> None:
+        if result.request_id is None and self._resolve is not None:
+            result.request_id = self._resolve(result)
+        if result.duration_ms is None:
+            seconds = self._request_durations.get(result.request_id or "", elapsed)
+            result.duration_ms = round(seconds * 1000, 3)
+
+        key = (result.request_id, result.description)
+        summary = self._summaries.get(key)
+        if summary is None:
+            summary = self._summaries[key] = IterationSummary(
+                description=result.description, request_id=result.request_id
+            )
+        summary.runs += 1
+        result.iteration = summary.runs
+        self.runs += 1
+
+        if result.status == InsoStatus.PASS:
+            summary.passed += 1
+        elif result.status == InsoStatus.SKIP:
+            summary.skipped += 1
+        else:
+            summary.failed += 1
+            if summary.first_failed_iteration is None:
+                summary.first_failed_iteration = summary.runs
+                self._first_failures[key] = result
+
+        self._log.write(result.model_dump_json())
+        self._log.write("\n")
+
+    def close(self) -> None:
+        if self._pending is not None:
+            self._record(*self._pending)
+            self._pending = None
+        self._log.close()
+
+    @property
+    def summaries(self) -> List[IterationSummary]:
+        return list(self._summaries.values())
+
+    def results(self) -> ResultList:
+        """
+        Returns one result per test.
+
+        A test that failed in any iteration is represented by its first
+        failure, diagnostic included; otherwise it passed (or was skipped)
+        in every iteration.
+        """
+        results = ResultList()
+        for position, (key, summary) in enumerate(self._summaries.items(), start=1):
+            failure = self._first_failures.get(key)
+            if failure is not None:
+                results.append(failure.model_copy(update={"id": position}))
+                continue
+            results.append(
+                InsoResult(
+                    id=position,
+                    status=InsoStatus.PASS if summary.passed else InsoStatus.SKIP,
+                    description=summary.description,
+                    request_id=summary.request_id,
+                )
+            )
+        return results
+
+
+def merge_iteration_reports(
+    reports: Sequence[InsoRunReport],
+    offsets: Sequence[int],
+    target_name: Optional[str] = None,
+    log_dir: Optional[str] = None,
+) -> InsoRunReport:
+    """
+    Combines iteration runs over consecutive slices of one data file.
+
+    `offsets` gives the number of data rows before each report's slice, so
+    iteration k of a report becomes iteration offset + k, which is the row
+    of the original file it ran with. Summaries of the same test are
+    added up and the per-iteration logs are rewritten into a single log.
+    """
+    merged = merge_reports(
+        reports, run_type=RunType.COLLECTION, target_name=target_name, label="Shard"
+    )
+    summaries: Dict[tuple[Optional[str], str], IterationSummary] = {}
+    first_failures: Dict[tuple[Optional[str], str], InsoResult] = {}
+    others: List[InsoResult] = []
+
+    for report, offset in zip(reports, offsets):
+        covered = {(s.request_id, s.description) for s in report.iterations}
+        for result in report.results:
+            key = (result.request_id, result.description)
+            if key not in covered:
+                others.append(result)
+            elif result.status == InsoStatus.FAIL and result.iteration is not None:
+                iteration = offset + result.iteration
+                known = first_failures.get(key)
+                if (
+                    known is None
+                    or known.iteration is None
+                    or iteration < known.iteration
+                ):
+                    first_failures[key] = result.model_copy(
+                        update={"iteration": iteration}
+                    )
+
+        for summary in report.iterations:
+            key = (summary.request_id, summary.description)
+            total = summaries.get(key)
+            if total is None:
+                total = summaries[key] = IterationSummary(
+                    description=summary.description, request_id=summary.request_id
+                )
+            total.runs += summary.runs
+            total.passed += summary.passed
+            total.failed += summary.failed
+            total.skipped += summary.skipped
+            if summary.first_failed_iteration is not None:
+                iteration = offset + summary.first_failed_iteration
+                if (
+                    total.first_failed_iteration is None
+                    or iteration < total.first_failed_iteration
+                ):
+                    total.first_failed_iteration = iteration
+
+    results: List[InsoResult] = []
+    for key, summary in summaries.items():
+        failure = first_failures.get(key)
+        if failure is not None:
+            results.append(failure)
+        else:
+            results.append(
+                InsoResult(
+                    id=0,
+                    status=InsoStatus.PASS if summary.passed else InsoStatus.SKIP,
+                    description=summary.description,
+                    request_id=summary.request_id,
+                )
+            )
+    results.extend(others)
+    merged.results = ResultList(
+        result.model_copy(update={"id": position})
+        for position, result in enumerate(results, start=1)
+    )
+    merged.iterations = list(summaries.values())
+    merged.iteration_logs = [
+        _merge_logs([report.iteration_logs for report in reports], offsets, log_dir)
+    ]
+    return merged
+
+
+def _merge_logs(
+    logs: Sequence[Sequence[str]], offsets: Sequence[int], log_dir: Optional[str]
+) -> str:
+    fd, path = tempfile.mkstemp(
+        prefix="insomnia-run-iterations-", suffix=".jsonl", dir=log_dir
+    )
+    with os.fdopen(fd, "w", encoding="utf-8") as merged:
+        for paths, offset in zip(logs, offsets):
+            for log in paths:
+                with open(log, encoding="utf-8") as handle:
+                    for line in handle:
+                        entry = json.loads(line)
+                        if entry.get("iteration") is not None:
+                            entry["iteration"] += offset
+                        merged.write(json.dumps(entry))
+                        merged.write("\n")
+                os.remove(log)
+    return path
@@ -0,0 +1,111 @@
+import re
+import shutil
+import tempfile
+from typing import IO, Iterable, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from .models import InsoResult, InsoRunReport, InsoStatus
+from .tree import ResultNode
+
+# Characters that XML 1.0 does not allow, even escaped.
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def _text(value: str) -> str:
+    return escape(_INVALID_XML.sub("", value))
+
+
+def _attr(value: str) -> str:
+    return quoteattr(_INVALID_XML.sub("", value))
+
+
+class JUnitWriter:
+    """
+    Writes results as a JUnit XML report, one testcase at a time.
+
+    The testsuite counts have to come before the testcases, so testcases
+    are written to a temporary file as results are added and copied to
+    `stream` behind the counts on `close`. Memory use does not depend on
+    the number of results.
+
+    The writer is used as a context manager, which owns the temporary file:
+    leaving the block closes the report, or only discards the testcases if
+    an exception is raised.
+    """
+
+    _cases: IO[str]
+
+    def __init__(self, stream: IO[str], name: str = "insomnia-run"):
+        self.stream = stream
+        self.name = name
+        self.tests = 0
+        self.failures = 0
+        self.skipped = 0
+        self.time_ms = 0.0
+
+    def add(self, result: InsoResult) -> None:
+        self.tests += 1
+        folders, name = ResultNode.split_description(result)
+        classname = ".".join(folders) or self.name
+        attributes = f"name={_attr(name)} classname={_attr(classname)}"
+        if result.duration_ms is not None:
+            self.time_ms += result.duration_ms
+            attributes += f' time="{result.duration_ms / 1000:.3f}"'
+
+        if result.status == InsoStatus.PASS:
+            self._cases.write(f"    <testcase {attributes}/>\n")
+            return
+
+        self._cases.write(f"    <testcase {attributes}>\n")
+        if result.status == InsoStatus.SKIP:
+            self.skipped += 1
+            self._cases.write("      <skipped/>\n")
+        else:
+            self.failures += 1
+            diagnostic = result.decode_diagnostic()
+            message = diagnostic.message if diagnostic and diagnostic.message else ""
+            message = message.strip().splitlines()[0] if message.strip() else ""
+            self._cases.write(
+                f"      <failure message={_attr(message or result.description)} "
+                'type="AssertionError">'
+            )
+            if result.diagnostic_raw:
+                self._cases.write(_text(result.diagnostic_raw))
+            self._cases.write("</failure>\n")
+        self._cases.write("    </testcase>\n")
+
+    def extend(self, results: Iterable[InsoResult]) -> None:
+        for result in results:
+            self.add(result)
+
+    def close(self) -> None:
+        if self._cases.closed:
+            return
+        counts = (
+            f'tests="{self.tests}" failures="{self.failures}" errors="0" '
+            f'skipped="{self.skipped}" time="{self.time_ms / 1000:.3f}"'
+        )
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self.stream.write(f"<testsuites name={_attr(self.name)} {counts}>\n")
+        self.stream.write(f"  <testsuite name={_attr(self.name)} {counts}>\n")
+        self._cases.seek(0)
+        shutil.copyfileobj(self._cases, self.stream)
+        self._cases.close()
+        self.stream.write("  </testsuite>\n</testsuites>\n")
+
+    def __enter__(self) -> "JUnitWriter":
+        self._cases = tempfile.TemporaryFile("w+", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._cases.close()
+
+
+def write_junit(
+    report: InsoRunReport, stream: IO[str], name: Optional[str] = None
+) -> None:
+    with JUnitWriter(stream, name or report.target_name or "insomnia-run") as writer:
+        writer.extend(report.results)
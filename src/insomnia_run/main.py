@@ -1,14 +1,38 @@
 import importlib.metadata
+import sys
+from datetime import datetime, timezone
 import typer
+from pathlib import Path
 from typing import Optional
+from rich.console import Console
+from rich.table import Table
 
-from .models import InsoCollectionOptions, InsoTestOptions
+from .cache import ResultCache
+from .collection import CollectionIndex
+from .diff import compare_reports
+from .github import GitHubActions
+from .history import HistoryStore
+from .junit import write_junit
+from .models import (
+    InsoCollectionOptions,
+    InsoResult,
+    InsoRunReport,
+    InsoStatus,
+    InsoTestOptions,
+)
+from .outputs import parse_output, write_json, write_outputs
+from .rerun import failed_request_ids, merge_rerun
 from .runner import InsoRunner
 from .reporter import Reporter
+from .sharding import TimingStore, merge_report_files
 
 app = typer.Typer(
     name="insomnia-run", help="CLI runner for Insomnia API tests and collections."
 )
+history_app = typer.Typer(help="Query the run history recorded with --history.")
+app.add_typer(history_app, name="history")
+
+DEFAULT_HISTORY_FILE = ".insomnia-run/history.sqlite"
 
 
 def _get_version() -> str:
@@ -17,6 +41,7 @@ def _get_version() -> str:
     except importlib.metadata.PackageNotFoundError:
         return "unknown"
 
+
 def _emit_machine_readable_output(report, output_format: Optional[str]) -> None:
     """
     Emits the test report in the specified machine-readable format to stderr.
@@ -32,12 +57,146 @@ def _emit_machine_readable_output(report, output_format: Optional[str]) -> None:
     if requested_format == "json":
         json_report = report.model_dump_json(indent=2)
         typer.echo(json_report, err=True)
+    elif requested_format == "junit":
+        write_junit(report, sys.stderr)
     else:
         raise typer.BadParameter(
             f"Unsupported output format: '{output_format}'. "
-            f"Currently supported: json"
+            f"Currently supported: json, junit"
+        )
+
+
+def _parse_outputs(output: Optional[list[str]]) -> list[tuple[str, str]]:
+    """Checks `--output` values before anything runs."""
+    outputs = []
+    for spec in output or []:
+        try:
+            outputs.append(parse_output(spec))
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    return outputs
+
+
+def _publish_report(
+    report: InsoRunReport,
+    workflow_url: Optional[str],
+    output_format: Optional[str],
+    outputs: list[tuple[str, str]],
+    github: bool = False,
+) -> None:
+    """
+    Writes the report to the requested files, stdout and stderr.
+
+    The Markdown report goes to stdout unless it is written to a file or,
+    with `github`, to the step outputs and job summary. The JSON report
+    then becomes the `json-output` step output instead of going to stderr.
+    """
+    reporter = Reporter()
+    write_outputs(
+        report,
+        outputs,
+        lambda r: reporter.generate_markdown(r, workflow_url=workflow_url),
+    )
+
+    actions = GitHubActions() if github else None
+    if actions is not None and actions.available:
+        markdown = reporter.generate_markdown(report, workflow_url=workflow_url)
+        actions.set_output("exit-code", "1" if report.failed_count > 0 else "0")
+        actions.set_output("markdown", markdown)
+        actions.add_summary(markdown)
+        if output_format and output_format.lower() == "json":
+            actions.set_output("json-output", lambda handle: write_json(report, handle))
+        else:
+            _emit_machine_readable_output(report, output_format)
+        return
+
+    if not any(kind == "markdown" for kind, _ in outputs):
+        print(reporter.generate_markdown(report, workflow_url=workflow_url))
+    _emit_machine_readable_output(report, output_format)
+
+
+def _load_baseline(baseline: Optional[Path]) -> Optional[InsoRunReport]:
+    """Reads the `--baseline` report before anything runs."""
+    if baseline is None:
+        return None
+    try:
+        return InsoRunReport.model_validate_json(baseline.read_bytes())
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(f"Cannot read baseline '{baseline}': {exc}")
+
+
+def _compare_with_baseline(
+    report: InsoRunReport,
+    previous: Optional[InsoRunReport],
+    baseline: Optional[Path],
+    threshold: float,
+) -> None:
+    if previous is None or baseline is None:
+        return
+    report.diff = compare_reports(
+        report, previous, baseline_name=baseline.name, threshold_percent=threshold
+    )
+
+
+def _record_history(
+    report: InsoRunReport,
+    history: Optional[str],
+    environment: Optional[str],
+    commit: Optional[str],
+) -> None:
+    """
+    Marks the tests that history knows to be flaky, then appends the run.
+
+    A report served from the cache is not a new run and is not appended.
+    """
+    if history is None:
+        return
+    with HistoryStore(history) as store:
+        report.known_flaky = store.flaky(report.target_name)
+        if not report.from_cache:
+            store.record(report, environment=environment, commit_sha=commit)
+
+
+def _parse_env_vars(env_var: Optional[list[str]]) -> Optional[dict[str, str]]:
+    if not env_var:
+        return None
+
+    env_var_dict = {}
+    for pair in env_var:
+        if "=" not in pair:
+            raise typer.BadParameter(
+                f"Invalid env-var format: '{pair}'. Expected KEY=VALUE."
+            )
+        key, value = pair.split("=", 1)
+        env_var_dict[key] = value
+    return env_var_dict
+
+
+def _progress_printer(enabled: bool, output_format: Optional[str] = None):
+    """
+    Returns a result callback that prints each result to stderr as it arrives.
+
+    Progress is opt-in so that stdout/stderr stay clean for callers that
+    capture the Markdown and JSON output. It cannot be combined with
+    `--output-format`, whose report also goes to stderr.
+    """
+    if not enabled:
+        return None
+    if output_format:
+        raise typer.BadParameter(
+            "--progress cannot be combined with --output-format, which also "
+            "writes to stderr. Use --output FORMAT=PATH instead."
         )
 
+    console = Console(stderr=True, highlight=False)
+    icons = {InsoStatus.PASS: "✅", InsoStatus.FAIL: "❌", InsoStatus.SKIP: "⏭️"}
+
+    def _print(result: InsoResult) -> None:
+        console.print(f"{icons[result.status]} {result.id} {result.description}")
+
+    return _print
+
+
 @app.callback(invoke_without_command=True)
 def version_callback(
     ctx: typer.Context,
@@ -111,7 +270,20 @@ def run_collection(  # NOSONAR - CLI command requires many options
     ),
     verbose: bool = typer.Option(False, "--verbose", help="Show additional logs"),
     execution_timeout: int = typer.Option(
-        300, "--execution-timeout", help="Execution timeout for the entire process (seconds)"
+        300,
+        "--execution-timeout",
+        help="Execution timeout for the entire process (seconds)",
+    ),
+    stall_timeout: Optional[int] = typer.Option(
+        None,
+        "--stall-timeout",
+        min=1,
+        help="Kill inso if it produces no output for this many seconds",
+    ),
+    restart_on_stall: bool = typer.Option(
+        False,
+        "--restart-on-stall",
+        help="After a stall, re-run every request except the stalled one",
     ),
     workflow_url: Optional[str] = typer.Option(
         None, "--workflow-url", help="GitHub workflow URL for report links"
@@ -119,21 +291,119 @@ def run_collection(  # NOSONAR - CLI command requires many options
     output_format: Optional[str] = typer.Option(
         None,
         "--output-format",
-        help="The format to use for the report output (e.g., 'json')."
+        help="The format to use for the report output ('json' or 'junit').",
+    ),
+    output: Optional[list[str]] = typer.Option(
+        None,
+        "--output",
+        help=(
+            "Write the report to a file as FORMAT=PATH, where FORMAT is "
+            "markdown, json, jsonl or junit (repeatable)"
+        ),
+    ),
+    baseline: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        exists=True,
+        dir_okay=False,
+        help="Earlier JSON report to compare results and durations against",
+    ),
+    regression_threshold: float = typer.Option(
+        20.0,
+        "--regression-threshold",
+        min=0,
+        help=(
+            "Report results that got slower than the baseline by more than "
+            "this percentage"
+        ),
+    ),
+    history: Optional[str] = typer.Option(
+        None,
+        "--history",
+        help=(
+            "SQLite file to append this run to; tests that history shows "
+            "to be flaky are marked in the report"
+        ),
+    ),
+    commit: Optional[str] = typer.Option(
+        None,
+        "--commit",
+        envvar="GITHUB_SHA",
+        help="Commit recorded with the run in --history",
+    ),
+    github: bool = typer.Option(
+        False,
+        "--github",
+        help=(
+            "Write the report to the GitHub Actions step outputs and job "
+            "summary instead of stdout"
+        ),
+    ),
+    progress: bool = typer.Option(
+        False, "--progress", help="Print each result to stderr as it completes"
+    ),
+    raw_output_dir: Optional[str] = typer.Option(
+        None,
+        "--raw-output-dir",
+        help="Directory for the full raw output when it is too large to keep in memory",
+    ),
+    cache: bool = typer.Option(
+        False,
+        "--cache",
+        help="Reuse the previous report when the workspace and options are unchanged",
+    ),
+    cache_dir: str = typer.Option(
+        ".insomnia-run/cache", "--cache-dir", help="Directory for cached reports"
+    ),
+    cache_ttl: int = typer.Option(
+        86400, "--cache-ttl", min=0, help="Maximum age of a cached report (seconds)"
+    ),
+    shards: int = typer.Option(
+        1,
+        "--shards",
+        "--parallel",
+        min=1,
+        help=(
+            "Split requests (or, with --iteration-data, data rows) across "
+            "N concurrent inso processes"
+        ),
+    ),
+    timings_file: str = typer.Option(
+        ".insomnia-run/timings.json",
+        "--timings-file",
+        help="Per-request durations used to balance shards",
+    ),
+    retries: int = typer.Option(
+        0,
+        "--retries",
+        min=0,
+        help=(
+            "Re-run the requests that failed up to N times; results that "
+            "pass on a retry are reported as flaky"
+        ),
+    ),
+    retry_backoff: float = typer.Option(
+        0.0,
+        "--retry-backoff",
+        min=0,
+        help="Seconds to wait before the first retry, doubled for each one after",
+    ),
+    compact_results: bool = typer.Option(
+        False,
+        "--compact-results",
+        help="Store results in compact arrays (for runs with very many results)",
+    ),
+    iteration_log_dir: Optional[str] = typer.Option(
+        None,
+        "--iteration-log-dir",
+        help="Directory for the per-iteration results of iteration runs",
     ),
 ):
     """Run Insomnia collections and generate a markdown report."""
 
-    env_var_dict = None
-    if env_var:
-        env_var_dict = {}
-        for pair in env_var:
-            if "=" not in pair:
-                raise typer.BadParameter(
-                    f"Invalid env-var format: '{pair}'. Expected KEY=VALUE."
-                )
-            key, value = pair.split("=", 1)
-            env_var_dict[key] = value
+    outputs = _parse_outputs(output)
+    previous = _load_baseline(baseline)
+    env_var_dict = _parse_env_vars(env_var)
 
     options = InsoCollectionOptions(
         working_dir=working_dir,
@@ -155,16 +425,34 @@ def run_collection(  # NOSONAR - CLI command requires many options
         data_folders=data_folders,
         verbose=verbose,
         execution_timeout=execution_timeout,
+        stall_timeout=stall_timeout,
+        restart_on_stall=restart_on_stall,
     )
 
-    runner = InsoRunner()
-    report = runner.run_collection(options)
-
-    reporter = Reporter()
-    markdown = reporter.generate_markdown(report, workflow_url=workflow_url)
+    runner = InsoRunner(
+        on_result=_progress_printer(progress, output_format),
+        raw_output_dir=raw_output_dir,
+        cache=ResultCache(cache_dir, ttl=cache_ttl) if cache else None,
+        columnar_results=compact_results,
+        iteration_log_dir=iteration_log_dir,
+        resolve_request_ids=bool(retries or baseline or history),
+    )
+    if shards > 1 and iteration_data:
+        report = runner.run_collection_data_sharded(options, shards)
+    elif shards > 1:
+        timings = TimingStore.load(timings_file)
+        try:
+            report = runner.run_collection_sharded(options, shards, timings=timings)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc)) from exc
+    else:
+        report = runner.run_collection(options)
+    if retries:
+        report = runner.retry_failed(report, options, retries, backoff=retry_backoff)
 
-    print(markdown)
-    _emit_machine_readable_output(report, output_format)
+    _compare_with_baseline(report, previous, baseline, regression_threshold)
+    _record_history(report, history, environment, commit)
+    _publish_report(report, workflow_url, output_format, outputs, github)
 
     if report.failed_count > 0:
         raise typer.Exit(code=1)
@@ -211,7 +499,15 @@ def run_test(  # NOSONAR - CLI command requires many options
     ),
     verbose: bool = typer.Option(False, "--verbose", help="Show additional logs"),
     execution_timeout: int = typer.Option(
-        300, "--execution-timeout", help="Execution timeout for the entire process (seconds)"
+        300,
+        "--execution-timeout",
+        help="Execution timeout for the entire process (seconds)",
+    ),
+    stall_timeout: Optional[int] = typer.Option(
+        None,
+        "--stall-timeout",
+        min=1,
+        help="Kill inso if it produces no output for this many seconds",
     ),
     workflow_url: Optional[str] = typer.Option(
         None, "--workflow-url", help="GitHub workflow URL for report links"
@@ -219,11 +515,79 @@ def run_test(  # NOSONAR - CLI command requires many options
     output_format: Optional[str] = typer.Option(
         None,
         "--output-format",
-        help="The format to use for the report output (e.g., 'json')."
+        help="The format to use for the report output ('json' or 'junit').",
+    ),
+    output: Optional[list[str]] = typer.Option(
+        None,
+        "--output",
+        help=(
+            "Write the report to a file as FORMAT=PATH, where FORMAT is "
+            "markdown, json, jsonl or junit (repeatable)"
+        ),
+    ),
+    baseline: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        exists=True,
+        dir_okay=False,
+        help="Earlier JSON report to compare results and durations against",
+    ),
+    regression_threshold: float = typer.Option(
+        20.0,
+        "--regression-threshold",
+        min=0,
+        help=(
+            "Report results that got slower than the baseline by more than "
+            "this percentage"
+        ),
+    ),
+    history: Optional[str] = typer.Option(
+        None,
+        "--history",
+        help=(
+            "SQLite file to append this run to; tests that history shows "
+            "to be flaky are marked in the report"
+        ),
+    ),
+    commit: Optional[str] = typer.Option(
+        None,
+        "--commit",
+        envvar="GITHUB_SHA",
+        help="Commit recorded with the run in --history",
+    ),
+    github: bool = typer.Option(
+        False,
+        "--github",
+        help=(
+            "Write the report to the GitHub Actions step outputs and job "
+            "summary instead of stdout"
+        ),
+    ),
+    progress: bool = typer.Option(
+        False, "--progress", help="Print each result to stderr as it completes"
+    ),
+    raw_output_dir: Optional[str] = typer.Option(
+        None,
+        "--raw-output-dir",
+        help="Directory for the full raw output when it is too large to keep in memory",
+    ),
+    cache: bool = typer.Option(
+        False,
+        "--cache",
+        help="Reuse the previous report when the workspace and options are unchanged",
+    ),
+    cache_dir: str = typer.Option(
+        ".insomnia-run/cache", "--cache-dir", help="Directory for cached reports"
+    ),
+    cache_ttl: int = typer.Option(
+        86400, "--cache-ttl", min=0, help="Maximum age of a cached report (seconds)"
     ),
 ):
     """Run Insomnia unit tests and generate a markdown report."""
 
+    outputs = _parse_outputs(output)
+    previous = _load_baseline(baseline)
+
     options = InsoTestOptions(
         working_dir=working_dir,
         identifier=identifier,
@@ -239,21 +603,306 @@ def run_test(  # NOSONAR - CLI command requires many options
         data_folders=data_folders,
         verbose=verbose,
         execution_timeout=execution_timeout,
+        stall_timeout=stall_timeout,
     )
 
-    runner = InsoRunner()
+    runner = InsoRunner(
+        on_result=_progress_printer(progress, output_format),
+        raw_output_dir=raw_output_dir,
+        cache=ResultCache(cache_dir, ttl=cache_ttl) if cache else None,
+    )
     report = runner.run_test(options)
 
-    reporter = Reporter()
-    markdown = reporter.generate_markdown(report, workflow_url=workflow_url)
+    _compare_with_baseline(report, previous, baseline, regression_threshold)
+    _record_history(report, history, environment, commit)
+    _publish_report(report, workflow_url, output_format, outputs, github)
 
-    print(markdown)
-    _emit_machine_readable_output(report, output_format)
+    if report.failed_count > 0:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def rerun_failed(  # NOSONAR - CLI command requires many options
+    from_report: str = typer.Option(
+        ...,
+        "--from",
+        help="JSON report produced by --output-format json",
+    ),
+    working_dir: str = typer.Option(
+        ...,
+        "--working-dir",
+        "-w",
+        help="Path to Insomnia export or .insomnia directory",
+    ),
+    identifier: Optional[str] = typer.Option(
+        None,
+        "--identifier",
+        "-i",
+        help="Collection name or workspace ID (defaults to the report's target)",
+    ),
+    environment: Optional[str] = typer.Option(
+        None, "--env", "-e", help="Environment name to use"
+    ),
+    globals: Optional[str] = typer.Option(
+        None, "--globals", "-g", help="Global environment file or ID"
+    ),
+    request_timeout: Optional[int] = typer.Option(
+        None, "--request-timeout", help="Request timeout (ms)"
+    ),
+    env_var: Optional[list[str]] = typer.Option(
+        None, "--env-var", help="Override env vars (KEY=VALUE, repeatable)"
+    ),
+    disable_cert_validation: bool = typer.Option(
+        False, "--disable-cert-validation", "-k", help="Disable SSL verification"
+    ),
+    https_proxy: Optional[str] = typer.Option(
+        None, "--https-proxy", help="HTTPS proxy URL"
+    ),
+    http_proxy: Optional[str] = typer.Option(
+        None, "--http-proxy", help="HTTP proxy URL"
+    ),
+    no_proxy: Optional[str] = typer.Option(
+        None, "--no-proxy", help="Hosts to bypass proxy"
+    ),
+    data_folders: Optional[list[str]] = typer.Option(
+        None, "--data-folders", "-f", help="Folders Insomnia can access (repeatable)"
+    ),
+    verbose: bool = typer.Option(False, "--verbose", help="Show additional logs"),
+    execution_timeout: int = typer.Option(
+        300,
+        "--execution-timeout",
+        help="Execution timeout for the entire process (seconds)",
+    ),
+    workflow_url: Optional[str] = typer.Option(
+        None, "--workflow-url", help="GitHub workflow URL for report links"
+    ),
+    output_format: Optional[str] = typer.Option(
+        None,
+        "--output-format",
+        help="The format to use for the report output ('json' or 'junit').",
+    ),
+    output: Optional[list[str]] = typer.Option(
+        None,
+        "--output",
+        help=(
+            "Write the report to a file as FORMAT=PATH, where FORMAT is "
+            "markdown, json, jsonl or junit (repeatable)"
+        ),
+    ),
+    github: bool = typer.Option(
+        False,
+        "--github",
+        help=(
+            "Write the report to the GitHub Actions step outputs and job "
+            "summary instead of stdout"
+        ),
+    ),
+    progress: bool = typer.Option(
+        False, "--progress", help="Print each result to stderr as it completes"
+    ),
+):
+    """Re-run only the failed requests of a previous JSON report."""
+
+    outputs = _parse_outputs(output)
+
+    try:
+        original = InsoRunReport.model_validate_json(
+            Path(from_report).read_text(encoding="utf-8")
+        )
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(f"Cannot read report '{from_report}': {exc}")
+
+    if original.failed_count == 0:
+        report = original
+    else:
+        CollectionIndex.load(working_dir).assign_requests(original.results)
+        request_ids = failed_request_ids(original)
+        if not request_ids:
+            raise typer.BadParameter(
+                f"No request IDs could be determined for the failures in '{from_report}'."
+            )
+
+        options = InsoCollectionOptions(
+            working_dir=working_dir,
+            identifier=identifier or original.target_name,
+            environment=environment,
+            item=request_ids,
+            globals=globals,
+            request_timeout=request_timeout,
+            env_var=_parse_env_vars(env_var),
+            disable_cert_validation=disable_cert_validation,
+            https_proxy=https_proxy,
+            http_proxy=http_proxy,
+            no_proxy=no_proxy,
+            data_folders=data_folders,
+            verbose=verbose,
+            execution_timeout=execution_timeout,
+        )
+
+        runner = InsoRunner(
+            on_result=_progress_printer(progress, output_format),
+            resolve_request_ids=True,
+        )
+        report = merge_rerun(original, runner.run_collection(options))
+
+    _publish_report(report, workflow_url, output_format, outputs, github)
 
     if report.failed_count > 0:
         raise typer.Exit(code=1)
 
 
+@app.command()
+def merge(
+    reports: list[str] = typer.Argument(..., help="JSON reports to combine"),
+    target_name: Optional[str] = typer.Option(
+        None, "--target-name", help="Name for the combined report"
+    ),
+    workflow_url: Optional[str] = typer.Option(
+        None, "--workflow-url", help="GitHub workflow URL for report links"
+    ),
+    output_format: Optional[str] = typer.Option(
+        None,
+        "--output-format",
+        help="The format to use for the report output ('json' or 'junit').",
+    ),
+    output: Optional[list[str]] = typer.Option(
+        None,
+        "--output",
+        help=(
+            "Write the report to a file as FORMAT=PATH, where FORMAT is "
+            "markdown, json, jsonl or junit (repeatable)"
+        ),
+    ),
+    baseline: Optional[Path] = typer.Option(
+        None,
+        "--baseline",
+        exists=True,
+        dir_okay=False,
+        help="Earlier JSON report to compare results and durations against",
+    ),
+    regression_threshold: float = typer.Option(
+        20.0,
+        "--regression-threshold",
+        min=0,
+        help=(
+            "Report results that got slower than the baseline by more than "
+            "this percentage"
+        ),
+    ),
+    github: bool = typer.Option(
+        False,
+        "--github",
+        help=(
+            "Write the report to the GitHub Actions step outputs and job "
+            "summary instead of stdout"
+        ),
+    ),
+):
+    """Combine JSON reports, such as those of matrix jobs, into one report."""
+
+    outputs = _parse_outputs(output)
+    previous = _load_baseline(baseline)
+
+    try:
+        report = merge_report_files(reports, target_name=target_name)
+    except (OSError, ValueError) as exc:
+        raise typer.BadParameter(f"Cannot read report: {exc}")
+
+    _compare_with_baseline(report, previous, baseline, regression_threshold)
+    _publish_report(report, workflow_url, output_format, outputs, github)
+
+    if report.failed_count > 0:
+        raise typer.Exit(code=1)
+
+
+def _print_table(table: Table) -> None:
+    Console(highlight=False).print(table)
+
+
+@history_app.command("flaky")
+def history_flaky(
+    db: str = typer.Option(DEFAULT_HISTORY_FILE, "--db", help="History file"),
+    target: Optional[str] = typer.Option(
+        None, "--target", help="Collection or test suite the runs were for"
+    ),
+    window: int = typer.Option(20, "--window", min=2, help="Number of recent runs"),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum tests to list"),
+):
+    """List tests that keep flipping between passing and failing."""
+    with HistoryStore(db) as store:
+        tests = store.flaky(target, window=window, limit=limit)
+
+    table = Table("Test", "Request", "Runs", "Failures", "Flips", "Flake rate")
+    for test in tests:
+        table.add_row(
+            test.description,
+            test.request_id or "—",
+            str(test.runs),
+            str(test.failures),
+            str(test.flips),
+            f"{test.flake_rate:.1f}%",
+        )
+    _print_table(table)
+
+
+@history_app.command("durations")
+def history_durations(
+    db: str = typer.Option(DEFAULT_HISTORY_FILE, "--db", help="History file"),
+    target: Optional[str] = typer.Option(
+        None, "--target", help="Collection or test suite the runs were for"
+    ),
+    window: int = typer.Option(20, "--window", min=1, help="Number of recent runs"),
+    limit: int = typer.Option(20, "--limit", min=1, help="Maximum tests to list"),
+):
+    """Show p50/p95 durations of the slowest tests and their earlier median."""
+    with HistoryStore(db) as store:
+        trends = store.durations(target, window=window, limit=limit)
+
+    table = Table("Test", "Request", "Samples", "p50", "p95", "Previous p50")
+    for trend in trends:
+        previous = (
+            f"{trend.previous_p50_ms:.0f} ms"
+            if trend.previous_p50_ms is not None
+            else "—"
+        )
+        table.add_row(
+            trend.description,
+            trend.request_id or "—",
+            str(trend.samples),
+            f"{trend.p50_ms:.0f} ms",
+            f"{trend.p95_ms:.0f} ms",
+            previous,
+        )
+    _print_table(table)
+
+
+@history_app.command("last-good")
+def history_last_good(
+    db: str = typer.Option(DEFAULT_HISTORY_FILE, "--db", help="History file"),
+    target: Optional[str] = typer.Option(
+        None, "--target", help="Collection or test suite the runs were for"
+    ),
+    test: Optional[str] = typer.Option(
+        None, "--test", help="Find the last run in which this test passed"
+    ),
+):
+    """Show the most recent run without failures (or in which a test passed)."""
+    with HistoryStore(db) as store:
+        run = store.last_good(target, description=test)
+
+    if run is None:
+        typer.echo("No passing run recorded")
+        raise typer.Exit(code=1)
+
+    recorded = datetime.fromtimestamp(run.recorded_at, tz=timezone.utc)
+    typer.echo(f"Run {run.id} at {recorded:%Y-%m-%d %H:%M:%S} UTC")
+    typer.echo(f"Commit: {run.commit_sha or '—'}")
+    typer.echo(f"Environment: {run.environment or '—'}")
+    typer.echo(
+        f"Results: {run.passed} passed, {run.failed} failed, {run.skipped} skipped"
+    )
+
+
 def main():
     app()
 
@@ -1,6 +1,32 @@
+import math
+import operator
+from array import array
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Protocol,
+    Sequence,
+    SupportsIndex,
+    Union,
+)
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    GetCoreSchemaHandler,
+    PrivateAttr,
+    field_serializer,
+)
+from pydantic_core import core_schema
+
+from . import yamlish
 
 
 class RunType(str, Enum):
@@ -14,32 +40,513 @@ class InsoStatus(str, Enum):
     SKIP = "SKIP"
 
 
+class TapDiagnostic(BaseModel):
+    message: Optional[str] = None
+    expected: Optional[str] = None
+    actual: Optional[str] = None
+    at: Optional[str] = None
+    duration_ms: Optional[float] = None
+
+    @classmethod
+    def from_yaml(cls, text: str) -> "TapDiagnostic":
+        values = yamlish.load(text)
+        duration = values.get("duration_ms")
+        try:
+            duration_ms = float(duration) if duration else None
+        except ValueError:
+            duration_ms = None
+        return cls(
+            message=values.get("message"),
+            expected=values.get("expected"),
+            actual=values.get("actual"),
+            at=values.get("at"),
+            duration_ms=duration_ms,
+        )
+
+
 class InsoResult(BaseModel):
     id: int
     status: InsoStatus
     description: str
+    request_id: Optional[str] = None
+    # Names of the enclosing TAP subtests, outermost first.
+    path: List[str] = Field(default_factory=list)
+    duration_ms: Optional[float] = None
+    # 1-based iteration of the run that produced this result, if iterating.
+    iteration: Optional[int] = None
+    # Failed at first and passed when its request was retried.
+    flaky: bool = False
+    # Raw text of the TAP YAML block; decoded into `diagnostic` on demand.
+    diagnostic_raw: Optional[str] = Field(default=None, exclude=True, repr=False)
+    diagnostic: Optional[TapDiagnostic] = None
+
+    def decode_diagnostic(self) -> Optional[TapDiagnostic]:
+        if self.diagnostic is None and self.diagnostic_raw is not None:
+            self.diagnostic = TapDiagnostic.from_yaml(self.diagnostic_raw)
+        return self.diagnostic
+
+    @field_serializer("diagnostic")
+    def _serialize_diagnostic(self, diagnostic: Optional[TapDiagnostic]):
+        diagnostic = diagnostic or self.decode_diagnostic()
+        return diagnostic.model_dump() if diagnostic is not None else None
+
+
+class ResultFields(Protocol):
+    """
+    The fields of a result, as ColumnarResults reads them. InsoResult has
+    them, and so does the lightweight record the TAP parser builds.
+    """
+
+    id: int
+    status: InsoStatus
+    description: str
+    request_id: Optional[str]
+    duration_ms: Optional[float]
+    iteration: Optional[int]
+    flaky: bool
+    diagnostic_raw: Optional[str]
+    diagnostic: Optional[TapDiagnostic]
+
+    @property
+    def path(self) -> Sequence[str]: ...
+
+
+class ResultList(list):
+    """
+    A list of results that keeps a running tally of their statuses.
+
+    Every mutating list operation updates the tally, so counting results by
+    status is constant time however many there are. Results are expected not
+    to change status once added; replace them instead.
+    """
+
+    __slots__ = ("_counts",)
+
+    def __init__(self, results: Iterable[InsoResult] = ()):
+        super().__init__(results)
+        self._counts = {status: 0 for status in InsoStatus}
+        for result in self:
+            self._counts[result.status] += 1
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        return core_schema.no_info_after_validator_function(
+            cls, handler.generate_schema(List[InsoResult])
+        )
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+    def tally(self, status: InsoStatus) -> int:
+        return self._counts[status]
+
+    def _add(self, results: Iterable[InsoResult]) -> None:
+        for result in results:
+            self._counts[result.status] += 1
+
+    def _discard(self, results: Iterable[InsoResult]) -> None:
+        for result in results:
+            self._counts[result.status] -= 1
+
+    def append(self, result: InsoResult) -> None:
+        super().append(result)
+        self._counts[result.status] += 1
+
+    def extend(self, results: Iterable[InsoResult]) -> None:
+        results = list(results)
+        super().extend(results)
+        self._add(results)
+
+    # Like list.__iadd__, this accepts any iterable where __add__ only
+    # accepts lists.
+    def __iadd__(  # type: ignore[override, misc]
+        self, results: Iterable[InsoResult]
+    ) -> "ResultList":
+        self.extend(results)
+        return self
+
+    def __imul__(self, times: SupportsIndex) -> "ResultList":
+        results = list(self)
+        self.clear()
+        for _ in range(operator.index(times)):
+            self.extend(results)
+        return self
+
+    def insert(self, index: SupportsIndex, result: InsoResult) -> None:
+        super().insert(index, result)
+        self._counts[result.status] += 1
+
+    def remove(self, result: InsoResult) -> None:
+        super().remove(result)
+        self._counts[result.status] -= 1
+
+    def pop(self, index: SupportsIndex = -1) -> InsoResult:
+        result = super().pop(index)
+        self._counts[result.status] -= 1
+        return result
+
+    def clear(self) -> None:
+        super().clear()
+        self._counts = dict.fromkeys(self._counts, 0)
+
+    def __setitem__(self, index, value) -> None:
+        old = self[index]
+        if isinstance(index, slice):
+            value = list(value)
+            super().__setitem__(index, value)
+            self._discard(old)
+            self._add(value)
+        else:
+            super().__setitem__(index, value)
+            self._counts[old.status] -= 1
+            self._counts[value.status] += 1
+
+    def __delitem__(self, index) -> None:
+        old = self[index]
+        super().__delitem__(index)
+        self._discard(old if isinstance(index, slice) else [old])
+
+    def copy(self) -> "ResultList":
+        return type(self)(self)
+
+
+class _ColumnarResultView(InsoResult):
+    """A result read from ColumnarResults; assignments are written back to it."""
+
+    _store: Any = PrivateAttr(default=None)
+    _index: int = PrivateAttr(default=0)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in InsoResult.model_fields and self._store is not None:
+            self._store._set(self._index, name, value)
+
+    # Copies are plain results detached from the store, rather than views
+    # of the same type, so the return type is deliberately wider.
+    def model_copy(  # type: ignore[override]
+        self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False
+    ) -> InsoResult:
+        result = InsoResult(**self.__dict__)
+        return result.model_copy(update=update, deep=deep)
+
+
+def _field_defaults(model: type[BaseModel], exclude: Iterable[str]) -> Dict[str, Any]:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if name not in exclude
+    }
+
+
+class ColumnarResults:
+    """
+    Array-backed alternative to ResultList for runs with very many results.
+
+    IDs, statuses and durations are kept in flat arrays, and descriptions,
+    request IDs and subtest paths are interned in a string table, so a
+    request that runs thousands of iterations stores its name once. Fields
+    without a column are only stored for the results where they are set.
+
+    Items are materialized as InsoResult views on access and serialize to
+    the same JSON as a list of results.
+    """
+
+    COLUMNS: ClassVar[tuple[str, ...]] = (
+        "id",
+        "status",
+        "description",
+        "request_id",
+        "path",
+        "duration_ms",
+    )
+    PATH_SEPARATOR: ClassVar[str] = "\x1f"
+    _STATUSES: ClassVar[tuple[InsoStatus, ...]] = tuple(InsoStatus)
+    _STATUS_CODES: ClassVar[Dict[InsoStatus, int]] = {
+        status: code for code, status in enumerate(InsoStatus)
+    }
+    # Defaults of the remaining fields, which are all immutable.
+    _EXTRA_DEFAULTS: ClassVar[Dict[str, Any]] = _field_defaults(InsoResult, COLUMNS)
+
+    def __init__(self, results: Iterable[ResultFields] = ()):
+        self._reset()
+        self.extend(results)
+
+    def _reset(self) -> None:
+        self._ids = array("I")
+        self._statuses = bytearray()
+        self._descriptions = array("I")
+        self._request_ids = array("i")
+        self._paths = array("I")
+        self._durations = array("d")
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        self._counts = {status: 0 for status in InsoStatus}
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        # Results are streamed to the serializer instead of being
+        # materialized as a list first.
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.wrap_serializer_function_ser_schema(
+                lambda value, serialize, info: (
+                    serialize(iter(value))
+                    if info.mode_is_json()
+                    else list(serialize(iter(value)))
+                ),
+                info_arg=True,
+                schema=core_schema.generator_schema(
+                    handler.generate_schema(InsoResult)
+                ),
+            ),
+        )
+
+    def _intern(self, value: str) -> int:
+        index = self._string_index.get(value)
+        if index is None:
+            index = self._string_index[value] = len(self._strings)
+            self._strings.append(value)
+        return index
+
+    def tally(self, status: InsoStatus) -> int:
+        return self._counts[status]
+
+    def append(self, result: ResultFields) -> None:
+        status = result.status
+        request_id = result.request_id
+        duration = result.duration_ms
+
+        self._ids.append(result.id)
+        self._statuses.append(self._STATUS_CODES[status])
+        self._descriptions.append(self._intern(result.description))
+        self._request_ids.append(-1 if request_id is None else self._intern(request_id))
+        self._paths.append(self._intern(self.PATH_SEPARATOR.join(result.path)))
+        self._durations.append(math.nan if duration is None else duration)
+
+        extras = {}
+        for name, default in self._EXTRA_DEFAULTS.items():
+            value = getattr(result, name)
+            if value != default:
+                extras[name] = value
+        if extras:
+            self._extras[len(self._ids) - 1] = extras
+        self._counts[status] += 1
+
+    def extend(self, results: Iterable[ResultFields]) -> None:
+        for result in results:
+            self.append(result)
+
+    def __iadd__(self, results: Iterable[ResultFields]) -> "ColumnarResults":
+        self.extend(results)
+        return self
+
+    def clear(self) -> None:
+        self._reset()
+
+    def _set(self, index: int, name: str, value: Any) -> None:
+        if name == "id":
+            self._ids[index] = value
+        elif name == "status":
+            self._counts[self._STATUSES[self._statuses[index]]] -= 1
+            self._statuses[index] = self._STATUS_CODES[value]
+            self._counts[value] += 1
+        elif name == "description":
+            self._descriptions[index] = self._intern(value)
+        elif name == "request_id":
+            self._request_ids[index] = -1 if value is None else self._intern(value)
+        elif name == "path":
+            self._paths[index] = self._intern(self.PATH_SEPARATOR.join(value))
+        elif name == "duration_ms":
+            self._durations[index] = math.nan if value is None else value
+        elif value != self._EXTRA_DEFAULTS[name]:
+            self._extras.setdefault(index, {})[name] = value
+        elif index in self._extras:
+            self._extras[index].pop(name, None)
+
+    def _view(self, index: int) -> _ColumnarResultView:
+        request_id = self._request_ids[index]
+        path = self._strings[self._paths[index]]
+        duration = self._durations[index]
+        view = _ColumnarResultView(
+            id=self._ids[index],
+            status=self._STATUSES[self._statuses[index]],
+            description=self._strings[self._descriptions[index]],
+            request_id=None if request_id < 0 else self._strings[request_id],
+            path=path.split(self.PATH_SEPARATOR) if path else [],
+            duration_ms=None if math.isnan(duration) else duration,
+            **self._extras.get(index, {}),
+        )
+        view._store = self
+        view._index = index
+        return view
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[InsoResult]:
+        for index in range(len(self._ids)):
+            yield self._view(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._view(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return self._view(index)
+
+    def __setitem__(self, index: int, result: ResultFields) -> None:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        self._extras.pop(index, None)
+        for name in InsoResult.model_fields:
+            self._set(index, name, getattr(result, name))
+
+
+class ShardSummary(BaseModel):
+    index: int
+    item_count: int
+    wall_time: float
+    estimated_time: Optional[float] = None
+
+
+class SourceSummary(BaseModel):
+    """Counts of one of the reports combined by `merge`."""
+
+    name: str
+    target_name: Optional[str] = None
+    run_type: RunType = RunType.COLLECTION
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+class IterationSummary(BaseModel):
+    """Outcome of one test across every iteration of an iteration run."""
+
+    description: str
+    request_id: Optional[str] = None
+    runs: int = 0
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    first_failed_iteration: Optional[int] = None
+
+    @property
+    def failure_rate(self) -> float:
+        if self.runs == 0:
+            return 0.0
+        return (self.failed / self.runs) * 100.0
+
+
+class RawOutputFile(BaseModel):
+    """Location of the full raw output when it was too large to keep in memory."""
+
+    path: str
+    size: int
+    head_end: int
+    tail_start: int
+    # The part of a merged report the output belongs to, such as "Shard 1/3".
+    label: Optional[str] = None
+
+
+class FlakyTest(BaseModel):
+    """A test that kept flipping between passing and failing in past runs."""
+
+    description: str
+    request_id: Optional[str] = None
+    runs: int
+    failures: int
+    # Number of times the status changed from one run to the next.
+    flips: int
+
+    @property
+    def flake_rate(self) -> float:
+        return self.flips / (self.runs - 1) * 100 if self.runs > 1 else 0.0
+
+
+class ResultChange(BaseModel):
+    """A result whose status or duration differs from the baseline run."""
+
+    description: str
+    request_id: Optional[str] = None
+    status: Optional[InsoStatus] = None
+    baseline_status: Optional[InsoStatus] = None
+    duration_ms: Optional[float] = None
+    baseline_duration_ms: Optional[float] = None
+
+
+class ReportDiff(BaseModel):
+    """Differences between a run and a baseline report of the same tests."""
+
+    baseline: str
+    newly_failing: List[ResultChange] = Field(default_factory=list)
+    newly_passing: List[ResultChange] = Field(default_factory=list)
+    added: List[ResultChange] = Field(default_factory=list)
+    removed: List[ResultChange] = Field(default_factory=list)
+    slower: List[ResultChange] = Field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.newly_failing
+            or self.newly_passing
+            or self.added
+            or self.removed
+            or self.slower
+        )
 
 
 class InsoRunReport(BaseModel):
+    # Keeps `results` a ResultList when it is reassigned.
+    model_config = ConfigDict(validate_assignment=True)
+
     run_type: RunType = RunType.COLLECTION
     target_name: Optional[str] = None
     raw_output: Optional[str] = None
+    raw_output_file: Optional[RawOutputFile] = None
+    # Full raw output of the reports merged into this one.
+    raw_output_files: List[RawOutputFile] = Field(default_factory=list)
     tap_version: int = 13
     plan_start: int = 1
     plan_end: int
-    results: List[InsoResult] = Field(default_factory=list)
+    results: Union[ResultList, ColumnarResults] = Field(default_factory=ResultList)
+    request_durations: Dict[str, float] = Field(default_factory=dict)
+    shards: List[ShardSummary] = Field(default_factory=list)
+    sources: List[SourceSummary] = Field(default_factory=list)
+    diff: Optional[ReportDiff] = None
+    known_flaky: List[FlakyTest] = Field(default_factory=list)
+    iterations: List[IterationSummary] = Field(default_factory=list)
+    # JSON Lines files holding every result of an iteration run.
+    iteration_logs: List[str] = Field(default_factory=list)
+    timed_out: bool = False
+    stalled: bool = False
+    completed_tests: Optional[int] = None
+    from_cache: bool = False
 
     @property
     def passed_count(self) -> int:
-        return sum(1 for r in self.results if r.status == InsoStatus.PASS)
+        return self.results.tally(InsoStatus.PASS)
 
     @property
     def failed_count(self) -> int:
-        return sum(1 for r in self.results if r.status == InsoStatus.FAIL)
+        return self.results.tally(InsoStatus.FAIL)
 
     @property
     def skipped_count(self) -> int:
-        return sum(1 for r in self.results if r.status == InsoStatus.SKIP)
+        return self.results.tally(InsoStatus.SKIP)
+
+    @property
+    def flaky_count(self) -> int:
+        return sum(1 for result in self.results if result.flaky)
 
     @property
     def total_tests(self) -> int:
@@ -72,6 +579,8 @@ class InsoCollectionOptions(BaseModel):
     data_folders: Optional[List[str]] = None
     verbose: bool = False
     execution_timeout: int = 300
+    stall_timeout: Optional[int] = None
+    restart_on_stall: bool = False
 
 
 class InsoTestOptions(BaseModel):
@@ -89,3 +598,4 @@ class InsoTestOptions(BaseModel):
     data_folders: Optional[List[str]] = None
     verbose: bool = False
     execution_timeout: int = 300
+    stall_timeout: Optional[int] = None
@@ -0,0 +1,116 @@
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, Callable, List, Protocol, Sequence
+
+from .junit import JUnitWriter
+from .models import InsoResult, InsoRunReport
+
+OUTPUT_FORMATS = ("markdown", "json", "jsonl", "junit")
+
+
+def parse_output(spec: str) -> tuple[str, str]:
+    """Splits a `FORMAT=PATH` output option into its format and path."""
+    output_format, separator, path = spec.partition("=")
+    output_format = output_format.strip().lower()
+    if not separator or not path:
+        raise ValueError(f"Invalid output: '{spec}'. Expected FORMAT=PATH.")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unsupported output format: '{output_format}'. "
+            f"Currently supported: {', '.join(OUTPUT_FORMATS)}"
+        )
+    return output_format, path
+
+
+class _ResultSink(Protocol):
+    """Receives the results of a report one by one."""
+
+    def add(self, result: InsoResult) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class _JsonSink:
+    """
+    Writes the report as JSON with its results streamed one by one.
+
+    The results come last, after every other field of the report.
+    """
+
+    def __init__(self, handle: IO[str], report: InsoRunReport):
+        self.handle = handle
+        head = report.model_dump_json(exclude={"results"})
+        handle.write(head[:-1])
+        handle.write(',"results":[')
+        self._first = True
+
+    def add(self, result: InsoResult) -> None:
+        if not self._first:
+            self.handle.write(",")
+        self._first = False
+        self.handle.write(result.model_dump_json())
+
+    def close(self) -> None:
+        self.handle.write("]}\n")
+
+
+class _JsonLinesSink:
+    """Writes one JSON object per result."""
+
+    def __init__(self, handle: IO[str]):
+        self.handle = handle
+
+    def add(self, result: InsoResult) -> None:
+        self.handle.write(result.model_dump_json())
+        self.handle.write("\n")
+
+    def close(self) -> None:
+        pass
+
+
+def write_json(report: InsoRunReport, handle: IO[str]) -> None:
+    """Writes the report as JSON, streaming its results."""
+    sink = _JsonSink(handle, report)
+    for result in report.results:
+        sink.add(result)
+    sink.close()
+
+
+def write_outputs(
+    report: InsoRunReport,
+    outputs: Sequence[tuple[str, str]],
+    render_markdown: Callable[[InsoRunReport], str],
+) -> None:
+    """
+    Writes the report to each `(format, path)` in `outputs`.
+
+    The JSON, JSON Lines and JUnit files are filled together in a single
+    pass over the results. Markdown is rendered by `render_markdown`, which
+    keeps to its own size budget.
+
+    This runs on the finished report rather than from the runner's
+    `on_result` callback: durations, request IDs, retries, iteration
+    summaries and timeout results are only settled once the run is over.
+    """
+    sinks: List[_ResultSink] = []
+    with ExitStack() as stack:
+        for output_format, path in outputs:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            handle: IO[str] = stack.enter_context(open(path, "w", encoding="utf-8"))
+            if output_format == "markdown":
+                handle.write(render_markdown(report))
+                handle.write("\n")
+            elif output_format == "json":
+                sinks.append(_JsonSink(handle, report))
+            elif output_format == "jsonl":
+                sinks.append(_JsonLinesSink(handle))
+            elif output_format == "junit":
+                name = report.target_name or "insomnia-run"
+                sinks.append(stack.enter_context(JUnitWriter(handle, name)))
+
+        if sinks:
+            for result in report.results:
+                for sink in sinks:
+                    sink.add(result)
+            for sink in sinks:
+                sink.close()
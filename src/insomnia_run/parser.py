@@ -1,47 +1,336 @@
 import re
+from typing import Any, Iterable, Iterator, Optional, Sequence
 
-from .models import InsoResult, InsoRunReport, InsoStatus
+from .models import (
+    ColumnarResults,
+    InsoResult,
+    InsoRunReport,
+    InsoStatus,
+    TapDiagnostic,
+)
+
+
+def _build_result(values: dict[str, Any]) -> InsoResult:
+    # The model's own validator, called without the keyword handling of
+    # __init__ and model_validate, is the cheapest way to build a model.
+    return InsoResult.__pydantic_validator__.validate_python(values)
+
+
+class _TapRecord:
+    """
+    A result as the columnar parser builds it from a test line.
+
+    Records are stored as they are in ColumnarResults, so no InsoResult
+    model is built unless a result is handed out of the parser.
+    """
+
+    __slots__ = (
+        "id",
+        "status",
+        "description",
+        "path",
+        "duration_ms",
+        "diagnostic_raw",
+        "result",
+    )
+
+    # Fields the parser never sets keep their defaults on the class.
+    request_id: Optional[str] = None
+    iteration: Optional[int] = None
+    flaky: bool = False
+    diagnostic: Optional[TapDiagnostic] = None
+
+    def __init__(
+        self, id: int, status: InsoStatus, description: str, path: Sequence[str]
+    ):
+        self.id = id
+        self.status = status
+        self.description = description
+        self.path = path
+        self.duration_ms: Optional[float] = None
+        self.diagnostic_raw: Optional[str] = None
+        # The model handed out for this record, once there is one.
+        self.result: Optional[InsoResult] = None
+
+    def to_result(self) -> InsoResult:
+        if self.result is None:
+            values: dict[str, Any] = {
+                "id": self.id,
+                "status": self.status,
+                "description": self.description,
+            }
+            # Fields still at their defaults are left out, which is faster.
+            if self.path:
+                values["path"] = self.path
+            if self.duration_ms is not None:
+                values["duration_ms"] = self.duration_ms
+            if self.diagnostic_raw is not None:
+                values["diagnostic_raw"] = self.diagnostic_raw
+            self.result = _build_result(values)
+        return self.result
+
+    def update(self, name: str, value: Any) -> None:
+        """Sets a field on the record and on the model made from it."""
+        setattr(self, name, value)
+        if self.result is not None:
+            setattr(self.result, name, value)
 
 
 class TapParser:
-    VERSION = r"^TAP version (\d+)$"
-    PLAN = r"^(\d+)\.\.(\d+)$"
-    TEST_LINE = r"^(ok|not ok)\s+(\d+)\s+(?:-\s+)?(.*)$"
-    SKIP_DIRECTIVE = r"#\s*SKIP"
+    VERSION = re.compile(r"TAP version (\d+)$")
+    PLAN = re.compile(r"(\d+)\.\.(\d+)$")
+    TEST_LINE = re.compile(r"(ok|not ok)\s+(\d+)\s+(?:-\s+)?(.*)$")
+    SKIP_DIRECTIVE = re.compile(r"#\s*SKIP", re.IGNORECASE)
 
-    def parse(self, output: str) -> InsoRunReport:
-        report = InsoRunReport(plan_end=0)
+    def __init__(self, columnar: bool = False, retain: bool = True):
+        """
+        With `columnar`, results are kept in a ColumnarResults store, which
+        is much more compact for runs with very many results. Without
+        `retain`, results are only returned and never added to the report.
+        """
+        self.columnar = columnar
+        self.retain = retain
+        self._reset()
 
-        lines = output.strip().split("\n")
-        for line in lines:
-            line = line.strip()
+    def _reset(self) -> None:
+        self.report = InsoRunReport(plan_end=0)
+        self._columns: ColumnarResults | None = None
+        if self.columnar:
+            self.report.results = self._columns = ColumnarResults()
+        self._pending = ""
+        self._last_result: InsoResult | _TapRecord | None = None
+        self._stored_index: int | None = None
+        self._result_indent = 0
+        self._in_diagnostic = False
+        self._diagnostic_lines: list[str] = []
+        # Open subtests as [indent, name, leaf count], outermost first.
+        self._subtests: list[list] = []
+        self._subtest_name: str | None = None
+        self._nested = False
+        self._results_seen = 0
 
-            match = re.search(self.VERSION, line)
-            if match:
-                report.tap_version = int(match.group(1))
-                continue
+    def _parse_diagnostic(self, raw_line: str, line: str) -> None:
+        # Lines are only collected here; decoding waits until the details
+        # are asked for. The duration is the one field needed eagerly.
+        if line == "...":
+            self._end_diagnostic()
+            return
+        self._diagnostic_lines.append(raw_line.rstrip("\r\n"))
+        if line.startswith("duration_ms:") and self._last_result is not None:
+            try:
+                self._update_last("duration_ms", float(line[12:].strip()))
+            except ValueError:
+                pass
 
-            match = re.search(self.PLAN, line)
-            if match:
-                report.plan_start = int(match.group(1))
-                report.plan_end = int(match.group(2))
-                continue
+    def _end_diagnostic(self) -> None:
+        if self._in_diagnostic and self._last_result is not None:
+            self._update_last("diagnostic_raw", "\n".join(self._diagnostic_lines))
+            if self._columns is not None and self._stored_index is not None:
+                # Columnar stores keep a copy taken when the result was
+                # appended, so the diagnostic is written back to it.
+                self._columns[self._stored_index] = self._last_result
+        self._in_diagnostic = False
+        self._diagnostic_lines = []
+
+    def _update_last(self, name: str, value: Any) -> None:
+        if isinstance(self._last_result, InsoResult):
+            setattr(self._last_result, name, value)
+        elif self._last_result is not None:
+            self._last_result.update(name, value)
+
+    def _enter_level(self, indent: int) -> int | None:
+        """
+        Tracks subtest nesting for a test or plan line at `indent`.
+
+        Returns the number of results in the subtest closed by this line, or
+        None when the line does not close one.
+        """
+        closed = None
+        while self._subtests and self._subtests[-1][0] > indent:
+            closed = self._subtests.pop()[2]
+            if self._subtests:
+                self._subtests[-1][2] += closed
+
+        if self._subtest_name is not None:
+            parent_indent = self._subtests[-1][0] if self._subtests else 0
+            if indent > parent_indent:
+                self._subtests.append([indent, self._subtest_name, 0])
+                self._nested = True
+            self._subtest_name = None
+        return closed
+
+    def _parse_line(self, raw_line: str) -> InsoResult | _TapRecord | None:
+        line = raw_line.strip()
+        if not line:
+            return None
+        indent = len(raw_line) - len(raw_line.lstrip()) if raw_line[0] in " \t" else 0
+
+        # YAML diagnostic blocks sit between `---` and `...`, indented deeper
+        # than the test line they describe.
+        if self._in_diagnostic:
+            if indent > self._result_indent:
+                self._parse_diagnostic(raw_line, line)
+                return None
+            self._end_diagnostic()
+        elif (
+            line == "---"
+            and indent > self._result_indent
+            and self._last_result is not None
+        ):
+            self._in_diagnostic = True
+            return None
+
+        # Dispatch on the first character so that log noise, comments and
+        # diagnostics are rejected without running any regex.
+        first = line[0]
+        if first == "o" or first == "n":
+            match = self.TEST_LINE.match(line)
+            if not match:
+                return None
 
-            match = re.search(self.TEST_LINE, line)
+            # A test line just outside a subtest with results is its summary;
+            # the results it summarizes have already been reported.
+            self._result_indent = indent
+            if self._subtests or self._subtest_name is not None:
+                if self._enter_level(indent):
+                    self._last_result = None
+                    return None
+
+            outcome, number, description = match.groups()
+
+            # Check for SKIP directive in description
+            if "#" in description and self.SKIP_DIRECTIVE.search(description):
+                status = InsoStatus.SKIP
+            elif outcome == "ok":
+                status = InsoStatus.PASS
+            else:
+                status = InsoStatus.FAIL
+
+            self._results_seen += 1
+            self._stored_index = None
+            # Subtests restart their numbering, so once nesting is seen
+            # results are numbered in the order they are reported.
+            test_id = self._results_seen if self._nested else int(number)
+            path = [name for _, name, _ in self._subtests] if self._subtests else ()
+            if self._columns is not None:
+                self._last_result = _TapRecord(test_id, status, description, path)
+            else:
+                values: dict[str, Any] = {
+                    "id": test_id,
+                    "status": status,
+                    "description": description,
+                }
+                if path:
+                    values["path"] = path
+                self._last_result = _build_result(values)
+            if self._subtests:
+                self._subtests[-1][2] += 1
+            return self._last_result
+
+        if first == "#":
+            if line.startswith("# Subtest"):
+                # A nested subtest announced before its parent's first line
+                # opens the parent first.
+                if self._subtest_name is not None:
+                    self._enter_level(indent)
+                self._subtest_name = line[9:].lstrip(":").strip() or "Subtest"
+        elif first.isdigit():
+            match = self.PLAN.match(line)
+            if match:
+                self._enter_level(indent)
+                if not self._subtests:
+                    self.report.plan_start = int(match.group(1))
+                    self.report.plan_end = int(match.group(2))
+        elif first == "T":
+            match = self.VERSION.match(line)
             if match:
-                status_str = match.group(1)
-                test_id = int(match.group(2))
-                description = match.group(3)
-
-                # Check for SKIP directive in description
-                if re.search(self.SKIP_DIRECTIVE, description, re.IGNORECASE):
-                    status = InsoStatus.SKIP
-                elif status_str == "ok":
-                    status = InsoStatus.PASS
-                else:
-                    status = InsoStatus.FAIL
-
-                result = InsoResult(id=test_id, status=status, description=description)
-                report.results.append(result)
-
-        return report
+                self.report.tap_version = int(match.group(1))
+
+        return None
+
+    @staticmethod
+    def result_of(record: InsoResult | _TapRecord) -> InsoResult:
+        """Returns the InsoResult for a record returned by `feed_record`."""
+        return record if isinstance(record, InsoResult) else record.to_result()
+
+    def feed_record(self, line: str) -> InsoResult | _TapRecord | None:
+        """
+        Like `feed_line`, but returns the parser's own record of the result.
+
+        Without `columnar` that is the InsoResult itself. Columnar parsers
+        keep lighter records, so callers that only need to know that a
+        result arrived can skip building its model; `result_of` builds it
+        on demand.
+        """
+        record = self._parse_line(line)
+        if record is not None and self.retain:
+            if self._columns is not None:
+                self._columns.append(record)
+                self._stored_index = len(self._columns) - 1
+            else:
+                self.report.results.append(self.result_of(record))
+        return record
+
+    def feed_line(self, line: str) -> InsoResult | None:
+        """
+        Parses a single line of TAP output into the parser's report.
+
+        Returns the test result produced by the line, or None when the line
+        is a version/plan header or unrelated output.
+        """
+        record = self.feed_record(line)
+        return self.result_of(record) if record is not None else None
+
+    def _feed_records(self, chunk: str) -> list[InsoResult | _TapRecord]:
+        lines = (self._pending + chunk).split("\n")
+        self._pending = lines.pop()
+
+        records = []
+        for line in lines:
+            record = self.feed_record(line)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def feed(self, chunk: str) -> list[InsoResult]:
+        """
+        Parses an arbitrary chunk of TAP output.
+
+        Chunks do not need to end on a line boundary; a trailing partial line
+        is held back until the next chunk or `close`.
+        """
+        return [self.result_of(record) for record in self._feed_records(chunk)]
+
+    def close(self) -> InsoRunReport:
+        """Flushes any buffered partial line and returns the report."""
+        if self._pending:
+            self.feed_record(self._pending)
+            self._pending = ""
+        self._end_diagnostic()
+        return self.report
+
+    def iter_results(self, stream: Iterable[str]) -> Iterator[InsoResult]:
+        """
+        Yields results from a line iterable such as an open text file.
+
+        Results are not retained on the report, so arbitrarily long streams
+        are parsed in constant memory. Version and plan headers are still
+        recorded on `report`. Each result is yielded once the next result (or
+        the end of the stream) is reached, so its diagnostic block has
+        already been applied.
+        """
+        pending = None
+        for line in stream:
+            record = self._parse_line(line)
+            if record is not None:
+                if pending is not None:
+                    yield self.result_of(pending)
+                pending = record
+        self._end_diagnostic()
+        if pending is not None:
+            yield self.result_of(pending)
+
+    def parse(self, output: str) -> InsoRunReport:
+        self._reset()
+        self._feed_records(output)
+        return self.close()
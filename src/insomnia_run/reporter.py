@@ -1,10 +1,196 @@
-from .models import InsoRunReport, InsoStatus, RunType
+import heapq
+import re
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+
+from .models import InsoResult, InsoRunReport, InsoStatus, RunType
+from .stats import percentile
+from .tree import ResultNode
+
+
+def _format_duration(duration_ms: float) -> str:
+    if duration_ms < 1000:
+        return f"{duration_ms:.0f} ms"
+    return f"{duration_ms / 1000:.1f}s"
+
+
+def _first_line(text: str) -> str:
+    return text.strip().splitlines()[0] if text.strip() else ""
+
+
+def _status_icon(status: InsoStatus) -> str:
+    if status == InsoStatus.PASS:
+        return "✅"
+    if status == InsoStatus.SKIP:
+        return "⏭️"
+    return "❌"
+
+
+def _code_fence(text: str) -> str:
+    """Returns a backtick fence longer than any backtick run in `text`."""
+    longest = max((len(run) for run in re.findall(r"`+", text)), default=0)
+    return "`" * max(3, longest + 1)
+
+
+def _node_counts(node: ResultNode) -> str:
+    counts = [f"{node.passed} passed"]
+    if node.failed:
+        counts.append(f"{node.failed} failed")
+    if node.skipped:
+        counts.append(f"{node.skipped} skipped")
+    return ", ".join(counts)
+
+
+class _Budget:
+    """Collects Markdown lines while they fit within a number of characters."""
+
+    def __init__(self, limit: int):
+        self.lines: list[str] = []
+        self.remaining = limit
+
+    def add(self, lines: Iterable[str]) -> bool:
+        """
+        Adds `lines` as a block: either all of them fit, or none is added.
+
+        Each line costs its length plus the newline that joins it.
+        """
+        block = list(lines)
+        cost = sum(len(line) + 1 for line in block)
+        if cost > self.remaining:
+            return False
+        self.lines.extend(block)
+        self.remaining -= cost
+        return True
+
+    def extend(self, lines: Iterable[str]) -> bool:
+        """Adds lines one by one until one does not fit."""
+        return all(self.add((line,)) for line in lines)
+
+
+# GitHub rejects issue and pull request comments longer than this.
+MAX_COMMENT_CHARS = 65536
 
 
 class Reporter:
-    def generate_markdown(
-        self, report: InsoRunReport, workflow_url: str | None = None
-    ) -> str:
+    SLOWEST_COUNT = 10
+
+    @staticmethod
+    def _failure_detail_lines(result: InsoResult, indent: str = "  ") -> list[str]:
+        diagnostic = result.decode_diagnostic()
+        if diagnostic is None:
+            return []
+
+        lines = []
+        if diagnostic.message:
+            lines.append(f"{indent}- {_first_line(diagnostic.message)}")
+        if diagnostic.expected is not None or diagnostic.actual is not None:
+            lines.append(
+                f"{indent}- Expected `{_first_line(diagnostic.expected or '')}`, "
+                f"got `{_first_line(diagnostic.actual or '')}`"
+            )
+        if diagnostic.at:
+            lines.append(f"{indent}- At `{_first_line(diagnostic.at)}`")
+        return lines
+
+    def _result_lines(
+        self, result: InsoResult, label: str, known_flaky: frozenset, indent: str = ""
+    ) -> list[str]:
+        if result.flaky:
+            note = " _(flaky: passed on retry)_"
+        elif (result.request_id, result.description) in known_flaky:
+            note = " _(known flaky)_"
+        else:
+            note = ""
+        lines = [f"{indent}- {_status_icon(result.status)} **{label}**{note}"]
+        if result.status == InsoStatus.FAIL:
+            lines.extend(self._failure_detail_lines(result, indent + "  "))
+        return lines
+
+    def _tree_lines(
+        self, node: ResultNode, known_flaky: frozenset, depth: int = 0
+    ) -> Iterator[str]:
+        """
+        Lists the results of a folder, then its subfolders.
+
+        Subfolders without failures collapse into a single line with their
+        counts; failing ones are expanded.
+        """
+        indent = "  " * depth
+        for result in node.results:
+            label = ResultNode.split_description(result)[1]
+            yield from self._result_lines(result, label, known_flaky, indent)
+        for child in node.children.values():
+            if child.failed:
+                icon = "❌"
+            elif child.passed:
+                icon = "✅"
+            else:
+                icon = "⏭️"
+            yield f"{indent}- {icon} **{child.name}** ({_node_counts(child)})"
+            if child.failed:
+                yield from self._tree_lines(child, known_flaky, depth + 1)
+
+    def _timing_lines(self, report: InsoRunReport) -> list[str]:
+        timed: list[tuple[float, InsoResult]] = [
+            (r.duration_ms, r) for r in report.results if r.duration_ms is not None
+        ]
+        if not timed:
+            return []
+
+        durations = sorted(duration_ms for duration_ms, _ in timed)
+        lines = ["### Timings", ""]
+        lines.append(
+            f"- **Total:** {_format_duration(sum(durations))} · "
+            f"**p50:** {_format_duration(percentile(durations, 50))} · "
+            f"**p95:** {_format_duration(percentile(durations, 95))} · "
+            f"**max:** {_format_duration(durations[-1])}"
+        )
+        lines.append("")
+        lines.append(f"| Slowest {min(self.SLOWEST_COUNT, len(timed))} | Duration |")
+        lines.append("|------|----------|")
+        for duration_ms, result in heapq.nlargest(
+            self.SLOWEST_COUNT, timed, key=lambda timing: timing[0]
+        ):
+            lines.append(f"| {result.description} | {_format_duration(duration_ms)} |")
+        lines.append("")
+        return lines
+
+    def _iteration_lines(self, report: InsoRunReport) -> list[str]:
+        if not report.iterations:
+            return []
+
+        runs = sum(summary.runs for summary in report.iterations)
+        iterations = max(summary.runs for summary in report.iterations)
+        failing = sorted(
+            (summary for summary in report.iterations if summary.failed),
+            key=lambda summary: (-summary.failure_rate, summary.description),
+        )
+
+        lines = ["### Iterations", ""]
+        lines.append(
+            f"- **{runs} runs** of {len(report.iterations)} tests "
+            f"over {iterations} iterations"
+        )
+        stable = len(report.iterations) - len(failing)
+        if stable:
+            lines.append(f"- **{stable} tests** never failed")
+        for log in report.iteration_logs:
+            lines.append(f"- Per-iteration results: `{log}`")
+        lines.append("")
+
+        if failing:
+            lines.append("| Test | Runs | Failed | Failure rate | First failure |")
+            lines.append("|------|------|--------|--------------|---------------|")
+            for summary in failing:
+                lines.append(
+                    f"| {summary.description} | {summary.runs} | {summary.failed} | "
+                    f"{summary.failure_rate:.1f}% | #{summary.first_failed_iteration} |"
+                )
+            lines.append("")
+        return lines
+
+    @staticmethod
+    def _summary_lines(report: InsoRunReport) -> list[str]:
         lines = []
 
         run_label = (
@@ -29,34 +215,294 @@ class Reporter:
         lines.append(f"- **{report.total_tests} requests executed** {passed_text}")
         if report.target_name:
             lines.append(f"- **Target:** `{report.target_name}`")
+        if report.from_cache:
+            lines.append("- **Served from cache** (workspace and options unchanged)")
+        flaky_count = report.flaky_count
+        if flaky_count:
+            lines.append(f"- **{flaky_count} flaky** (failed, then passed on retry)")
+        if report.known_flaky and report.failed_count:
+            flaky = {(test.request_id, test.description) for test in report.known_flaky}
+            flaky_failures = sum(
+                1
+                for result in report.results
+                if result.status == InsoStatus.FAIL
+                and (result.request_id, result.description) in flaky
+            )
+            if flaky_failures:
+                lines.append(
+                    f"- **{flaky_failures} of the failures** are known to be flaky"
+                )
+        if report.timed_out or report.stalled:
+            reason = "Timed out" if report.timed_out else "Stalled"
+            planned = f" of {report.plan_end} planned" if report.plan_end else ""
+            lines.append(
+                f"- **{reason}** after {report.completed_tests}{planned} tests completed"
+            )
         lines.append("")
+        return lines
 
-        lines.append("### Test Results")
-        lines.append("")
-        for result in report.results:
-            if result.status == InsoStatus.PASS:
-                icon = "✅"
-            elif result.status == InsoStatus.SKIP:
-                icon = "⏭️"
-            else:
-                icon = "❌"
-            lines.append(f"- {icon} **{result.description}**")
+    @staticmethod
+    def _diff_lines(report: InsoRunReport) -> Iterator[str]:
+        diff = report.diff
+        if diff is None:
+            return
+
+        yield "### Changes Since Baseline"
+        yield ""
+        if not diff.has_changes:
+            yield f"- No changes in results or durations since `{diff.baseline}`"
+            yield ""
+            return
+
+        groups = (
+            ("❌", "newly failing", diff.newly_failing),
+            ("✅", "newly passing", diff.newly_passing),
+            ("🆕", "added", diff.added),
+            ("🗑️", "removed", diff.removed),
+        )
+        for icon, label, changes in groups:
+            if not changes:
+                continue
+            yield f"- {icon} **{len(changes)} {label}**"
+            for change in changes:
+                yield f"  - {change.description}"
+
+        # Slower results always have both durations.
+        slower: list[tuple[float, float, str]] = [
+            (c.baseline_duration_ms, c.duration_ms, c.description)
+            for c in diff.slower
+            if c.baseline_duration_ms is not None and c.duration_ms is not None
+        ]
+        if slower:
+            yield f"- 🐢 **{len(slower)} slower**"
+            for before, after, description in sorted(
+                slower, key=lambda timing: timing[0] - timing[1]
+            ):
+                increase = after / before - 1 if before else 0.0
+                yield (
+                    f"  - {description}: {_format_duration(before)} → "
+                    f"{_format_duration(after)} (+{increase:.0%})"
+                )
+        yield ""
+
+    def _results_section(
+        self, report: InsoRunReport, known_flaky: frozenset
+    ) -> Iterator[str]:
+        yield "### Test Results"
+        yield ""
+        tree = ResultNode.build(report.results)
+        if tree.children:
+            yield from self._tree_lines(tree, known_flaky)
+        else:
+            for result in report.results:
+                yield from self._result_lines(result, result.description, known_flaky)
+        yield ""
+
+    @staticmethod
+    def _shard_lines(report: InsoRunReport) -> list[str]:
+        if not report.shards:
+            return []
+
+        lines = ["### Shards", ""]
+        lines.append("| Shard | Items | Wall time | Estimated |")
+        lines.append("|-------|----------|-----------|-----------|")
+        for shard in report.shards:
+            estimated = (
+                f"{shard.estimated_time:.1f}s"
+                if shard.estimated_time is not None
+                else "—"
+            )
+            lines.append(
+                f"| {shard.index} | {shard.item_count} | {shard.wall_time:.1f}s | {estimated} |"
+            )
         lines.append("")
+        return lines
 
-        lines.append("### Additional Information")
+    @staticmethod
+    def _source_lines(report: InsoRunReport) -> list[str]:
+        if not report.sources:
+            return []
+
+        lines = ["### Sources", ""]
+        lines.append("| Source | Target | Passed | Failed | Skipped |")
+        lines.append("|--------|--------|--------|--------|---------|")
+        for source in report.sources:
+            icon = "❌" if source.failed else "✅"
+            lines.append(
+                f"| {icon} `{source.name}` | {source.target_name or '—'} | "
+                f"{source.passed} | {source.failed} | {source.skipped} |"
+            )
         lines.append("")
+        return lines
+
+    @staticmethod
+    def _information_lines(
+        report: InsoRunReport, workflow_url: str | None
+    ) -> list[str]:
+        lines = ["### Additional Information", ""]
         if workflow_url:
             lines.append(f"Check the [workflow logs]({workflow_url}) for details")
         else:
             lines.append("Check the workflow logs for details")
         lines.append("")
 
-        if report.raw_output:
-            lines.append("<details><summary>View raw output</summary>")
+        files = [report.raw_output_file] if report.raw_output_file else []
+        files.extend(report.raw_output_files)
+        for file in files:
+            part = f" of {file.label}" if file.label else ""
+            lines.append(f"- Full raw output{part}: `{file.path}` ({file.size} bytes)")
+        if files:
             lines.append("")
-            lines.append("```")
-            lines.append(report.raw_output.strip())
-            lines.append("```")
-            lines.append("</details>")
+        return lines
+
+    @staticmethod
+    def _raw_output_lines(raw_output: str, summary: str) -> list[str]:
+        fence = _code_fence(raw_output)
+        return [
+            f"<details><summary>{summary}</summary>",
+            "",
+            fence,
+            raw_output,
+            fence,
+            "</details>",
+        ]
+
+    def generate_markdown(
+        self,
+        report: InsoRunReport,
+        workflow_url: str | None = None,
+        max_chars: Optional[int] = MAX_COMMENT_CHARS,
+    ) -> str:
+        """
+        Renders the report as Markdown of at most `max_chars` characters.
+
+        The full report is rendered while it fits. Otherwise the report is
+        rendered again by priority: the summary, then failures, then the
+        tail of the raw output, with passing results reduced to a count.
+        `max_chars=None` never truncates.
+        """
+        # Tests of this report that history marks as flaky.
+        known_flaky = frozenset(
+            (test.request_id, test.description) for test in report.known_flaky
+        )
+        raw_output = report.raw_output.strip() if report.raw_output else ""
+        sections = chain(
+            self._summary_lines(report),
+            self._diff_lines(report),
+            self._results_section(report, known_flaky),
+            self._iteration_lines(report),
+            self._timing_lines(report),
+            self._shard_lines(report),
+            self._source_lines(report),
+            self._information_lines(report, workflow_url),
+            self._raw_output_lines(raw_output, "View raw output") if raw_output else (),
+        )
+        if max_chars is None:
+            return "\n".join(sections)
+
+        # Lines are produced lazily, so an oversized report is abandoned as
+        # soon as the budget runs out.
+        full = _Budget(max_chars)
+        if full.extend(sections):
+            return "\n".join(full.lines)
+        return self._truncated_markdown(
+            report, workflow_url, max_chars, raw_output, known_flaky
+        )
+
+    def _truncated_markdown(
+        self,
+        report: InsoRunReport,
+        workflow_url: str | None,
+        max_chars: int,
+        raw_output: str,
+        known_flaky: frozenset,
+    ) -> str:
+        # Sections are filled in order of priority, each from what the
+        # previous ones left, and assembled in the usual order afterwards.
+        summary = _Budget(max_chars)
+        summary.extend(self._summary_lines(report))
+        summary.extend(
+            (
+                f"> ⚠️ This report was shortened to fit {max_chars} characters: "
+                "passing results are only counted and the raw output is cut "
+                "to its last lines.",
+                "",
+            )
+        )
 
-        return "\n".join(lines)
+        fixed = _Budget(summary.remaining)
+        fixed.extend(
+            chain(
+                self._timing_lines(report),
+                self._shard_lines(report),
+                self._source_lines(report),
+                self._information_lines(report, workflow_url),
+            )
+        )
+
+        # What changed is shown before the failures, but may only take half
+        # of what is left so that it cannot crowd them out.
+        cut_lines = ("  - …", "")
+        cut_cost = sum(len(line) + 1 for line in cut_lines)
+        changes = _Budget(fixed.remaining // 2 - cut_cost)
+        if not changes.extend(self._diff_lines(report)) and changes.lines:
+            changes.remaining += cut_cost
+            changes.add(cut_lines)
+        used = sum(len(line) + 1 for line in changes.lines)
+
+        more_line = f"- ❌ … and {report.failed_count} more failures"
+        results = _Budget(fixed.remaining - used - len(more_line) - 2)
+        results.extend(("### Test Results", ""))
+        if report.passed_count:
+            results.add((f"- ✅ **{report.passed_count} passed**",))
+        if report.skipped_count:
+            results.add((f"- ⏭️ **{report.skipped_count} skipped**",))
+        shown = 0
+        for result in report.results:
+            if result.status != InsoStatus.FAIL:
+                continue
+            label = ResultNode.FOLDER_SEPARATOR.join([*result.path, result.description])
+            if not results.add(self._result_lines(result, label, known_flaky)):
+                break
+            shown += 1
+        results.remaining += len(more_line) + 2
+        if shown < report.failed_count:
+            results.add((f"- ❌ … and {report.failed_count - shown} more failures",))
+        results.add(("",))
+
+        iterations = _Budget(results.remaining)
+        iterations.extend(self._iteration_lines(report))
+        if iterations.lines and iterations.lines[-1] != "":
+            iterations.add(("",))
+
+        raw = _Budget(iterations.remaining)
+        if raw_output:
+            label = f"View raw output (last {{}} of {len(raw_output)} characters)"
+            # The fences are counted at their longest, as the whole output
+            # may need longer ones than the empty text used here.
+            overhead = sum(
+                len(line) + 1
+                for line in self._raw_output_lines("", label.format(len(raw_output)))
+            )
+            available = raw.remaining - overhead - 2 * len(_code_fence(raw_output))
+            tail = raw_output[-available:] if available > 0 else ""
+            if len(tail) < len(raw_output):
+                # A cut tail starts at its first whole line; without one,
+                # only a note is left.
+                newline = tail.find("\n")
+                tail = tail[newline + 1 :] if newline != -1 else ""
+            if tail:
+                raw.add(self._raw_output_lines(tail, label.format(len(tail))))
+            else:
+                raw.add((f"_Raw output omitted ({len(raw_output)} characters)._",))
+
+        return "\n".join(
+            chain(
+                summary.lines,
+                changes.lines,
+                results.lines,
+                iterations.lines,
+                fixed.lines,
+                raw.lines,
+            )
+        )
@@ -0,0 +1,66 @@
+from .models import InsoResult, InsoRunReport, InsoStatus, ResultList
+
+
+def failed_request_ids(report: InsoRunReport) -> list[str]:
+    """Returns the request IDs behind failed results, in report order."""
+    request_ids: list[str] = []
+    for result in report.results:
+        if (
+            result.status == InsoStatus.FAIL
+            and result.request_id is not None
+            and result.request_id not in request_ids
+        ):
+            request_ids.append(result.request_id)
+    return request_ids
+
+
+def merge_rerun(original: InsoRunReport, rerun: InsoRunReport) -> InsoRunReport:
+    """
+    Folds the results of a re-run into a copy of the original report.
+
+    Results of re-run requests are matched by request ID, description and
+    occurrence, and take the new outcome while keeping their original ID.
+    A failure that passes on the re-run is marked flaky. Re-run results
+    with no counterpart are appended.
+    """
+    key_counts: dict[tuple[str | None, str], int] = {}
+    fresh: dict[tuple[str | None, str, int], InsoResult] = {}
+    for result in rerun.results:
+        key = (result.request_id, result.description)
+        occurrence = key_counts.get(key, 0)
+        key_counts[key] = occurrence + 1
+        fresh[(*key, occurrence)] = result
+
+    merged = original.model_copy(update={"results": ResultList()})
+    rerun_requests = {result.request_id for result in rerun.results}
+    key_counts.clear()
+    for result in original.results:
+        replacement = None
+        if result.request_id in rerun_requests:
+            key = (result.request_id, result.description)
+            occurrence = key_counts.get(key, 0)
+            key_counts[key] = occurrence + 1
+            replacement = fresh.pop((*key, occurrence), None)
+
+        if replacement is None:
+            merged.results.append(result)
+        else:
+            flaky = replacement.status == InsoStatus.PASS and (
+                result.flaky or result.status == InsoStatus.FAIL
+            )
+            merged.results.append(
+                replacement.model_copy(update={"id": result.id, "flaky": flaky})
+            )
+
+    next_id = max((result.id for result in merged.results), default=0) + 1
+    for result in fresh.values():
+        merged.results.append(result.model_copy(update={"id": next_id}))
+        next_id += 1
+
+    if rerun.raw_output:
+        merged.raw_output = "\n".join(
+            part
+            for part in (original.raw_output, "=== Re-run ===", rerun.raw_output)
+            if part
+        )
+    return merged
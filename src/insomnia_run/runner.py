@@ -1,4 +1,14 @@
+import os
+import re
+import signal
 import subprocess
+import tempfile
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Callable, Optional, Sequence
 
 from .models import (
     InsoCollectionOptions,
@@ -7,11 +17,163 @@ from .models import (
     InsoStatus,
     InsoTestOptions,
     RunType,
+    ShardSummary,
 )
+from .cache import ResultCache
+from .capture import OutputCapture
+from .collection import CollectionIndex
+from .datafiles import split_iteration_data
+from .iterations import IterationAggregator, RequestResolver, merge_iteration_reports
 from .parser import TapParser
+from .rerun import failed_request_ids, merge_rerun
+from .sharding import TimingStore, balance_items, merge_reports
+
+
+ResultCallback = Callable[[InsoResult], None]
+
+
+class _RequestTimer:
+    """
+    Measures per-request wall time from inso's `Running request` log lines.
+
+    Each request is assumed to run until the next one starts, and the last
+    one until the process exits.
+    """
+
+    REQUEST_START = re.compile(r"Running request: (.*?)\s*\b(req_[A-Za-z0-9_-]+)\s*$")
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.current_name: str | None = None
+        self._current: str | None = None
+        self._started = 0.0
+
+    def observe(self, line: str) -> None:
+        if "Running request" not in line:
+            return
+        match = self.REQUEST_START.search(line)
+        if match:
+            now = time.monotonic()
+            self.finish(now)
+            self.current_name = match.group(1) or match.group(2)
+            self._current = match.group(2)
+            self._started = now
+
+    def finish(self, now: float | None = None) -> None:
+        if self._current is not None:
+            now = time.monotonic() if now is None else now
+            self.durations[self._current] = (
+                self.durations.get(self._current, 0.0) + now - self._started
+            )
+            self._current = None
+            self.current_name = None
+
+
+class _Watchdog(threading.Thread):
+    """
+    Kills inso when the execution deadline passes or output stops arriving.
+
+    `reason` is set to "timeout" or "stall" once the process has been killed.
+    """
+
+    def __init__(
+        self,
+        kill: Callable[[], None],
+        timeout: float,
+        stall_timeout: float | None = None,
+    ):
+        super().__init__(daemon=True)
+        self.reason: str | None = None
+        self._kill = kill
+        self._stall_timeout = stall_timeout
+        self._deadline = time.monotonic() + timeout
+        self._last_activity = time.monotonic()
+        self._stopped = threading.Event()
+
+    def touch(self) -> None:
+        self._last_activity = time.monotonic()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        while True:
+            now = time.monotonic()
+            wake_at = self._deadline
+            if self._stall_timeout is not None:
+                stall_at = self._last_activity + self._stall_timeout
+                if now >= stall_at and now < self._deadline:
+                    self.reason = "stall"
+                    break
+                wake_at = min(wake_at, stall_at)
+            if now >= self._deadline:
+                self.reason = "timeout"
+                break
+            if self._stopped.wait(wake_at - now):
+                return
+        self._kill()
 
 
 class InsoRunner:
+    def __init__(
+        self,
+        on_result: Optional[ResultCallback] = None,
+        raw_output_limit: int = 64 * 1024,
+        raw_output_dir: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        columnar_results: bool = False,
+        iteration_log_dir: Optional[str] = None,
+        resolve_request_ids: bool = False,
+    ):
+        self.on_result = on_result
+        self.raw_output_limit = raw_output_limit
+        self.raw_output_dir = raw_output_dir
+        self.cache = cache
+        self.columnar_results = columnar_results
+        self.iteration_log_dir = iteration_log_dir
+        # Mapping the results of a multi-item run to requests scans the
+        # workspace files, so it is only done for callers that need it.
+        self.resolve_request_ids = resolve_request_ids
+        self._inso_version: Optional[str] = None
+
+    def inso_version(self) -> str:
+        if self._inso_version is None:
+            try:
+                completed = subprocess.run(
+                    ["inso", "--version"], capture_output=True, text=True, timeout=30
+                )
+                self._inso_version = completed.stdout.strip() or "unknown"
+            except (OSError, subprocess.SubprocessError):
+                self._inso_version = "unknown"
+        return self._inso_version
+
+    def _cached(
+        self,
+        options: InsoCollectionOptions | InsoTestOptions,
+        run: Callable[[], InsoRunReport],
+    ) -> InsoRunReport:
+        """
+        Serves a report from the cache, or runs and caches a clean result.
+
+        Only runs without failures, timeouts or stalls are stored, so a
+        transient failure is never replayed.
+        """
+        if self.cache is None:
+            return run()
+
+        key = self.cache.key(options, self.inso_version())
+        report = self.cache.get(key)
+        if report is not None:
+            return report
+
+        report = run()
+        if report.failed_count == 0 and not (report.timed_out or report.stalled):
+            try:
+                self.cache.put(key, report)
+            except OSError:
+                pass
+        return report
+
     @staticmethod
     def _base_cmd(run_type: RunType, working_dir: str, identifier: str | None):
         cmd = ["inso", "run", run_type.value]
@@ -91,10 +253,12 @@ class InsoRunner:
             cmd.append("--keepFile")
 
     @staticmethod
-    def _add_error_result_if_needed(report: InsoRunReport, result) -> None:
+    def _add_error_result_if_needed(
+        report: InsoRunReport, returncode: int, stderr: str
+    ) -> None:
         """Add a synthetic error result if inso CLI failed with no TAP output."""
-        if result.returncode != 0 and report.total_tests == 0:
-            error_msg = result.stderr.strip() or "Unknown error"
+        if returncode != 0 and report.total_tests == 0:
+            error_msg = stderr.strip() or "Unknown error"
             report.results.append(
                 InsoResult(
                     id=1,
@@ -103,68 +267,476 @@ class InsoRunner:
                 )
             )
 
+    @staticmethod
+    def _drain(stream: IO[str], capture: OutputCapture) -> None:
+        for line in stream:
+            capture.write(line)
+
+    def _capture(self) -> OutputCapture:
+        return OutputCapture(self.raw_output_limit, self.raw_output_dir)
+
+    @staticmethod
+    def _spawn(cmd: list[str]) -> subprocess.Popen:
+        # On POSIX inso gets its own process group so that a timeout can
+        # take down the node workers it spawns along with it.
+        return subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            start_new_session=os.name == "posix",
+        )
+
+    @staticmethod
+    def _kill(process: subprocess.Popen) -> None:
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            # Already gone, or the group cannot be signalled.
+            process.kill()
+
+    @staticmethod
+    def _record_interruption(
+        report: InsoRunReport,
+        description: str,
+        reason: str = "execution timed out",
+        mark_not_run: bool = True,
+        completed: Optional[int] = None,
+        fail_in_flight: bool = False,
+    ) -> None:
+        """
+        Keeps the results parsed before inso was killed and accounts for the rest.
+
+        Planned tests that never reported are added as skipped entries saying
+        they were not run for `reason`, followed by a failure with the given
+        description. With `fail_in_flight`, the first of them is the test
+        inso was stuck on and is recorded as that failure instead.
+        `completed` overrides the number of results when they were
+        aggregated.
+        """
+        report.completed_tests = report.total_tests if completed is None else completed
+
+        last_id = max((r.id for r in report.results), default=report.plan_start - 1)
+        not_run = range(last_id + 1, report.plan_end + 1) if mark_not_run else range(0)
+        failed_id = max(last_id, report.plan_end) + 1
+        if fail_in_flight and not_run:
+            failed_id, not_run = not_run[0], not_run[1:]
+
+        interrupted = [
+            InsoResult(
+                id=test_id, status=InsoStatus.SKIP, description=f"Not run: {reason}"
+            )
+            for test_id in not_run
+        ]
+        interrupted.append(
+            InsoResult(id=failed_id, status=InsoStatus.FAIL, description=description)
+        )
+        report.results.extend(sorted(interrupted, key=lambda result: result.id))
+
+    def _assign_request_ids(
+        self, report: InsoRunReport, options: InsoCollectionOptions
+    ) -> None:
+        if options.item and len(options.item) == 1:
+            # Everything in a single-item run belongs to that item.
+            for result in report.results:
+                result.request_id = result.request_id or options.item[0]
+        elif self.resolve_request_ids:
+            CollectionIndex.load(options.working_dir).assign_requests(
+                report.results, order=list(report.request_durations) or options.item
+            )
+
+    @staticmethod
+    def _apply_durations(report: InsoRunReport, gaps: Sequence[float]) -> None:
+        """
+        Fills in durations for results without one from a TAP diagnostic.
+
+        The time of the request that produced a result is preferred, since
+        inso prints collection TAP only once every request has finished. It
+        is split evenly across that request's results, so the request is
+        counted once when durations are summed. Otherwise the time since the
+        previous TAP result, given per result in `gaps`, is used.
+        """
+        shares = Counter(
+            result.request_id
+            for result in report.results
+            if result.duration_ms is None
+            and result.request_id in report.request_durations
+        )
+        for result, elapsed in zip(report.results, gaps):
+            if result.duration_ms is not None:
+                continue
+            seconds = elapsed
+            if result.request_id in report.request_durations:
+                seconds = (
+                    report.request_durations[result.request_id]
+                    / shares[result.request_id]
+                )
+            result.duration_ms = round(seconds * 1000, 3)
+
+    def _iteration_aggregator(
+        self,
+        options: InsoCollectionOptions | InsoTestOptions,
+        request_durations: dict[str, float],
+    ) -> Optional[IterationAggregator]:
+        if not isinstance(options, InsoCollectionOptions):
+            return None
+        if (options.iteration_count or 0) <= 1 and not options.iteration_data:
+            return None
+
+        if options.item and len(options.item) == 1:
+            item = options.item[0]
+
+            def resolve(result: InsoResult) -> Optional[str]:
+                return item
+
+        else:
+            index = CollectionIndex.load(options.working_dir)
+            resolvers: list[RequestResolver] = []
+
+            def resolve(result: InsoResult) -> Optional[str]:
+                # Collection TAP is printed once every request has run, so
+                # the execution order is complete by the first result.
+                if not resolvers:
+                    order = list(request_durations) or options.item
+                    resolvers.append(index.request_resolver(order, cycle=True))
+                return resolvers[0](result)
+
+        return IterationAggregator(self.iteration_log_dir, resolve, request_durations)
+
+    def _execute(
+        self,
+        cmd: list[str],
+        run_type: RunType,
+        options: InsoCollectionOptions | InsoTestOptions,
+    ) -> InsoRunReport:
+        """
+        Runs inso and parses its TAP output line by line as it is produced.
+
+        Results are handed to the ``on_result`` callback as soon as they are
+        parsed. Stderr is drained on a background thread so neither pipe can
+        fill up and block the child process. If the execution timeout fires,
+        or no output arrives within the stall timeout, the results parsed so
+        far are kept.
+        """
+        process = self._spawn(cmd)
+        # _spawn pipes both streams.
+        assert process.stdout is not None and process.stderr is not None
+
+        stderr_capture = self._capture()
+        stderr_reader = threading.Thread(
+            target=self._drain, args=(process.stderr, stderr_capture), daemon=True
+        )
+        stderr_reader.start()
+
+        watchdog = _Watchdog(
+            lambda: self._kill(process),
+            options.execution_timeout,
+            options.stall_timeout,
+        )
+        watchdog.start()
+
+        request_timer = _RequestTimer()
+        aggregator = self._iteration_aggregator(options, request_timer.durations)
+        parser = TapParser(columnar=self.columnar_results, retain=aggregator is None)
+        raw_output = self._capture()
+        gaps = array("d")
+        last_result_at = time.monotonic()
+        try:
+            for line in process.stdout:
+                watchdog.touch()
+                raw_output.write(line)
+                request_timer.observe(line)
+                # Results are only built as models when someone needs one.
+                record = parser.feed_record(line)
+                if record is not None:
+                    now = time.monotonic()
+                    if aggregator is None:
+                        gaps.append(now - last_result_at)
+                    else:
+                        aggregator.add(parser.result_of(record), now - last_result_at)
+                    last_result_at = now
+                    if self.on_result is not None:
+                        self.on_result(parser.result_of(record))
+            returncode = process.wait()
+        finally:
+            watchdog.stop()
+        in_flight = request_timer.current_name
+        request_timer.finish()
+        stderr_reader.join()
+
+        stderr_capture.copy_to(raw_output)
+        stderr = stderr_capture.getvalue()
+        stderr_capture.discard()
+
+        report = parser.close()
+        report.run_type = run_type
+        report.target_name = options.identifier
+        report.request_durations = request_timer.durations
+        if aggregator is not None:
+            aggregator.close()
+            report.results = aggregator.results()
+            report.iterations = aggregator.summaries
+            report.iteration_logs = [aggregator.log_path]
+        else:
+            if isinstance(options, InsoCollectionOptions):
+                self._assign_request_ids(report, options)
+            self._apply_durations(report, gaps)
+        completed = aggregator.runs if aggregator is not None else None
+
+        if watchdog.reason == "timeout":
+            report.timed_out = True
+            self._record_interruption(
+                report,
+                f"Inso CLI Error: Command timed out after {options.execution_timeout} seconds",
+                mark_not_run=aggregator is None,
+                completed=completed,
+            )
+            planned = f" of {report.plan_end} planned" if report.plan_end else ""
+            raw_output.write(
+                f"\nInso CLI timed out after {options.execution_timeout} seconds "
+                f"({report.completed_tests}{planned} tests completed)\n"
+            )
+        elif watchdog.reason == "stall":
+            report.stalled = True
+            target = f" while running '{in_flight}'" if in_flight else ""
+            restarting = (
+                isinstance(options, InsoCollectionOptions) and options.restart_on_stall
+            )
+            self._record_interruption(
+                report,
+                f"Inso CLI Error: No output for {options.stall_timeout} seconds{target}",
+                reason=f"no output for {options.stall_timeout} seconds",
+                mark_not_run=not restarting and aggregator is None,
+                completed=completed,
+                fail_in_flight=True,
+            )
+            raw_output.write(
+                f"\nInso CLI stalled with no output for {options.stall_timeout} seconds"
+                f"{target}\n"
+            )
+        else:
+            self._add_error_result_if_needed(report, returncode, stderr)
+
+        report.raw_output_file = raw_output.close()
+        report.raw_output = raw_output.getvalue()
+        return report
+
     def run_collection(self, options: InsoCollectionOptions) -> InsoRunReport:
+        return self._cached(options, lambda: self._run_collection(options))
+
+    def _run_collection(self, options: InsoCollectionOptions) -> InsoRunReport:
         cmd = self._base_cmd(
             RunType.COLLECTION, options.working_dir, options.identifier
         )
         self._apply_common_options(cmd, options)
         self._apply_collection_options(cmd, options)
 
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=options.execution_timeout)
-        except subprocess.TimeoutExpired:
-            report = InsoRunReport(plan_end=0, run_type=RunType.COLLECTION)
-            report.target_name = options.identifier
-            report.raw_output = f"Inso CLI timed out after {options.execution_timeout} seconds"
-            report.results.append(
-                InsoResult(
-                    id=1,
-                    status=InsoStatus.FAIL,
-                    description=f"Inso CLI Error: Command timed out after {options.execution_timeout} seconds",
-                )
+        started = time.monotonic()
+        report = self._execute(cmd, RunType.COLLECTION, options)
+        if report.stalled and options.restart_on_stall:
+            elapsed = time.monotonic() - started
+            report = self._restart_after_stall(options, report, elapsed)
+        return report
+
+    def retry_failed(
+        self,
+        report: InsoRunReport,
+        options: InsoCollectionOptions,
+        retries: int,
+        backoff: float = 0.0,
+    ) -> InsoRunReport:
+        """
+        Re-runs the requests behind failed results up to `retries` times.
+
+        Only the failed requests are passed to inso, as `--item`s. Retries
+        wait `backoff` seconds, doubled after every attempt, and bypass the
+        cache. Results that pass on a retry are marked flaky. Failures whose
+        request is unknown cannot be retried, so the runner should be
+        created with `resolve_request_ids`.
+        """
+        for attempt in range(retries):
+            request_ids = failed_request_ids(report)
+            if not request_ids:
+                break
+            if backoff > 0:
+                time.sleep(backoff * 2**attempt)
+            retry = self._run_collection(
+                options.model_copy(update={"item": request_ids})
             )
-            return report
+            report = merge_rerun(report, retry)
+        return report
 
-        full_output = result.stdout + result.stderr
+    def _restart_after_stall(
+        self, options: InsoCollectionOptions, report: InsoRunReport, elapsed: float
+    ) -> InsoRunReport:
+        """
+        Re-runs every request but the one inso stalled on.
+
+        Collection TAP is only printed once every request has run, so the
+        requests that finished before the stall have no results yet and are
+        run again. The stalled request stays recorded as a failure. The
+        restart gets whatever is left of the execution timeout.
+        """
+        try:
+            items = options.item or CollectionIndex.load(
+                options.working_dir
+            ).workspace_request_ids(options.identifier)
+        except ValueError:
+            # The requests of the collection are unknown, so none are restarted.
+            return report
+        started = list(report.request_durations)
+        if not started:
+            return report
+        remaining = [item for item in items if item != started[-1]]
+        budget = int(options.execution_timeout - elapsed)
+        if not remaining or budget < 1:
+            return report
 
-        parser = TapParser()
-        report = parser.parse(result.stdout)
-        report.raw_output = full_output
-        report.run_type = RunType.COLLECTION
-        report.target_name = options.identifier
+        rest = self.run_collection(
+            options.model_copy(update={"item": remaining, "execution_timeout": budget})
+        )
+        return merge_reports(
+            [report, rest],
+            run_type=RunType.COLLECTION,
+            target_name=options.identifier,
+            label="Run",
+        )
 
-        self._add_error_result_if_needed(report, result)
+    def _run_shard(
+        self, index: int, options: InsoCollectionOptions, estimate: float
+    ) -> tuple[InsoRunReport, ShardSummary]:
+        started = time.monotonic()
+        report = self.run_collection(options)
+        summary = ShardSummary(
+            index=index,
+            item_count=len(options.item or []),
+            wall_time=time.monotonic() - started,
+            estimated_time=estimate or None,
+        )
+        return report, summary
+
+    def run_collection_sharded(
+        self,
+        options: InsoCollectionOptions,
+        shards: int,
+        timings: TimingStore | None = None,
+    ) -> InsoRunReport:
+        """
+        Runs the collection as `shards` concurrent inso processes.
+
+        The requests given via `--item` (or, failing that, every request in
+        the workspace selected by `--identifier`) are balanced across shards using the durations in
+        `timings`, and the per-shard reports are merged into one. Measured
+        durations are written back to `timings` when given. ValueError is
+        raised when no `--item` is given and the working directory holds
+        several workspaces, none of which `--identifier` selects.
+        """
+        items = options.item or CollectionIndex.load(
+            options.working_dir
+        ).workspace_request_ids(options.identifier)
+        history = timings.durations if timings is not None else {}
+        groups, estimates = balance_items(items, shards, history)
+        if len(groups) <= 1:
+            return self.run_collection(options)
+
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            futures = [
+                pool.submit(
+                    self._run_shard,
+                    index,
+                    options.model_copy(update={"item": group}),
+                    estimate,
+                )
+                for index, (group, estimate) in enumerate(
+                    zip(groups, estimates), start=1
+                )
+            ]
+            outcomes = [future.result() for future in futures]
+
+        reports = [report for report, _ in outcomes]
+        report = merge_reports(
+            reports,
+            run_type=RunType.COLLECTION,
+            target_name=options.identifier,
+            label="Shard",
+        )
+        report.shards = [summary for _, summary in outcomes]
+
+        if timings is not None:
+            for group, (shard_report, summary) in zip(groups, outcomes):
+                # Without request log lines, spread the shard's wall time
+                # evenly over its items.
+                fallback = summary.wall_time / len(group)
+                timings.update(
+                    {
+                        item: shard_report.request_durations.get(item, fallback)
+                        for item in group
+                    }
+                )
+            timings.save()
 
         return report
 
     def run_test(self, options: InsoTestOptions) -> InsoRunReport:
+        return self._cached(options, lambda: self._run_test(options))
+
+    def _run_test(self, options: InsoTestOptions) -> InsoRunReport:
         cmd = self._base_cmd(RunType.TEST, options.working_dir, options.identifier)
         self._apply_common_options(cmd, options)
         self._apply_test_options(cmd, options)
 
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=options.execution_timeout)
-        except subprocess.TimeoutExpired:
-            report = InsoRunReport(plan_end=0, run_type=RunType.TEST)
-            report.target_name = options.identifier
-            report.raw_output = f"Inso CLI timed out after {options.execution_timeout} seconds"
-            report.results.append(
-                InsoResult(
-                    id=1,
-                    status=InsoStatus.FAIL,
-                    description=f"Inso CLI Error: Command timed out after {options.execution_timeout} seconds",
-                )
-            )
-            return report
-
-        full_output = result.stdout + result.stderr
-
-        parser = TapParser()
-        report = parser.parse(result.stdout)
-        report.raw_output = full_output
-        report.run_type = RunType.TEST
-        report.target_name = options.identifier
-
-        self._add_error_result_if_needed(report, result)
-
+        return self._execute(cmd, RunType.TEST, options)
+
+    def run_collection_data_sharded(
+        self, options: InsoCollectionOptions, shards: int
+    ) -> InsoRunReport:
+        """
+        Runs the rows of the iteration data file as `shards` concurrent inso
+        processes.
+
+        The data file is split into consecutive chunks, each run by its own
+        process over every requested item, and iteration numbers in the
+        merged report refer to rows of the original file. Files that cannot
+        be split (URLs, unknown formats, too few rows) run as usual.
+        """
+        if not options.iteration_data:
+            return self.run_collection(options)
+
+        with tempfile.TemporaryDirectory(prefix="insomnia-run-data-") as directory:
+            chunks = split_iteration_data(options.iteration_data, shards, directory)
+            if not chunks:
+                return self.run_collection(options)
+
+            with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+                futures = [
+                    pool.submit(
+                        self._run_shard,
+                        index,
+                        # Each process runs exactly the rows of its chunk.
+                        options.model_copy(
+                            update={
+                                "iteration_data": chunk.path,
+                                "iteration_count": None,
+                            }
+                        ),
+                        0,
+                    )
+                    for index, chunk in enumerate(chunks, start=1)
+                ]
+                outcomes = [future.result() for future in futures]
+
+        report = merge_iteration_reports(
+            [report for report, _ in outcomes],
+            [chunk.offset for chunk in chunks],
+            target_name=options.identifier,
+            log_dir=self.iteration_log_dir,
+        )
+        report.shards = [
+            summary.model_copy(update={"item_count": chunk.rows})
+            for (_, summary), chunk in zip(outcomes, chunks)
+        ]
         return report
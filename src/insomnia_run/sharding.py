@@ -0,0 +1,221 @@
+import heapq
+import json
+from pathlib import Path
+from typing import Mapping, Sequence
+
+from .models import ColumnarResults, InsoRunReport, RunType, SourceSummary
+
+
+class TimingStore:
+    """
+    Per-request durations (in seconds) recorded by previous runs.
+
+    The store is a flat JSON object keyed by request ID. A missing or
+    unreadable file simply yields no history.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.durations: dict[str, float] = {}
+
+    @classmethod
+    def load(cls, path: str) -> "TimingStore":
+        store = cls(path)
+        try:
+            data = json.loads(store.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return store
+        if isinstance(data, dict):
+            store.durations = {
+                str(key): float(value)
+                for key, value in data.items()
+                if isinstance(value, (int, float))
+            }
+        return store
+
+    def update(self, durations: Mapping[str, float]) -> None:
+        self.durations.update(durations)
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(self.durations, indent=2, sort_keys=True), encoding="utf-8"
+        )
+
+
+def partition_items(items: Sequence[str], shards: int) -> list[list[str]]:
+    """
+    Splits items round-robin into at most `shards` non-empty groups.
+
+    Round-robin keeps neighbouring requests (which often share a folder and
+    similar cost) spread across groups.
+    """
+    shards = max(1, min(shards, len(items)))
+    groups: list[list[str]] = [[] for _ in range(shards)]
+    for position, item in enumerate(items):
+        groups[position % shards].append(item)
+    return [group for group in groups if group]
+
+
+def balance_items(
+    items: Sequence[str], shards: int, durations: Mapping[str, float]
+) -> tuple[list[list[str]], list[float]]:
+    """
+    Splits items into at most `shards` groups with similar expected runtime.
+
+    Items with a recorded duration are bin-packed longest first onto the
+    least loaded group. Items without history are then dealt to the group
+    with the fewest items, so they are spread in equal counts. Returns the
+    groups and their estimated durations.
+    """
+    known = sorted(
+        (item for item in items if item in durations),
+        key=lambda item: durations[item],
+        reverse=True,
+    )
+    if not known:
+        partitions = partition_items(items, shards)
+        return partitions, [0.0] * len(partitions)
+
+    unknown = [item for item in items if item not in durations]
+    shards = max(1, min(shards, len(items)))
+    groups: list[list[str]] = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+
+    by_load = [(0.0, index) for index in range(shards)]
+    for item in known:
+        load, index = heapq.heappop(by_load)
+        groups[index].append(item)
+        loads[index] = load + durations[item]
+        heapq.heappush(by_load, (loads[index], index))
+
+    by_count = [(len(group), loads[index], index) for index, group in enumerate(groups)]
+    heapq.heapify(by_count)
+    for item in unknown:
+        count, load, index = heapq.heappop(by_count)
+        groups[index].append(item)
+        heapq.heappush(by_count, (count + 1, load, index))
+
+    non_empty = [index for index, group in enumerate(groups) if group]
+    return [groups[i] for i in non_empty], [loads[i] for i in non_empty]
+
+
+class ReportMerger:
+    """
+    Combines reports into one as they are added, renumbering result IDs.
+
+    Results keep the order in which reports are added, and each report's raw
+    output is kept under a header naming the part it came from, as is the
+    file holding its full raw output when there is one. A report is
+    not needed once it has been added, so reports loaded one at a time never
+    have to be in memory together.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        run_type: RunType = RunType.COLLECTION,
+        target_name: str | None = None,
+        label: str = "Part",
+    ):
+        self.total = total
+        self.label = label
+        self.merged = InsoRunReport(
+            plan_end=0, run_type=run_type, target_name=target_name
+        )
+        self._position = 0
+        self._raw_parts: list[str] = []
+        self._completed = 0
+
+    def add(self, report: InsoRunReport) -> None:
+        merged = self.merged
+        self._position += 1
+        if self._position == 1:
+            merged.tap_version = report.tap_version
+            if isinstance(report.results, ColumnarResults):
+                merged.results = ColumnarResults()
+        merged.plan_end += report.plan_end or report.total_tests
+        merged.request_durations.update(report.request_durations)
+        merged.iterations.extend(report.iterations)
+        merged.iteration_logs.extend(report.iteration_logs)
+
+        for result in report.results:
+            merged.results.append(
+                result.model_copy(update={"id": len(merged.results) + 1})
+            )
+
+        part = f"{self.label} {self._position}/{self.total}"
+        if report.raw_output:
+            self._raw_parts.append(f"=== {part} ===\n{report.raw_output}")
+        if report.raw_output_file is not None:
+            merged.raw_output_files.append(
+                report.raw_output_file.model_copy(update={"label": part})
+            )
+        merged.raw_output_files.extend(report.raw_output_files)
+
+        merged.timed_out = merged.timed_out or report.timed_out
+        merged.stalled = merged.stalled or report.stalled
+        self._completed += (
+            report.completed_tests
+            if report.completed_tests is not None
+            else report.total_tests
+        )
+
+    def finish(self) -> InsoRunReport:
+        merged = self.merged
+        if merged.timed_out or merged.stalled:
+            merged.completed_tests = self._completed
+        merged.raw_output = "\n".join(self._raw_parts) or None
+        return merged
+
+
+def merge_reports(
+    reports: Sequence[InsoRunReport],
+    run_type: RunType = RunType.COLLECTION,
+    target_name: str | None = None,
+    label: str = "Part",
+) -> InsoRunReport:
+    """Combines several reports into one, renumbering result IDs globally."""
+    merger = ReportMerger(
+        len(reports), run_type=run_type, target_name=target_name, label=label
+    )
+    for report in reports:
+        merger.add(report)
+    return merger.finish()
+
+
+def merge_report_files(
+    paths: Sequence[str], target_name: str | None = None
+) -> InsoRunReport:
+    """
+    Combines saved JSON reports, such as those of matrix jobs, into one.
+
+    Reports are loaded and merged one at a time. Each source is listed in
+    `sources` with its own counts. The run type, and the target name when
+    none is given, are kept when every source agrees on them.
+    """
+    merger = ReportMerger(len(paths), target_name=target_name, label="Source")
+    run_types = set()
+    targets = set()
+    for path in paths:
+        report = InsoRunReport.model_validate_json(Path(path).read_bytes())
+        run_types.add(report.run_type)
+        targets.add(report.target_name)
+        merger.merged.sources.append(
+            SourceSummary(
+                name=path,
+                target_name=report.target_name,
+                run_type=report.run_type,
+                passed=report.passed_count,
+                failed=report.failed_count,
+                skipped=report.skipped_count,
+            )
+        )
+        merger.add(report)
+
+    merged = merger.finish()
+    if len(run_types) == 1:
+        merged.run_type = run_types.pop()
+    if target_name is None and len(targets) == 1:
+        merged.target_name = targets.pop()
+    return merged
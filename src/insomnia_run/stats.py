@@ -0,0 +1,8 @@
+import math
+from typing import Sequence
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """Returns the nearest-rank percentile of values sorted in ascending order."""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
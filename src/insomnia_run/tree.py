@@ -0,0 +1,60 @@
+from typing import ClassVar, Dict, Iterable, List
+
+from pydantic import BaseModel, Field
+
+from .models import InsoResult, InsoStatus
+
+
+class ResultNode(BaseModel):
+    """
+    A folder of results with pass/fail/skip counts over everything below it.
+
+    Folders come from the TAP subtests a result was nested in, followed by
+    any `Folder / Request / test` prefixes in its description.
+    """
+
+    name: str = ""
+    passed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    children: Dict[str, "ResultNode"] = Field(default_factory=dict)
+    results: List[InsoResult] = Field(default_factory=list)
+
+    FOLDER_SEPARATOR: ClassVar[str] = " / "
+
+    @property
+    def total(self) -> int:
+        return self.passed + self.failed + self.skipped
+
+    @classmethod
+    def split_description(cls, result: InsoResult) -> tuple[list[str], str]:
+        """Returns the folder path of a result and its name within it."""
+        *folders, name = result.description.split(cls.FOLDER_SEPARATOR)
+        return [*result.path, *folders], name
+
+    def _count(self, status: InsoStatus) -> None:
+        if status == InsoStatus.PASS:
+            self.passed += 1
+        elif status == InsoStatus.FAIL:
+            self.failed += 1
+        else:
+            self.skipped += 1
+
+    def add(self, result: InsoResult) -> None:
+        """Files a result under its folder, counting it on every ancestor."""
+        node = self
+        node._count(result.status)
+        for folder in self.split_description(result)[0]:
+            child = node.children.get(folder)
+            if child is None:
+                child = node.children[folder] = ResultNode(name=folder)
+            node = child
+            node._count(result.status)
+        node.results.append(result)
+
+    @classmethod
+    def build(cls, results: Iterable[InsoResult]) -> "ResultNode":
+        root = cls()
+        for result in results:
+            root.add(result)
+        return root
@@ -0,0 +1,65 @@
+import json
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _scalar(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def load(text: str) -> dict[str, str]:
+    """
+    Reads the YAML subset used in TAP diagnostic blocks.
+
+    Only what TAP producers emit in practice is supported: top-level
+    `key: value` pairs with plain or quoted scalars, `|`/`>` block scalars
+    and nested mappings or lists, which are returned as their indented
+    source text. Values are always strings.
+    """
+    lines = [line.rstrip() for line in text.splitlines()]
+    lines = [
+        line for line in lines if line.strip() and line.strip() not in ("---", "...")
+    ]
+    if not lines:
+        return {}
+
+    base = min(_indent(line) for line in lines)
+    values: dict[str, str] = {}
+    position = 0
+    while position < len(lines):
+        line = lines[position]
+        position += 1
+        if _indent(line) != base or ":" not in line:
+            continue
+
+        key, _, value = line.strip().partition(":")
+        value = value.strip()
+
+        nested = []
+        while position < len(lines) and _indent(lines[position]) > base:
+            nested.append(lines[position])
+            position += 1
+
+        if value[:1] in ("|", ">"):
+            depth = min((_indent(n) for n in nested), default=0)
+            body = [n[depth:] for n in nested]
+            joiner = "\n" if value[0] == "|" else " "
+            values[key] = joiner.join(body)
+        elif value:
+            values[key] = _scalar(value)
+        elif nested:
+            depth = min(_indent(n) for n in nested)
+            values[key] = "\n".join(n[depth:] for n in nested)
+        else:
+            values[key] = ""
+
+    return values
@@ -0,0 +1,121 @@
+import os
+import time
+
+import pytest
+
+from insomnia_run.cache import ResultCache
+from insomnia_run.models import (
+    InsoCollectionOptions,
+    InsoResult,
+    InsoRunReport,
+    InsoStatus,
+    InsoTestOptions,
+)
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir()
+    (workspace / "collection.yaml").write_text("id: req_1\n")
+    return workspace
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"))
+
+
+def _report():
+    return InsoRunReport(
+        plan_end=1, results=[InsoResult(id=1, status=InsoStatus.PASS, description="A")]
+    )
+
+
+class TestResultCacheKey:
+    def test_stable_for_same_inputs(self, cache, workspace):
+        options = InsoCollectionOptions(working_dir=str(workspace))
+        assert cache.key(options, "12.2.0") == cache.key(options, "12.2.0")
+
+    def test_changes_with_workspace_contents(self, cache, workspace):
+        options = InsoCollectionOptions(working_dir=str(workspace))
+        before = cache.key(options, "12.2.0")
+        (workspace / "collection.yaml").write_text("id: req_2\n")
+        assert cache.key(options, "12.2.0") != before
+
+    def test_changes_with_options_and_version(self, cache, workspace):
+        options = InsoCollectionOptions(working_dir=str(workspace))
+        key = cache.key(options, "12.2.0")
+        assert cache.key(options, "12.3.0") != key
+        assert cache.key(options.model_copy(update={"environment": "prod"}), "12.2.0") != key
+        assert cache.key(InsoTestOptions(working_dir=str(workspace)), "12.2.0") != key
+
+    def test_ignores_cache_directory_inside_workspace(self, workspace):
+        cache = ResultCache(str(workspace / ".cache"))
+        options = InsoCollectionOptions(working_dir=str(workspace))
+        key = cache.key(options, "1")
+        cache.put(key, _report())
+        assert cache.key(options, "1") == key
+
+
+class TestResultCacheEntries:
+    def test_round_trip_marks_report(self, cache):
+        cache.put("abc", _report())
+        report = cache.get("abc")
+
+        assert report.from_cache is True
+        assert report.passed_count == 1
+
+    def test_miss(self, cache):
+        assert cache.get("missing") is None
+
+    def test_expired_entry(self, tmp_path):
+        cache = ResultCache(str(tmp_path), ttl=60)
+        cache.put("old", _report())
+        stale = time.time() - 120
+        os.utime(tmp_path / "old.json", (stale, stale))
+
+        assert cache.get("old") is None
+        assert not (tmp_path / "old.json").exists()
+
+    def test_reads_do_not_extend_lifetime(self, tmp_path):
+        cache = ResultCache(str(tmp_path), ttl=60)
+        cache.put("hot", _report())
+        entry = tmp_path / "hot.json"
+        written = time.time() - 50
+        os.utime(entry, (written, written))
+
+        assert cache.get("hot") is not None
+        assert entry.stat().st_mtime == written
+        assert entry.stat().st_atime > written
+
+        os.utime(entry, (time.time(), written - 20))
+        assert cache.get("hot") is None
+
+    def test_size_eviction_drops_least_recent(self, tmp_path):
+        cache = ResultCache(str(tmp_path), max_bytes=10**6)
+        cache.put("first", _report())
+        size = (tmp_path / "first.json").stat().st_size
+        past = time.time() - 10
+        os.utime(tmp_path / "first.json", (past, past))
+
+        cache.max_bytes = size * 2
+        cache.put("second", _report())
+        cache.put("third", _report())
+
+        assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["second", "third"]
+
+    def test_size_eviction_keeps_recently_read(self, tmp_path):
+        cache = ResultCache(str(tmp_path), max_bytes=10**6)
+        cache.put("first", _report())
+        cache.put("second", _report())
+        size = (tmp_path / "first.json").stat().st_size
+        past = time.time() - 10
+        for name in ("first", "second"):
+            os.utime(tmp_path / f"{name}.json", (past, past))
+        cache.get("first")
+
+        cache.max_bytes = size * 2
+        cache.put("third", _report())
+
+        assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["first", "third"]
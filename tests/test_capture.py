@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from insomnia_run.capture import OutputCapture
+
+
+class TestOutputCapture:
+    def test_small_output_stays_in_memory(self, tmp_path):
+        capture = OutputCapture(limit=100, spill_dir=str(tmp_path))
+        capture.write("line 1\n")
+        capture.write("line 2\n")
+
+        assert capture.close() is None
+        assert capture.getvalue() == "line 1\nline 2\n"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_large_output_spills_full_stream(self, tmp_path):
+        capture = OutputCapture(limit=40, spill_dir=str(tmp_path))
+        lines = [f"line {i:03d}\n" for i in range(100)]
+        for line in lines:
+            capture.write(line)
+
+        ref = capture.close()
+        full = "".join(lines)
+
+        assert ref is not None
+        assert Path(ref.path).read_text() == full
+        assert ref.size == len(full.encode())
+        assert ref.head_end == 10
+        assert ref.tail_start == ref.size - 30
+
+        excerpt = capture.getvalue()
+        assert excerpt.startswith(full[:10])
+        assert excerpt.endswith(full[-30:])
+        assert "characters omitted" in excerpt
+        assert ref.path in excerpt
+
+    def test_copy_to_appends_spilled_output(self, tmp_path):
+        source = OutputCapture(limit=20, spill_dir=str(tmp_path))
+        for i in range(20):
+            source.write(f"err {i}\n")
+        target = OutputCapture(limit=1000, spill_dir=str(tmp_path))
+        target.write("out\n")
+
+        source.copy_to(target)
+        source.discard()
+
+        assert target.getvalue() == "out\n" + "".join(f"err {i}\n" for i in range(20))
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,154 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from insomnia_run.collection import CollectionIndex
+from insomnia_run.models import InsoResult, InsoStatus
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+class TestCollectionIndex:
+    def test_load_v5_yaml_export(self):
+        index = CollectionIndex.load(str(FIXTURES / "mixed_results_suite.yaml"))
+        assert index.request_ids == ["req_pass_001", "req_fail_001", "req_pass_002"]
+
+    def test_load_directory_deduplicates(self, tmp_path):
+        (tmp_path / "a.yaml").write_text("collection:\n  - meta:\n      id: req_1\n")
+        (tmp_path / "b.yml").write_text("_id: req_2\n_id: req_1\n")
+        (tmp_path / "notes.txt").write_text("id: req_ignored\n")
+
+        index = CollectionIndex.load(str(tmp_path))
+        assert index.request_ids == ["req_1", "req_2"]
+
+    def test_load_v4_json_export(self, tmp_path):
+        export = {
+            "resources": [
+                {"_id": "wrk_1", "_type": "workspace"},
+                {"_id": "req_a", "_type": "request"},
+                {"_id": "req_b", "_type": "request"},
+            ]
+        }
+        path = tmp_path / "export.json"
+        path.write_text(json.dumps(export, indent=2))
+
+        index = CollectionIndex.load(str(path))
+        assert index.request_ids == ["req_a", "req_b"]
+
+    def test_load_skips_node_modules_and_unreadable_files(self, tmp_path):
+        (tmp_path / "export.yaml").write_text("_id: req_1\n")
+        (tmp_path / "node_modules" / "pkg").mkdir(parents=True)
+        (tmp_path / "node_modules" / "pkg" / "package.json").write_text('{"_id": "req_x"}')
+        (tmp_path / "broken.json").symlink_to(tmp_path / "missing.json")
+
+        index = CollectionIndex.load(str(tmp_path))
+        assert index.request_ids == ["req_1"]
+
+    def test_load_missing_path(self, tmp_path):
+        index = CollectionIndex.load(str(tmp_path / "missing"))
+        assert index.request_ids == []
+
+
+
+class TestCollectionIndexWorkspaces:
+    def _two_workspaces(self, tmp_path):
+        (tmp_path / "users.yaml").write_text(
+            "name: Users API\nmeta:\n  id: wrk_users\n"
+            "collection:\n  - name: List\n    meta:\n      id: req_u1\n"
+        )
+        (tmp_path / "orders.yaml").write_text(
+            'name: "Orders API"\nmeta:\n  id: wrk_orders\n'
+            "collection:\n  - meta:\n      id: req_o1\n  - meta:\n      id: req_o2\n"
+        )
+        return CollectionIndex.load(str(tmp_path))
+
+    def test_groups_requests_by_workspace(self, tmp_path):
+        index = self._two_workspaces(tmp_path)
+
+        assert index.workspaces == {
+            "wrk_orders": ["req_o1", "req_o2"],
+            "wrk_users": ["req_u1"],
+        }
+        assert index.workspace_names == {
+            "Orders API": "wrk_orders",
+            "Users API": "wrk_users",
+        }
+
+    def test_selects_workspace_by_id_or_name(self, tmp_path):
+        index = self._two_workspaces(tmp_path)
+
+        assert index.workspace_request_ids("wrk_users") == ["req_u1"]
+        assert index.workspace_request_ids("Orders API") == ["req_o1", "req_o2"]
+
+    def test_ambiguous_without_identifier(self, tmp_path):
+        index = self._two_workspaces(tmp_path)
+
+        with pytest.raises(ValueError, match="2 workspaces"):
+            index.workspace_request_ids(None)
+
+    def test_single_workspace_returns_every_request(self):
+        index = CollectionIndex.load(str(FIXTURES / "mixed_results_suite.yaml"))
+
+        assert index.workspace_request_ids(None) == index.request_ids
+        assert index.workspace_names == {
+            "Todo API - Mixed Results Suite": "wrk_mixed_001"
+        }
+
+
+class TestCollectionIndexTests:
+    def test_maps_test_names_to_declaring_requests(self):
+        index = CollectionIndex.load(str(FIXTURES / "mixed_results_suite.yaml"))
+        assert index.tests["Status code is 404 (intentional failure)"] == ["req_fail_001"]
+        assert index.tests["Response has name field"] == ["req_pass_002"]
+
+    def test_escaped_quotes_in_json_scripts(self, tmp_path):
+        export = {
+            "resources": [
+                {
+                    "_id": "req_a",
+                    "afterResponseScript": "insomnia.test(\"Has token\", () => {});",
+                },
+            ]
+        }
+        path = tmp_path / "export.json"
+        path.write_text(json.dumps(export, indent=2))
+
+        assert CollectionIndex.load(str(path)).tests == {"Has token": ["req_a"]}
+
+    def test_assign_requests_resolves_shared_names_by_occurrence(self):
+        index = CollectionIndex(
+            request_ids=["req_1", "req_2", "req_3"],
+            tests={"Status is 200": ["req_1", "req_3"], "Unique": ["req_2"]},
+        )
+        results = [
+            InsoResult(id=1, status=InsoStatus.PASS, description="Status is 200"),
+            InsoResult(id=2, status=InsoStatus.PASS, description="Unique"),
+            InsoResult(id=3, status=InsoStatus.FAIL, description="Status is 200"),
+            InsoResult(id=4, status=InsoStatus.FAIL, description="Unknown"),
+        ]
+
+        index.assign_requests(results, order=["req_3", "req_2", "req_1"])
+
+        assert [r.request_id for r in results] == ["req_3", "req_2", "req_1", None]
+
+    def test_assign_requests_prefers_requests_in_order(self):
+        index = CollectionIndex(tests={"Status is 200": ["req_1", "req_2"]})
+        results = [InsoResult(id=1, status=InsoStatus.PASS, description="Status is 200")]
+
+        index.assign_requests(results, order=["req_2"])
+
+        assert results[0].request_id == "req_2"
+
+    def test_request_resolver_cycles_for_iterations(self):
+        index = CollectionIndex(tests={"Status is 200": ["req_1", "req_2"]})
+        resolve = index.request_resolver(order=["req_1", "req_2"], cycle=True)
+        result = InsoResult(id=1, status=InsoStatus.PASS, description="Status is 200")
+
+        assert [resolve(result) for _ in range(5)] == [
+            "req_1",
+            "req_2",
+            "req_1",
+            "req_2",
+            "req_1",
+        ]
@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from insomnia_run.datafiles import _iter_json_rows, split_iteration_data
+
+
+class TestSplitIterationData:
+    def test_csv_chunks_repeat_the_header(self, tmp_path):
+        source = tmp_path / "rows.csv"
+        source.write_text('id,name\n1,"multi\nline"\n2,b\n3,c\n4,d\n5,e\n')
+
+        chunks = split_iteration_data(str(source), 2, str(tmp_path))
+
+        assert [(c.offset, c.rows) for c in chunks] == [(0, 3), (3, 2)]
+        first = (tmp_path / "rows.1.csv").read_text()
+        assert first.splitlines()[0] == "id,name"
+        assert '"multi\nline"' in first
+        assert (tmp_path / "rows.2.csv").read_text().split() == ["id,name", "4,d", "5,e"]
+
+    def test_json_chunks(self, tmp_path):
+        rows = [{"id": i} for i in range(7)]
+        source = tmp_path / "rows.json"
+        source.write_text(json.dumps(rows, indent=2))
+
+        chunks = split_iteration_data(str(source), 3, str(tmp_path))
+
+        assert [(c.offset, c.rows) for c in chunks] == [(0, 3), (3, 3), (6, 1)]
+        loaded = [json.loads(open(c.path).read()) for c in chunks]
+        assert [row for chunk in loaded for row in chunk] == rows
+
+    @pytest.mark.parametrize(
+        "name, content",
+        [
+            ("rows.txt", "a\nb\n"),
+            ("rows.csv", "id\n1\n"),
+            ("rows.json", "[]"),
+        ],
+    )
+    def test_unsplittable_files(self, tmp_path, name, content):
+        source = tmp_path / name
+        source.write_text(content)
+
+        assert split_iteration_data(str(source), 2, str(tmp_path)) == []
+
+    def test_missing_file_or_url(self, tmp_path):
+        assert split_iteration_data("https://example.com/rows.csv", 2, str(tmp_path)) == []
+
+
+class TestIterJsonRows:
+    def test_items_split_across_reads(self):
+        rows = [{"text": "],[" * i, "n": i} for i in range(20)] + [12345]
+        handle = io.StringIO(json.dumps(rows))
+
+        assert list(_iter_json_rows(handle, chunk_size=5)) == rows
+
+    @pytest.mark.parametrize("text", ['{"a": 1}', '[{"a": 1}', '[{"a": }]'])
+    def test_invalid_input(self, text):
+        with pytest.raises(ValueError):
+            list(_iter_json_rows(io.StringIO(text), chunk_size=4))
@@ -0,0 +1,164 @@
+import io
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from insomnia_run.diff import compare_reports
+from insomnia_run.main import app
+from insomnia_run.models import InsoResult, InsoRunReport, InsoStatus
+
+
+def _result(id, status, description, request_id=None, duration_ms=None):
+    return InsoResult(
+        id=id,
+        status=status,
+        description=description,
+        request_id=request_id,
+        duration_ms=duration_ms,
+    )
+
+
+def _report(*results):
+    return InsoRunReport(plan_end=len(results), results=list(results))
+
+
+class TestCompareReports:
+    def test_status_changes(self):
+        baseline = _report(
+            _result(1, InsoStatus.PASS, "Status is 200", "req_a"),
+            _result(2, InsoStatus.FAIL, "Has name", "req_a"),
+            _result(3, InsoStatus.PASS, "Gone", "req_b"),
+        )
+        current = _report(
+            _result(1, InsoStatus.FAIL, "Status is 200", "req_a"),
+            _result(2, InsoStatus.PASS, "Has name", "req_a"),
+            _result(3, InsoStatus.PASS, "New", "req_c"),
+        )
+
+        diff = compare_reports(current, baseline, baseline_name="main.json")
+
+        assert diff.baseline == "main.json"
+        assert [c.description for c in diff.newly_failing] == ["Status is 200"]
+        assert diff.newly_failing[0].baseline_status == InsoStatus.PASS
+        assert [c.description for c in diff.newly_passing] == ["Has name"]
+        assert [c.description for c in diff.added] == ["New"]
+        assert [(c.description, c.request_id) for c in diff.removed] == [
+            ("Gone", "req_b")
+        ]
+        assert diff.slower == []
+
+    def test_same_description_in_other_request_is_a_different_test(self):
+        baseline = _report(_result(1, InsoStatus.PASS, "Status is 200", "req_a"))
+        current = _report(_result(1, InsoStatus.PASS, "Status is 200", "req_b"))
+
+        diff = compare_reports(current, baseline)
+
+        assert len(diff.added) == 1
+        assert len(diff.removed) == 1
+
+    def test_repeated_results_are_matched_by_occurrence(self):
+        baseline = _report(
+            _result(1, InsoStatus.PASS, "Status is 200", "req_a"),
+            _result(2, InsoStatus.PASS, "Status is 200", "req_a"),
+        )
+        current = _report(
+            _result(1, InsoStatus.PASS, "Status is 200", "req_a"),
+            _result(2, InsoStatus.FAIL, "Status is 200", "req_a"),
+            _result(3, InsoStatus.PASS, "Status is 200", "req_a"),
+        )
+
+        diff = compare_reports(current, baseline)
+
+        assert len(diff.newly_failing) == 1
+        assert len(diff.added) == 1
+        assert diff.removed == []
+
+    def test_duration_regressions(self):
+        baseline = _report(
+            _result(1, InsoStatus.PASS, "Slower", duration_ms=200.0),
+            _result(2, InsoStatus.PASS, "Noise", duration_ms=5.0),
+            _result(3, InsoStatus.PASS, "Steady", duration_ms=1000.0),
+        )
+        current = _report(
+            _result(1, InsoStatus.PASS, "Slower", duration_ms=500.0),
+            _result(2, InsoStatus.PASS, "Noise", duration_ms=50.0),
+            _result(3, InsoStatus.PASS, "Steady", duration_ms=1150.0),
+        )
+
+        diff = compare_reports(current, baseline)
+
+        assert [c.description for c in diff.slower] == ["Slower"]
+        assert diff.slower[0].baseline_duration_ms == 200.0
+        assert not diff.newly_failing
+        assert diff.has_changes
+
+    def test_identical_reports(self):
+        report = _report(_result(1, InsoStatus.PASS, "Status is 200"))
+
+        assert not compare_reports(report, report).has_changes
+
+
+class TestBaselineOption:
+    def test_changes_are_reported(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(
+            _report(
+                _result(1, InsoStatus.PASS, "Fine"),
+                _result(2, InsoStatus.PASS, "Broken"),
+            ).model_dump_json()
+        )
+        process = MagicMock()
+        process.stdout = io.StringIO("1..2\nok 1 - Fine\nnot ok 2 - Broken\n")
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 1
+
+        with patch("insomnia_run.runner.subprocess.Popen", return_value=process):
+            result = CliRunner().invoke(
+                app,
+                [
+                    "run-test",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--baseline",
+                    str(baseline),
+                ],
+            )
+
+        assert result.exit_code == 1
+        assert "### Changes Since Baseline" in result.stdout
+        assert "- ❌ **1 newly failing**\n  - Broken" in result.stdout
+
+    def test_missing_baseline_is_rejected_before_running(self, tmp_path):
+        with patch("insomnia_run.runner.subprocess.Popen") as mock_popen:
+            result = CliRunner().invoke(
+                app,
+                [
+                    "run-test",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--baseline",
+                    str(tmp_path / "missing.json"),
+                ],
+            )
+
+        assert result.exit_code == 2
+        mock_popen.assert_not_called()
+
+    def test_corrupt_baseline_is_rejected_before_running(self, tmp_path):
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text("{not json")
+
+        with patch("insomnia_run.runner.subprocess.Popen") as mock_popen:
+            result = CliRunner().invoke(
+                app,
+                [
+                    "run-collection",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--baseline",
+                    str(baseline),
+                ],
+            )
+
+        assert result.exit_code == 2
+        mock_popen.assert_not_called()
@@ -0,0 +1,93 @@
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+from typer.testing import CliRunner
+
+from insomnia_run.github import GitHubActions
+from insomnia_run.main import app
+
+
+def _read_outputs(path):
+    """Parses a GITHUB_OUTPUT file the way the runner does."""
+    outputs = {}
+    lines = iter(path.read_text().splitlines())
+    for line in lines:
+        if "<<" in line:
+            name, delimiter = line.split("<<", 1)
+            value = []
+            for item in lines:
+                if item == delimiter:
+                    break
+                value.append(item)
+            outputs[name] = "\n".join(value)
+        else:
+            name, value = line.split("=", 1)
+            outputs[name] = value
+    return outputs
+
+
+class TestGitHubActions:
+    def test_skips_missing_files(self):
+        actions = GitHubActions({})
+
+        assert not actions.available
+        actions.set_output("markdown", "text")
+        actions.add_summary("text")
+
+    def test_multiline_and_streamed_values(self, tmp_path):
+        output = tmp_path / "output"
+        actions = GitHubActions({"GITHUB_OUTPUT": str(output)})
+
+        actions.set_output("exit-code", "0")
+        actions.set_output("markdown", "line 1\nEOF\nline 3")
+        actions.set_output("json-output", lambda handle: handle.write('{"a": 1}'))
+
+        assert _read_outputs(output) == {
+            "exit-code": "0",
+            "markdown": "line 1\nEOF\nline 3",
+            "json-output": '{"a": 1}',
+        }
+
+    def test_summary_is_appended(self, tmp_path):
+        summary = tmp_path / "summary"
+        summary.write_text("earlier step\n")
+
+        GitHubActions({"GITHUB_STEP_SUMMARY": str(summary)}).add_summary("## Report")
+
+        assert summary.read_text() == "earlier step\n## Report\n"
+
+
+class TestGitHubOption:
+    def test_writes_step_outputs_instead_of_stdout(self, tmp_path, monkeypatch):
+        output = tmp_path / "output"
+        summary = tmp_path / "summary"
+        monkeypatch.setenv("GITHUB_OUTPUT", str(output))
+        monkeypatch.setenv("GITHUB_STEP_SUMMARY", str(summary))
+
+        process = MagicMock()
+        process.stdout = io.StringIO("1..2\nok 1 - Fine\nnot ok 2 - Broken\n")
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 1
+
+        with patch("insomnia_run.runner.subprocess.Popen", return_value=process):
+            result = CliRunner().invoke(
+                app,
+                [
+                    "run-test",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--output-format",
+                    "json",
+                    "--github",
+                ],
+            )
+
+        assert result.exit_code == 1
+        assert result.stdout == ""
+        outputs = _read_outputs(output)
+        assert outputs["exit-code"] == "1"
+        assert "(1 passed, 1 failed)" in outputs["markdown"]
+        assert outputs["markdown"] in summary.read_text()
+        report = json.loads(outputs["json-output"])
+        assert [r["description"] for r in report["results"]] == ["Fine", "Broken"]
@@ -0,0 +1,177 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+from typer.testing import CliRunner
+
+from insomnia_run.history import HistoryStore
+from insomnia_run.main import app
+from insomnia_run.models import FlakyTest, InsoResult, InsoRunReport, InsoStatus
+from insomnia_run.reporter import Reporter
+
+PASS, FAIL = InsoStatus.PASS, InsoStatus.FAIL
+
+
+def _report(statuses, target_name="API", durations=None):
+    """A report with one result per (description, status) pair."""
+    durations = durations or {}
+    return InsoRunReport(
+        plan_end=len(statuses),
+        target_name=target_name,
+        results=[
+            InsoResult(
+                id=position,
+                status=status,
+                description=description,
+                request_id=f"req_{description.lower()}",
+                duration_ms=durations.get(description),
+            )
+            for position, (description, status) in enumerate(statuses.items(), start=1)
+        ],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    with HistoryStore(str(tmp_path / "history" / "runs.sqlite")) as store:
+        yield store
+
+
+class TestHistoryStore:
+    def test_flaky_tests(self, store):
+        for flaky_status, broken_status in [
+            (PASS, PASS),
+            (FAIL, PASS),
+            (PASS, FAIL),
+            (FAIL, FAIL),
+        ]:
+            store.record(
+                _report({"Flaky": flaky_status, "Broken": broken_status, "Stable": PASS})
+            )
+        store.record(_report({"Flaky": FAIL}, target_name="Other"))
+
+        flaky = store.flaky("API")
+
+        assert [(t.description, t.request_id) for t in flaky] == [
+            ("Flaky", "req_flaky")
+        ]
+        assert (flaky[0].runs, flaky[0].failures, flaky[0].flips) == (4, 2, 3)
+        assert flaky[0].flake_rate == 100.0
+
+    def test_flaky_window_only_counts_recent_runs(self, store):
+        for status in [PASS, FAIL, PASS, PASS, PASS, PASS]:
+            store.record(_report({"Test": status}))
+
+        assert store.flaky("API", window=3) == []
+        assert len(store.flaky("API", window=6)) == 1
+
+    def test_duration_trends(self, store):
+        for duration in [100.0, 110.0, 120.0, 300.0, 310.0, 320.0]:
+            store.record(_report({"Search": PASS}, durations={"Search": duration}))
+
+        (trend,) = store.durations("API", window=3)
+
+        assert trend.description == "Search"
+        assert trend.samples == 3
+        assert trend.p50_ms == 310.0
+        assert trend.p95_ms == 320.0
+        assert trend.previous_p50_ms == 110.0
+
+    def test_last_good(self, store):
+        first = store.record(_report({"A": PASS, "B": PASS}), commit_sha="abc")
+        store.record(_report({"A": PASS, "B": FAIL}), commit_sha="def")
+
+        assert store.last_good("API").id == first
+        assert store.last_good("API").commit_sha == "abc"
+        assert store.last_good("API", description="A").commit_sha == "def"
+        assert store.last_good("Other") is None
+
+    def test_record_is_one_transaction(self, store):
+        report = _report({"A": PASS})
+        with patch.object(type(report.results), "__iter__", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                store.record(report)
+
+        assert store.connection.execute("SELECT COUNT(*) FROM runs").fetchone() == (0,)
+
+
+class TestKnownFlakyAnnotation:
+    def test_failures_are_annotated(self):
+        report = _report({"Flaky": FAIL, "Broken": FAIL})
+        report.known_flaky = [
+            FlakyTest(
+                description="Flaky", request_id="req_flaky", runs=5, failures=2, flips=3
+            )
+        ]
+
+        markdown = Reporter().generate_markdown(report)
+
+        assert "- ❌ **Flaky** _(known flaky)_" in markdown
+        assert "- ❌ **Broken**\n" in markdown
+        assert "- **1 of the failures** are known to be flaky" in markdown
+
+    def test_annotations_do_not_carry_over_to_the_next_report(self):
+        reporter = Reporter()
+        flaky = _report({"Flaky": FAIL})
+        flaky.known_flaky = [
+            FlakyTest(
+                description="Flaky", request_id="req_flaky", runs=5, failures=2, flips=3
+            )
+        ]
+        reporter.generate_markdown(flaky)
+
+        markdown = reporter.generate_markdown(_report({"Flaky": FAIL}))
+
+        assert "known flaky" not in markdown
+
+
+class TestHistoryCommands:
+    def _run_test(self, tmp_path, stdout, history):
+        process = MagicMock()
+        process.stdout = io.StringIO(stdout)
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 0
+        with patch("insomnia_run.runner.subprocess.Popen", return_value=process):
+            return CliRunner().invoke(
+                app,
+                [
+                    "run-test",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--identifier",
+                    "API",
+                    "--history",
+                    history,
+                    "--commit",
+                    "abc123",
+                ],
+            )
+
+    def test_runs_are_recorded_and_queried(self, tmp_path):
+        history = str(tmp_path / "history.sqlite")
+        for outcome in ["ok", "not ok", "ok"]:
+            self._run_test(tmp_path, f"1..1\n{outcome} 1 - Flaky\n", history)
+
+        result = self._run_test(tmp_path, "1..1\nnot ok 1 - Flaky\n", history)
+        assert "**Flaky** _(known flaky)_" in result.stdout
+
+        result = CliRunner().invoke(
+            app, ["history", "flaky", "--db", history, "--target", "API"]
+        )
+        assert result.exit_code == 0
+        assert "Flaky" in result.stdout
+        assert "100.0%" in result.stdout
+
+        result = CliRunner().invoke(
+            app, ["history", "last-good", "--db", history, "--target", "API"]
+        )
+        assert result.exit_code == 0
+        assert "Commit: abc123" in result.stdout
+
+    def test_last_good_without_history(self, tmp_path):
+        result = CliRunner().invoke(
+            app, ["history", "last-good", "--db", str(tmp_path / "empty.sqlite")]
+        )
+
+        assert result.exit_code == 1
+        assert "No passing run recorded" in result.stdout
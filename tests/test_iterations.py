@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from insomnia_run.iterations import IterationAggregator, merge_iteration_reports
+from insomnia_run.models import InsoResult, InsoRunReport, InsoStatus
+
+
+def _result(status, description, request_id=None):
+    return InsoResult(
+        id=1, status=status, description=description, request_id=request_id
+    )
+
+
+class TestIterationAggregator:
+    @pytest.fixture
+    def aggregator(self, tmp_path):
+        return IterationAggregator(str(tmp_path))
+
+    def test_summarizes_each_test_across_iterations(self, aggregator):
+        statuses = [InsoStatus.PASS, InsoStatus.FAIL, InsoStatus.FAIL, InsoStatus.PASS]
+        for status in statuses:
+            aggregator.add(_result(InsoStatus.PASS, "Status is 200", "req_1"), 0.1)
+            aggregator.add(_result(status, "Has body", "req_1"), 0.1)
+        aggregator.close()
+
+        stable, flaky = aggregator.summaries
+        assert (stable.runs, stable.passed, stable.failed) == (4, 4, 0)
+        assert stable.first_failed_iteration is None
+        assert (flaky.runs, flaky.passed, flaky.failed) == (4, 2, 2)
+        assert flaky.first_failed_iteration == 2
+        assert flaky.failure_rate == pytest.approx(50.0)
+        assert aggregator.runs == 8
+
+    def test_results_are_streamed_to_the_log(self, aggregator):
+        aggregator.add(_result(InsoStatus.PASS, "A"), 0.25)
+        aggregator.add(_result(InsoStatus.FAIL, "A"), 0.5)
+        aggregator.close()
+
+        with open(aggregator.log_path, encoding="utf-8") as log:
+            lines = [json.loads(line) for line in log]
+        assert [(line["iteration"], line["status"]) for line in lines] == [
+            (1, "PASS"),
+            (2, "FAIL"),
+        ]
+        assert [line["duration_ms"] for line in lines] == [250, 500]
+
+    def test_results_keep_the_first_failure(self, aggregator):
+        first = _result(InsoStatus.FAIL, "A")
+        aggregator.add(_result(InsoStatus.PASS, "A"), 0)
+        aggregator.add(first, 0)
+        # Diagnostics are attached after the result line has been fed.
+        first.diagnostic_raw = "message: first"
+        aggregator.add(_result(InsoStatus.FAIL, "A"), 0)
+        aggregator.add(_result(InsoStatus.SKIP, "B"), 0)
+        aggregator.close()
+
+        failing, skipped = aggregator.results()
+        assert (failing.id, failing.status, failing.iteration) == (1, InsoStatus.FAIL, 2)
+        assert failing.decode_diagnostic().message == "first"
+        assert (skipped.id, skipped.status) == (2, InsoStatus.SKIP)
+
+    def test_resolves_request_ids_and_durations(self, tmp_path):
+        aggregator = IterationAggregator(
+            str(tmp_path),
+            resolve=lambda result: "req_1",
+            request_durations={"req_1": 1.5},
+        )
+        aggregator.add(_result(InsoStatus.PASS, "A"), 0.1)
+        aggregator.close()
+
+        (summary,) = aggregator.summaries
+        assert summary.request_id == "req_1"
+        assert aggregator.results()[0].request_id == "req_1"
+
+
+class TestMergeIterationReports:
+    def _chunk_report(self, tmp_path, statuses):
+        aggregator = IterationAggregator(str(tmp_path))
+        for status in statuses:
+            aggregator.add(_result(status, "Has name", "req_1"), 0)
+        aggregator.close()
+        return InsoRunReport(
+            plan_end=len(statuses),
+            results=aggregator.results(),
+            iterations=aggregator.summaries,
+            iteration_logs=[aggregator.log_path],
+        )
+
+    def test_iterations_map_back_to_data_rows(self, tmp_path):
+        first = self._chunk_report(tmp_path, [InsoStatus.PASS] * 3)
+        second = self._chunk_report(tmp_path, [InsoStatus.PASS, InsoStatus.FAIL])
+        second.results.append(
+            InsoResult(id=2, status=InsoStatus.FAIL, description="Inso CLI Error: boom")
+        )
+
+        report = merge_iteration_reports([first, second], [0, 3], log_dir=str(tmp_path))
+
+        (summary,) = report.iterations
+        assert (summary.runs, summary.failed, summary.first_failed_iteration) == (5, 1, 5)
+        assert [(r.id, r.status, r.iteration) for r in report.results] == [
+            (1, InsoStatus.FAIL, 5),
+            (2, InsoStatus.FAIL, None),
+        ]
+
+        (log,) = report.iteration_logs
+        with open(log, encoding="utf-8") as handle:
+            assert [json.loads(line)["iteration"] for line in handle] == [1, 2, 3, 4, 5]
+        assert sorted(p.name for p in tmp_path.iterdir()) == [Path(log).name]
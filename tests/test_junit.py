@@ -0,0 +1,76 @@
+import io
+import xml.etree.ElementTree as ET
+
+from insomnia_run.junit import JUnitWriter, write_junit
+from insomnia_run.models import InsoResult, InsoRunReport, InsoStatus
+
+
+def _parse(text):
+    return ET.fromstring(text.encode("utf-8"))
+
+
+class TestJUnitWriter:
+    def test_writes_counts_before_testcases(self):
+        stream = io.StringIO()
+        with JUnitWriter(stream, name="API") as writer:
+            writer.add(
+                InsoResult(
+                    id=1,
+                    status=InsoStatus.PASS,
+                    description="Users / Get user / Status is 200",
+                    duration_ms=120.0,
+                )
+            )
+            writer.add(
+                InsoResult(
+                    id=2,
+                    status=InsoStatus.FAIL,
+                    description="Has name",
+                    duration_ms=30.0,
+                    diagnostic_raw="  message: expected 'a' < 'b'\n  actual: 2",
+                )
+            )
+            writer.add(
+                InsoResult(id=3, status=InsoStatus.SKIP, description="Later # SKIP")
+            )
+
+        root = _parse(stream.getvalue())
+        suite = root.find("testsuite")
+        assert suite.get("tests") == "3"
+        assert suite.get("failures") == "1"
+        assert suite.get("skipped") == "1"
+        assert suite.get("time") == "0.150"
+
+        passed, failed, skipped = suite.findall("testcase")
+        assert passed.get("name") == "Status is 200"
+        assert passed.get("classname") == "Users.Get user"
+        assert passed.get("time") == "0.120"
+        assert failed.get("classname") == "API"
+        failure = failed.find("failure")
+        assert failure.get("message") == "expected 'a' < 'b'"
+        assert "actual: 2" in failure.text
+        assert skipped.find("skipped") is not None
+
+    def test_invalid_xml_characters_are_dropped(self):
+        stream = io.StringIO()
+        with JUnitWriter(stream) as writer:
+            writer.add(
+                InsoResult(id=1, status=InsoStatus.FAIL, description="Bad \x1b[31mcolor")
+            )
+
+        testcase = _parse(stream.getvalue()).find("testsuite/testcase")
+        assert testcase.get("name") == "Bad [31mcolor"
+        assert testcase.find("failure").get("message") == "Bad [31mcolor"
+
+    def test_write_junit_uses_target_name(self):
+        report = InsoRunReport(
+            target_name="My Collection",
+            plan_end=1,
+            results=[InsoResult(id=1, status=InsoStatus.PASS, description="Test 1")],
+        )
+        stream = io.StringIO()
+        write_junit(report, stream)
+
+        root = _parse(stream.getvalue())
+        assert root.get("name") == "My Collection"
+        assert root.find("testsuite/testcase").get("classname") == "My Collection"
@@ -4,6 +4,8 @@ from insomnia_run.models import (
     InsoStatus,
     InsoResult,
     InsoRunReport,
+    ResultList,
+    ColumnarResults,
     InsoCollectionOptions,
     InsoTestOptions,
 )
@@ -96,6 +98,133 @@ class TestInsoRunReport:
         assert report.tap_version == 13
 
 
+def _results(*statuses):
+    return [
+        InsoResult(id=i, status=status, description=f"test {i}")
+        for i, status in enumerate(statuses, start=1)
+    ]
+
+
+class TestResultList:
+    def _tallies(self, results):
+        return tuple(results.tally(status) for status in InsoStatus)
+
+    def test_tally_follows_mutations(self):
+        results = ResultList(_results(InsoStatus.PASS, InsoStatus.FAIL))
+        assert self._tallies(results) == (1, 1, 0)
+
+        results.append(_results(InsoStatus.SKIP)[0])
+        results.extend(_results(InsoStatus.PASS, InsoStatus.PASS))
+        results.insert(0, _results(InsoStatus.FAIL)[0])
+        assert self._tallies(results) == (3, 2, 1)
+
+        results.pop()
+        results.remove(results[0])
+        del results[:1]
+        assert self._tallies(results) == (1, 1, 1)
+
+        results[0] = _results(InsoStatus.FAIL)[0]
+        results[1:] = _results(InsoStatus.PASS)
+        assert self._tallies(results) == (1, 1, 0)
+
+        results += _results(InsoStatus.SKIP)
+        assert self._tallies(results) == (1, 1, 1)
+        results.clear()
+        assert self._tallies(results) == (0, 0, 0)
+
+    def test_report_keeps_result_list(self):
+        report = InsoRunReport(plan_end=2, results=_results(InsoStatus.PASS))
+        assert isinstance(report.results, ResultList)
+
+        report.results = _results(InsoStatus.FAIL, InsoStatus.FAIL)
+        assert report.failed_count == 2
+
+        restored = InsoRunReport.model_validate_json(report.model_dump_json())
+        assert restored.failed_count == 2
+        assert report.model_copy(deep=True).failed_count == 2
+
+    def test_counts_do_not_scan_results(self, monkeypatch):
+        report = InsoRunReport(
+            plan_end=3,
+            results=_results(InsoStatus.PASS, InsoStatus.FAIL, InsoStatus.SKIP),
+        )
+
+        def fail(self):
+            raise AssertionError("results were iterated")
+
+        monkeypatch.setattr(ResultList, "__iter__", fail)
+        assert report.passed_count == 1
+        assert report.failed_count == 1
+        assert report.skipped_count == 1
+        assert report.success_rate == pytest.approx(100 / 3)
+
+
+class TestColumnarResults:
+    def _sample(self):
+        return [
+            InsoResult(id=1, status=InsoStatus.PASS, description="A", request_id="req_1"),
+            InsoResult(
+                id=2,
+                status=InsoStatus.FAIL,
+                description="B",
+                path=["Users", "Create"],
+                duration_ms=12.5,
+                diagnostic_raw="message: boom",
+            ),
+            InsoResult(id=3, status=InsoStatus.SKIP, description="A", request_id="req_1"),
+        ]
+
+    def test_serializes_like_a_result_list(self):
+        columnar = InsoRunReport(plan_end=3, results=ColumnarResults(self._sample()))
+        plain = InsoRunReport(plan_end=3, results=self._sample())
+
+        assert isinstance(columnar.results, ColumnarResults)
+        assert columnar.model_dump_json() == plain.model_dump_json()
+        assert columnar.model_dump() == plain.model_dump()
+
+    def test_counts_and_views(self):
+        results = ColumnarResults(self._sample())
+
+        assert len(results) == 3
+        assert [results.tally(status) for status in InsoStatus] == [1, 1, 1]
+        assert [r.id for r in results[1:]] == [2, 3]
+        assert results[-2].path == ["Users", "Create"]
+        assert results[-2].duration_ms == 12.5
+        assert results[0].duration_ms is None
+        with pytest.raises(IndexError):
+            results[3]
+
+    def test_descriptions_are_interned(self):
+        results = ColumnarResults(self._sample() * 1000)
+
+        assert len(results) == 3000
+        assert sorted(results._strings) == ["", "A", "B", "Users\x1fCreate", "req_1"]
+
+    def test_assignments_on_views_are_stored(self):
+        results = ColumnarResults(self._sample())
+        view = results[0]
+        view.status = InsoStatus.FAIL
+        view.request_id = None
+        results[1].decode_diagnostic()
+
+        assert results[0].status == InsoStatus.FAIL
+        assert results[0].request_id is None
+        assert results.tally(InsoStatus.FAIL) == 2
+        assert results[1].diagnostic.message == "boom"
+
+        results[2] = InsoResult(id=9, status=InsoStatus.PASS, description="C")
+        assert (results[2].id, results[2].description) == (9, "C")
+        assert results.tally(InsoStatus.SKIP) == 0
+
+    def test_copies_are_detached(self):
+        results = ColumnarResults(self._sample())
+        copy = results[0].model_copy(update={"id": 7})
+        copy.description = "changed"
+
+        assert type(copy) is InsoResult
+        assert results[0].description == "A"
+
+
 class TestInsoCollectionOptions:
     def test_minimal_options(self):
         options = InsoCollectionOptions(working_dir="/path/to/insomnia")
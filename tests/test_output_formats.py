@@ -22,3 +22,16 @@ def test_emit_output_none_format():
     with patch("insomnia_run.main.typer.echo") as mock_echo:
         _emit_machine_readable_output(Mock(), None)
     mock_echo.assert_not_called()
+
+def test_emit_junit_output():
+    from insomnia_run.models import InsoResult, InsoRunReport, InsoStatus
+
+    report = InsoRunReport(
+        plan_end=1,
+        results=[InsoResult(id=1, status=InsoStatus.PASS, description="Test 1")]
+    )
+    with patch("insomnia_run.main.sys.stderr") as mock_stderr:
+        _emit_machine_readable_output(report, "junit")
+
+    written = "".join(call.args[0] for call in mock_stderr.write.call_args_list)
+    assert '<testsuite name="insomnia-run" tests="1"' in written
@@ -0,0 +1,199 @@
+import io
+import json
+import xml.etree.ElementTree as ET
+from unittest.mock import MagicMock, patch
+
+import pytest
+from typer.testing import CliRunner
+
+from insomnia_run.main import app
+from insomnia_run.models import InsoResult, InsoRunReport, InsoStatus
+from insomnia_run.outputs import parse_output, write_outputs
+
+
+def _report():
+    return InsoRunReport(
+        plan_end=2,
+        target_name="API",
+        results=[
+            InsoResult(id=1, status=InsoStatus.PASS, description="Fine"),
+            InsoResult(
+                id=2,
+                status=InsoStatus.FAIL,
+                description="Broken",
+                diagnostic_raw="  message: boom",
+            ),
+        ],
+    )
+
+
+class TestParseOutput:
+    def test_format_and_path(self):
+        assert parse_output("JUnit=reports/junit.xml") == ("junit", "reports/junit.xml")
+
+    def test_path_may_contain_equals(self):
+        assert parse_output("json=a=b.json") == ("json", "a=b.json")
+
+    @pytest.mark.parametrize("spec", ["json", "json=", "xml=report.xml"])
+    def test_invalid_specs(self, spec):
+        with pytest.raises(ValueError):
+            parse_output(spec)
+
+
+class TestWriteOutputs:
+    def test_writes_every_format(self, tmp_path):
+        outputs = [
+            ("markdown", str(tmp_path / "report.md")),
+            ("json", str(tmp_path / "out" / "report.json")),
+            ("jsonl", str(tmp_path / "results.jsonl")),
+            ("junit", str(tmp_path / "junit.xml")),
+        ]
+        write_outputs(_report(), outputs, lambda report: f"# {report.target_name}")
+
+        assert (tmp_path / "report.md").read_text() == "# API\n"
+
+        loaded = InsoRunReport.model_validate_json(
+            (tmp_path / "out" / "report.json").read_text()
+        )
+        assert loaded.target_name == "API"
+        assert [r.description for r in loaded.results] == ["Fine", "Broken"]
+        assert loaded.results[1].diagnostic.message == "boom"
+
+        lines = (tmp_path / "results.jsonl").read_text().splitlines()
+        assert [json.loads(line)["status"] for line in lines] == ["PASS", "FAIL"]
+
+        suite = ET.parse(tmp_path / "junit.xml").getroot().find("testsuite")
+        assert suite.get("tests") == "2"
+        assert suite.get("failures") == "1"
+
+    def test_results_are_iterated_once(self, tmp_path):
+        report = _report()
+        outputs = [
+            ("json", str(tmp_path / "report.json")),
+            ("junit", str(tmp_path / "junit.xml")),
+        ]
+        with patch.object(
+            type(report.results), "__iter__", side_effect=lambda: iter([])
+        ) as mock_iter:
+            write_outputs(report, outputs, lambda report: "")
+
+        assert mock_iter.call_count == 1
+
+    def test_files_are_closed_when_writing_fails(self, tmp_path):
+        outputs = [
+            ("junit", str(tmp_path / "junit.xml")),
+            ("markdown", str(tmp_path / "report.md")),
+        ]
+        handles = []
+        real_open = open
+
+        def _open(*args, **kwargs):
+            handles.append(real_open(*args, **kwargs))
+            return handles[-1]
+
+        def _render(report):
+            raise RuntimeError("boom")
+
+        with patch("builtins.open", side_effect=_open):
+            with pytest.raises(RuntimeError):
+                write_outputs(_report(), outputs, _render)
+
+        assert len(handles) == 2
+        assert all(handle.closed for handle in handles)
+        assert (tmp_path / "junit.xml").read_text() == ""
+
+
+class TestOutputOption:
+    def test_markdown_file_replaces_stdout(self, tmp_path):
+        process = MagicMock()
+        process.stdout = io.StringIO("1..1\nok 1 - Fine\n")
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 0
+
+        with patch("insomnia_run.runner.subprocess.Popen", return_value=process):
+            result = CliRunner().invoke(
+                app,
+                [
+                    "run-test",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--output",
+                    f"markdown={tmp_path / 'report.md'}",
+                    "--output",
+                    f"junit={tmp_path / 'junit.xml'}",
+                ],
+            )
+
+        assert result.exit_code == 0
+        assert "(all passed)" not in result.stdout
+        assert "(all passed)" in (tmp_path / "report.md").read_text()
+        assert (tmp_path / "junit.xml").exists()
+
+    def test_invalid_output_is_rejected(self, tmp_path):
+        process = MagicMock()
+        process.stdout = io.StringIO("1..1\nok 1 - Fine\n")
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 0
+
+        with patch(
+            "insomnia_run.runner.subprocess.Popen", return_value=process
+        ) as popen:
+            result = CliRunner().invoke(
+                app,
+                ["run-test", "--working-dir", str(tmp_path), "--output", "pdf=x.pdf"],
+            )
+
+        assert result.exit_code == 2
+        popen.assert_not_called()
+
+    def test_progress_conflicts_with_stderr_output_format(self, tmp_path):
+        with patch("insomnia_run.runner.subprocess.Popen") as popen:
+            result = CliRunner().invoke(
+                app,
+                [
+                    "run-test",
+                    "--working-dir",
+                    str(tmp_path),
+                    "--output-format",
+                    "junit",
+                    "--progress",
+                ],
+            )
+
+        assert result.exit_code == 2
+        popen.assert_not_called()
+
+
+class TestMergeCommand:
+    def _write(self, path, results):
+        path.write_text(
+            InsoRunReport(plan_end=len(results), target_name="API", results=results)
+            .model_dump_json()
+        )
+        return str(path)
+
+    def test_merges_reports(self, tmp_path):
+        first = self._write(
+            tmp_path / "a.json",
+            [InsoResult(id=1, status=InsoStatus.PASS, description="Fine")],
+        )
+        second = self._write(
+            tmp_path / "b.json",
+            [InsoResult(id=1, status=InsoStatus.FAIL, description="Broken")],
+        )
+
+        result = CliRunner().invoke(
+            app, ["merge", first, second, "--output", f"json={tmp_path / 'all.json'}"]
+        )
+
+        assert result.exit_code == 1
+        assert "**2 requests executed** (1 passed, 1 failed)" in result.stdout
+        assert "### Sources" in result.stdout
+        merged = InsoRunReport.model_validate_json((tmp_path / "all.json").read_text())
+        assert [r.id for r in merged.results] == [1, 2]
+        assert len(merged.sources) == 2
+
+    def test_unreadable_report(self, tmp_path):
+        result = CliRunner().invoke(app, ["merge", str(tmp_path / "missing.json")])
+
+        assert result.exit_code == 2
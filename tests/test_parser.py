@@ -1,6 +1,10 @@
+import json
+import io
+from unittest.mock import MagicMock, patch
+
 import pytest
 from insomnia_run.parser import TapParser
-from insomnia_run.models import InsoStatus
+from insomnia_run.models import InsoResult, InsoStatus
 
 def test_parse_real_user_collection_output():
     raw_output = """(node:20367) [DEP0040] DeprecationWarning: The `punycode` module is deprecated. Please use a userland alternative instead.
@@ -73,3 +77,195 @@ ok 3 Response has userId field
     assert report.results[0].status == InsoStatus.PASS
     assert report.results[1].status == InsoStatus.FAIL
     assert report.results[2].status == InsoStatus.PASS
+
+
+def test_feed_handles_lines_split_across_chunks():
+    parser = TapParser()
+    assert parser.feed("TAP version 13\n1..2\nok 1 - Fir") == []
+    results = parser.feed("st\nnot ok 2 - Sec")
+    assert [r.description for r in results] == ["First"]
+
+    report = parser.close()
+    assert report.plan_end == 2
+    assert [r.status for r in report.results] == [InsoStatus.PASS, InsoStatus.FAIL]
+    assert report.results[1].description == "Sec"
+
+
+def test_feed_line_ignores_non_tap_lines():
+    parser = TapParser()
+    assert parser.feed_line("[log] Running request: ok") is None
+    assert parser.feed_line("not a test line") is None
+    assert parser.feed_line("Test results:") is None
+    assert parser.feed_line("# tests 1") is None
+    assert parser.report.results == []
+
+
+def test_skip_directive_is_case_insensitive():
+    report = TapParser().parse("ok 1 - Pending request # skip not ready\n")
+    assert report.results[0].status == InsoStatus.SKIP
+
+
+def test_iter_results_streams_without_retaining_results():
+    stream = io.StringIO("TAP version 14\n1..3\nok 1 - A\nnot ok 2 - B\nok 3 - C # SKIP\n")
+    parser = TapParser()
+
+    statuses = [r.status for r in parser.iter_results(stream)]
+
+    assert statuses == [InsoStatus.PASS, InsoStatus.FAIL, InsoStatus.SKIP]
+    assert parser.report.tap_version == 14
+    assert parser.report.plan_end == 3
+    assert parser.report.results == []
+
+
+def test_duration_from_yaml_diagnostics():
+    raw_output = """TAP version 13
+1..2
+not ok 1 - Slow request
+  ---
+  message: timeout
+  duration_ms: 1532.5
+  ...
+ok 2 - Fast request
+"""
+    report = TapParser().parse(raw_output)
+
+    assert report.results[0].duration_ms == pytest.approx(1532.5)
+    assert report.results[1].duration_ms is None
+    assert report.results[1].status == InsoStatus.PASS
+
+
+def test_unterminated_diagnostic_block_does_not_swallow_results():
+    raw_output = "not ok 1 - A\n  ---\n  duration_ms: 5\nok 2 - B\n"
+    report = TapParser().parse(raw_output)
+
+    assert [r.description for r in report.results] == ["A", "B"]
+    assert report.results[0].duration_ms == pytest.approx(5)
+
+
+def test_iter_results_applies_diagnostics_before_yielding():
+    stream = io.StringIO("ok 1 - A\n  ---\n  duration_ms: 12\n  ...\nok 2 - B\n")
+    durations = [r.duration_ms for r in TapParser().iter_results(stream)]
+
+    assert durations == [12, None]
+
+
+def test_diagnostic_block_is_kept_raw_until_decoded():
+    raw_output = """not ok 1 - Status is 404
+  ---
+  message: expected 200 to equal 404
+  expected: 404
+  actual: 200
+  at: tests.js:12
+  ...
+ok 2 - Fine
+"""
+    report = TapParser().parse(raw_output)
+    failed = report.results[0]
+
+    assert failed.diagnostic is None
+    assert "expected 200 to equal 404" in failed.diagnostic_raw
+    assert report.results[1].diagnostic_raw is None
+
+    diagnostic = failed.decode_diagnostic()
+    assert diagnostic.message == "expected 200 to equal 404"
+    assert diagnostic.expected == "404"
+    assert diagnostic.actual == "200"
+    assert diagnostic.at == "tests.js:12"
+
+
+def test_diagnostic_is_decoded_for_json_output():
+    report = TapParser().parse("not ok 1 - A\n  ---\n  message: boom\n  ...\n")
+    data = json.loads(report.model_dump_json())
+
+    result = data["results"][0]
+    assert result["diagnostic"]["message"] == "boom"
+    assert "diagnostic_raw" not in result
+
+
+def test_parse_subtests_into_paths():
+    raw_output = """TAP version 14
+1..2
+# Subtest: Users
+    # Subtest: Create user
+        ok 1 - returns 201
+        not ok 2 - has id
+          ---
+          message: missing id
+          ...
+        1..2
+    not ok 1 - Create user
+    ok 2 - list is empty
+    1..2
+not ok 1 - Users
+ok 2 - health check
+"""
+    report = TapParser().parse(raw_output)
+
+    assert [(r.id, r.path, r.description) for r in report.results] == [
+        (1, ["Users", "Create user"], "returns 201"),
+        (2, ["Users", "Create user"], "has id"),
+        (3, ["Users"], "list is empty"),
+        (4, [], "health check"),
+    ]
+    assert report.plan_end == 2
+    assert report.failed_count == 1
+    assert report.results[1].decode_diagnostic().message == "missing id"
+
+
+def test_subtest_comment_without_nesting_is_ignored():
+    report = TapParser().parse("# Subtest: flat\nok 1 - a\nok 2 - b\n1..2\n")
+
+    assert [(r.id, r.path) for r in report.results] == [(1, []), (2, [])]
+
+
+def test_columnar_parser_stores_diagnostics():
+    parser = TapParser(columnar=True)
+    report = parser.parse("1..2\nnot ok 1 - A\n  ---\n  message: boom\n  ...\nok 2 - B\n")
+
+    assert type(report.results).__name__ == "ColumnarResults"
+    assert report.failed_count == 1
+    assert report.results[0].decode_diagnostic().message == "boom"
+
+
+def test_columnar_parse_builds_no_result_models():
+    validator = MagicMock(wraps=InsoResult.__pydantic_validator__)
+    with patch.object(InsoResult, "__pydantic_validator__", validator):
+        report = TapParser(columnar=True).parse(
+            "1..2\nnot ok 1 - A\n  ---\n  duration_ms: 5\n  ...\nok 2 - B # SKIP\n"
+        )
+        assert validator.validate_python.call_count == 0
+
+        results = TapParser().parse("ok 1 - A\n").results
+        assert validator.validate_python.call_count == len(results) == 1
+
+    assert [(r.id, r.status, r.duration_ms) for r in report.results] == [
+        (1, InsoStatus.FAIL, 5),
+        (2, InsoStatus.SKIP, None),
+    ]
+
+
+def test_default_parse_builds_each_result_once_without_records():
+    validator = MagicMock(wraps=InsoResult.__pydantic_validator__)
+    with patch.object(InsoResult, "__pydantic_validator__", validator), patch(
+        "insomnia_run.parser._TapRecord"
+    ) as record:
+        report = TapParser().parse(
+            "1..3\nok 1 - A\nnot ok 2 - B\n  ---\n  duration_ms: 5\n  ...\nok 3 - C\n"
+        )
+
+    record.assert_not_called()
+    assert validator.validate_python.call_count == len(report.results) == 3
+    assert all(type(r) is InsoResult for r in report.results)
+    assert report.results[1].duration_ms == 5
+
+
+def test_feed_line_returns_the_retained_result():
+    parser = TapParser()
+    result = parser.feed_line("not ok 1 - A")
+    parser.feed_line("  ---")
+    parser.feed_line("  duration_ms: 7")
+    parser.feed_line("  ...")
+
+    assert parser.close().results[0] is result
+    assert result.duration_ms == 7
+    assert result.diagnostic_raw == "  duration_ms: 7"
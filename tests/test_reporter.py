@@ -137,3 +137,290 @@ class TestReporterEdgeCases:
         markdown = reporter.generate_markdown(report)
 
         assert ("A" * 100) in markdown
+
+    def test_shard_wall_times(self, reporter):
+        from insomnia_run.models import ShardSummary
+
+        report = InsoRunReport(
+            plan_end=0,
+            shards=[
+                ShardSummary(index=1, item_count=3, wall_time=12.34, estimated_time=12.0),
+                ShardSummary(index=2, item_count=4, wall_time=11.0),
+            ],
+        )
+        markdown = reporter.generate_markdown(report)
+
+        assert "### Shards" in markdown
+        assert "| 1 | 3 | 12.3s | 12.0s |" in markdown
+        assert "| 2 | 4 | 11.0s | — |" in markdown
+
+    def test_timed_out_progress(self, reporter):
+        report = InsoRunReport(plan_end=10, timed_out=True, completed_tests=4)
+        markdown = reporter.generate_markdown(report)
+
+        assert "**Timed out** after 4 of 10 planned tests completed" in markdown
+
+    def test_served_from_cache(self, reporter):
+        report = InsoRunReport(plan_end=0, from_cache=True)
+        markdown = reporter.generate_markdown(report)
+
+        assert "**Served from cache**" in markdown
+
+    def test_timings_and_slowest_tests(self, reporter):
+        report = InsoRunReport(
+            plan_end=3,
+            results=[
+                InsoResult(id=1, status=InsoStatus.PASS, description="Fast", duration_ms=20),
+                InsoResult(id=2, status=InsoStatus.PASS, description="Slow", duration_ms=2500),
+                InsoResult(id=3, status=InsoStatus.FAIL, description="Medium", duration_ms=400),
+            ],
+        )
+        markdown = reporter.generate_markdown(report)
+
+        assert "### Timings" in markdown
+        assert "**Total:** 2.9s · **p50:** 400 ms · **p95:** 2.5s · **max:** 2.5s" in markdown
+        assert "| Slowest 3 | Duration |" in markdown
+        slow, medium, fast = (markdown.index(f"| {name} |") for name in ("Slow", "Medium", "Fast"))
+        assert slow < medium < fast
+
+    def test_no_timings_without_durations(self, reporter):
+        report = InsoRunReport(
+            plan_end=1,
+            results=[InsoResult(id=1, status=InsoStatus.PASS, description="A")],
+        )
+        assert "### Timings" not in reporter.generate_markdown(report)
+
+    def test_failure_details_from_diagnostics(self, reporter):
+        report = InsoRunReport(
+            plan_end=2,
+            results=[
+                InsoResult(
+                    id=1,
+                    status=InsoStatus.FAIL,
+                    description="Status is 404",
+                    diagnostic_raw="  message: wrong status\n  expected: 404\n  actual: 200\n",
+                ),
+                InsoResult(
+                    id=2,
+                    status=InsoStatus.PASS,
+                    description="Fine",
+                    diagnostic_raw="  message: never decoded\n",
+                ),
+            ],
+        )
+        markdown = reporter.generate_markdown(report)
+
+        assert "- ❌ **Status is 404**\n  - wrong status\n  - Expected `404`, got `200`" in markdown
+        assert "never decoded" not in markdown
+        assert report.results[1].diagnostic is None
+
+    def test_passing_folders_are_collapsed(self, reporter):
+        report = InsoRunReport(
+            plan_end=4,
+            results=[
+                InsoResult(id=1, status=InsoStatus.PASS, description="Auth / login"),
+                InsoResult(id=2, status=InsoStatus.PASS, description="Auth / logout"),
+                InsoResult(id=3, status=InsoStatus.PASS, description="Users / list"),
+                InsoResult(id=4, status=InsoStatus.FAIL, description="Users / create"),
+            ],
+        )
+        markdown = reporter.generate_markdown(report)
+
+        assert "- ✅ **Auth** (2 passed)" in markdown
+        assert "login" not in markdown
+        assert (
+            "- ❌ **Users** (1 passed, 1 failed)\n"
+            "  - ✅ **list**\n"
+            "  - ❌ **create**"
+        ) in markdown
+
+    def test_iteration_section_lists_failing_tests(self, reporter):
+        from insomnia_run.models import IterationSummary
+
+        report = InsoRunReport(
+            plan_end=20,
+            results=[
+                InsoResult(id=1, status=InsoStatus.PASS, description="Status is 200"),
+                InsoResult(id=2, status=InsoStatus.FAIL, description="Has name"),
+            ],
+            iterations=[
+                IterationSummary(description="Status is 200", runs=10, passed=10),
+                IterationSummary(
+                    description="Has name",
+                    runs=10,
+                    passed=7,
+                    failed=3,
+                    first_failed_iteration=4,
+                ),
+            ],
+            iteration_logs=["/tmp/iterations.jsonl"],
+        )
+        markdown = reporter.generate_markdown(report)
+
+        assert "### Iterations" in markdown
+        assert "- **20 runs** of 2 tests over 10 iterations" in markdown
+        assert "- **1 tests** never failed" in markdown
+        assert "`/tmp/iterations.jsonl`" in markdown
+        assert "| Has name | 10 | 3 | 30.0% | #4 |" in markdown
+        assert "| Status is 200 |" not in markdown
+
+
+class TestReporterSources:
+    def test_sources_table(self):
+        from insomnia_run.models import SourceSummary
+
+        report = InsoRunReport(
+            plan_end=0,
+            sources=[
+                SourceSummary(name="staging.json", target_name="API", passed=3),
+                SourceSummary(name="prod.json", passed=1, failed=2, skipped=1),
+            ],
+        )
+        markdown = Reporter().generate_markdown(report)
+
+        assert "### Sources" in markdown
+        assert "| ✅ `staging.json` | API | 3 | 0 | 0 |" in markdown
+        assert "| ❌ `prod.json` | — | 1 | 2 | 1 |" in markdown
+
+
+class TestReporterBaselineDiff:
+    def test_changes_section(self):
+        from insomnia_run.models import ReportDiff, ResultChange
+
+        report = InsoRunReport(
+            plan_end=0,
+            diff=ReportDiff(
+                baseline="main.json",
+                newly_failing=[ResultChange(description="Status is 200")],
+                removed=[ResultChange(description="Old test")],
+                slower=[
+                    ResultChange(
+                        description="Search",
+                        duration_ms=600.0,
+                        baseline_duration_ms=200.0,
+                    )
+                ],
+            ),
+        )
+        markdown = Reporter().generate_markdown(report)
+
+        assert "### Changes Since Baseline" in markdown
+        assert "- ❌ **1 newly failing**\n  - Status is 200" in markdown
+        assert "- 🗑️ **1 removed**\n  - Old test" in markdown
+        assert "  - Search: 200 ms → 600 ms (+200%)" in markdown
+        assert "newly passing" not in markdown
+
+    def test_no_changes(self):
+        from insomnia_run.models import ReportDiff
+
+        report = InsoRunReport(plan_end=0, diff=ReportDiff(baseline="main.json"))
+
+        assert "- No changes in results or durations since `main.json`" in (
+            Reporter().generate_markdown(report)
+        )
+
+    def test_changes_are_cut_to_leave_room_for_failures(self):
+        from insomnia_run.models import ReportDiff, ResultChange
+
+        report = InsoRunReport(
+            plan_end=2000,
+            results=[
+                InsoResult(id=i, status=InsoStatus.FAIL, description=f"Test {i}")
+                for i in range(2000)
+            ],
+            diff=ReportDiff(
+                baseline="main.json",
+                added=[ResultChange(description=f"Test {i}") for i in range(2000)],
+            ),
+        )
+        markdown = Reporter().generate_markdown(report, max_chars=10_000)
+
+        assert len(markdown) <= 10_000
+        assert "  - …\n" in markdown
+        assert "- ❌ **Test 0**" in markdown
+
+
+class TestReporterFlakyResults:
+    def test_flaky_results_are_marked(self):
+        report = InsoRunReport(
+            plan_end=2,
+            results=[
+                InsoResult(
+                    id=1, status=InsoStatus.PASS, description="Gateway", flaky=True
+                ),
+                InsoResult(id=2, status=InsoStatus.PASS, description="Stable"),
+            ],
+        )
+        markdown = Reporter().generate_markdown(report)
+
+        assert "- **1 flaky** (failed, then passed on retry)" in markdown
+        assert "- ✅ **Gateway** _(flaky: passed on retry)_" in markdown
+        assert "- ✅ **Stable**\n" in markdown
+
+
+class TestReporterCommentBudget:
+    @pytest.fixture
+    def reporter(self):
+        return Reporter()
+
+    @staticmethod
+    def _large_report(count, failing_every, raw_output=""):
+        return InsoRunReport(
+            plan_end=count,
+            raw_output=raw_output,
+            results=[
+                InsoResult(
+                    id=i,
+                    status=InsoStatus.FAIL if i % failing_every == 0 else InsoStatus.PASS,
+                    description=f"Folder / Request {i} / test",
+                    diagnostic_raw="  message: boom" if i % failing_every == 0 else None,
+                )
+                for i in range(1, count + 1)
+            ],
+        )
+
+    def test_report_that_fits_is_unchanged(self, reporter):
+        report = self._large_report(10, 5, raw_output="some output")
+
+        assert reporter.generate_markdown(report) == reporter.generate_markdown(
+            report, max_chars=None
+        )
+
+    def test_large_report_stays_within_budget(self, reporter):
+        report = self._large_report(100_000, 1000, raw_output="x\n" * 100_000)
+        markdown = reporter.generate_markdown(report)
+
+        assert len(markdown) <= 65536
+        assert "**100000 requests executed** (99900 passed, 100 failed)" in markdown
+        assert "shortened to fit 65536 characters" in markdown
+        assert "- ✅ **99900 passed**" in markdown
+        assert "Request 1 /" not in markdown
+        assert markdown.count("- ❌ **Folder / Request") == 100
+        assert "  - boom" in markdown
+
+    def test_failures_take_priority_over_raw_output(self, reporter):
+        report = self._large_report(2_000, 1, raw_output="y\n" * 1000)
+        markdown = reporter.generate_markdown(report, max_chars=5000)
+
+        assert len(markdown) <= 5000
+        assert "more failures" in markdown
+        assert "View raw output" not in markdown
+
+    def test_raw_output_without_a_whole_line_left_is_omitted(self, reporter):
+        report = self._large_report(50, 10, raw_output="z" * 100_000)
+        markdown = reporter.generate_markdown(report, max_chars=4000)
+
+        assert len(markdown) <= 4000
+        assert "View raw output" not in markdown
+        assert markdown.endswith("_Raw output omitted (100000 characters)._")
+
+    def test_raw_output_is_cut_to_a_closed_tail(self, reporter):
+        raw_output = "\n".join(f"line {i} ```" for i in range(10_000))
+        report = self._large_report(50, 10, raw_output=raw_output)
+        markdown = reporter.generate_markdown(report, max_chars=4000)
+
+        assert len(markdown) <= 4000
+        assert "line 9999 ```" in markdown
+        assert "line 0 ```" not in markdown
+        assert "````\nline" in markdown
+        assert markdown.endswith("````\n</details>")
@@ -0,0 +1,154 @@
+from unittest.mock import MagicMock, patch
+import io
+
+from typer.testing import CliRunner
+
+from insomnia_run.main import app
+from insomnia_run.models import InsoResult, InsoRunReport, InsoStatus
+from insomnia_run.rerun import failed_request_ids, merge_rerun
+
+
+def _result(id, status, description, request_id=None):
+    return InsoResult(
+        id=id, status=status, description=description, request_id=request_id
+    )
+
+
+class TestFailedRequestIds:
+    def test_unique_in_order(self):
+        report = InsoRunReport(
+            plan_end=4,
+            results=[
+                _result(1, InsoStatus.FAIL, "A", "req_2"),
+                _result(2, InsoStatus.PASS, "B", "req_1"),
+                _result(3, InsoStatus.FAIL, "C", "req_2"),
+                _result(4, InsoStatus.FAIL, "D"),
+            ],
+        )
+        assert failed_request_ids(report) == ["req_2"]
+
+
+class TestMergeRerun:
+    def test_replaces_matching_results_and_keeps_ids(self):
+        original = InsoRunReport(
+            plan_end=3,
+            raw_output="first run",
+            results=[
+                _result(1, InsoStatus.PASS, "Status is 200", "req_1"),
+                _result(2, InsoStatus.FAIL, "Status is 200", "req_2"),
+                _result(3, InsoStatus.FAIL, "Has body", "req_2"),
+            ],
+        )
+        rerun = InsoRunReport(
+            plan_end=3,
+            raw_output="second run",
+            results=[
+                _result(1, InsoStatus.PASS, "Status is 200", "req_2"),
+                _result(2, InsoStatus.FAIL, "Has body", "req_2"),
+                _result(3, InsoStatus.PASS, "New test", "req_2"),
+            ],
+        )
+
+        merged = merge_rerun(original, rerun)
+
+        assert [(r.id, r.status, r.description) for r in merged.results] == [
+            (1, InsoStatus.PASS, "Status is 200"),
+            (2, InsoStatus.PASS, "Status is 200"),
+            (3, InsoStatus.FAIL, "Has body"),
+            (4, InsoStatus.PASS, "New test"),
+        ]
+        assert original.results[1].status == InsoStatus.FAIL
+        assert merged.raw_output == "first run\n=== Re-run ===\nsecond run"
+        assert [r.flaky for r in merged.results] == [False, True, False, False]
+
+    def test_flaky_result_stays_flaky_while_it_passes(self):
+        original = InsoRunReport(
+            plan_end=2,
+            results=[
+                _result(1, InsoStatus.PASS, "Status is 200", "req_1"),
+                _result(2, InsoStatus.FAIL, "Has body", "req_1"),
+            ],
+        )
+        original.results[0].flaky = True
+        rerun = InsoRunReport(
+            plan_end=2,
+            results=[
+                _result(1, InsoStatus.PASS, "Status is 200", "req_1"),
+                _result(2, InsoStatus.FAIL, "Has body", "req_1"),
+            ],
+        )
+
+        merged = merge_rerun(original, rerun)
+
+        assert [r.flaky for r in merged.results] == [True, False]
+
+
+class TestRerunFailedCommand:
+    def _write_report(self, tmp_path, results):
+        path = tmp_path / "report.json"
+        report = InsoRunReport(plan_end=len(results), target_name="API", results=results)
+        path.write_text(report.model_dump_json())
+        return path
+
+    def test_reruns_only_failed_items(self, tmp_path):
+        path = self._write_report(
+            tmp_path,
+            [
+                _result(1, InsoStatus.PASS, "Fine", "req_ok"),
+                _result(2, InsoStatus.FAIL, "Flaky", "req_bad"),
+            ],
+        )
+        process = MagicMock()
+        process.stdout = io.StringIO("1..1\nok 1 - Flaky\n")
+        process.stderr = io.StringIO("")
+        process.wait.return_value = 0
+
+        with patch("insomnia_run.runner.subprocess.Popen", return_value=process) as mock_popen:
+            result = CliRunner().invoke(
+                app,
+                ["rerun-failed", "--from", str(path), "--working-dir", str(tmp_path)],
+            )
+
+        cmd = mock_popen.call_args[0][0]
+        assert cmd[3] == "API"
+        assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "--item"] == ["req_bad"]
+        assert result.exit_code == 0
+        assert "(all passed)" in result.stdout
+
+    def test_failures_without_request_ids(self, tmp_path):
+        path = self._write_report(tmp_path, [_result(1, InsoStatus.FAIL, "Unknown")])
+
+        result = CliRunner().invoke(
+            app, ["rerun-failed", "--from", str(path), "--working-dir", str(tmp_path)]
+        )
+
+        assert result.exit_code == 2
+
+
+class TestRetriesOption:
+    def test_failures_are_retried(self):
+        from pathlib import Path
+
+        workspace = Path(__file__).parent / "fixtures" / "mixed_results_suite.yaml"
+        outputs = iter(
+            [
+                "1..1\nnot ok 1 - Status code is 404 (intentional failure)\n",
+                "1..1\nok 1 - Status code is 404 (intentional failure)\n",
+            ]
+        )
+
+        def _popen(cmd, **kwargs):
+            process = MagicMock()
+            process.stdout = io.StringIO(next(outputs))
+            process.stderr = io.StringIO("")
+            process.wait.return_value = 0
+            return process
+
+        with patch("insomnia_run.runner.subprocess.Popen", side_effect=_popen):
+            result = CliRunner().invoke(
+                app,
+                ["run-collection", "--working-dir", str(workspace), "--retries", "2"],
+            )
+
+        assert result.exit_code == 0
+        assert "- **1 flaky** (failed, then passed on retry)" in result.stdout
@@ -1,7 +1,48 @@
+import io
+import subprocess
+import sys
+import time
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch, MagicMock
 from insomnia_run.runner import InsoRunner
-from insomnia_run.models import InsoCollectionOptions, InsoTestOptions, RunType
+from insomnia_run.models import (
+    InsoCollectionOptions,
+    InsoStatus,
+    InsoTestOptions,
+    RunType,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _fake_process(stdout, stderr="", returncode=0):
+    process = MagicMock()
+    # A process group that cannot exist, should the runner try to kill it.
+    process.pid = 2**31 - 1
+    process.stdout = io.StringIO(stdout)
+    process.stderr = io.StringIO(stderr)
+    process.returncode = returncode
+    process.wait.return_value = returncode
+    return process
+
+
+def _spawn_python(script):
+    """Patch target that runs a Python script in place of the inso command."""
+    real_popen = subprocess.Popen
+
+    def _popen(cmd, **kwargs):
+        return real_popen([sys.executable, "-c", script], **kwargs)
+
+    return _popen
+
+
+_HANGING_SCRIPT = """
+import time
+print("TAP version 13", flush=True)
+time.sleep(30)
+"""
 
 
 class TestInsoRunnerCollection:
@@ -11,16 +52,12 @@ class TestInsoRunnerCollection:
 
     @pytest.fixture
     def mock_subprocess(self):
-        with patch('insomnia_run.runner.subprocess.run') as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = """TAP version 13
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("""TAP version 13
 1..1
 ok 1 - Test passed
-"""
-            mock_result.stderr = ""
-            mock_result.returncode = 0
-            mock_run.return_value = mock_result
-            yield mock_run
+""")
+            yield mock_popen
 
     def test_minimal_collection_command(self, runner, mock_subprocess):
         options = InsoCollectionOptions(working_dir="/path/to/insomnia")
@@ -186,24 +223,168 @@ ok 1 - Test passed
 
         assert report.run_type == RunType.COLLECTION
 
-    def test_collection_with_execution_timeout(self, runner, mock_subprocess):
-        options = InsoCollectionOptions(
-            working_dir="/path",
-            execution_timeout=123
-        )
-        runner.run_collection(options)
-        mock_subprocess.assert_called_once()
-        _, kwargs = mock_subprocess.call_args
-        assert kwargs["timeout"] == 123
-
     def test_collection_timeout_error_message(self, runner):
-        from subprocess import TimeoutExpired
-        with patch('insomnia_run.runner.subprocess.run', side_effect=TimeoutExpired(cmd='inso', timeout=77)):
-            options = InsoCollectionOptions(working_dir="/path", execution_timeout=77)
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(_HANGING_SCRIPT)):
+            options = InsoCollectionOptions(working_dir="/path", execution_timeout=1)
             report = runner.run_collection(options)
             assert f"{options.execution_timeout}" in report.raw_output
             assert any(f"{options.execution_timeout}" in r.description for r in report.results)
 
+    def test_collection_timeout_keeps_partial_results(self, runner):
+        script = """
+import time
+print("TAP version 13\\n1..4\\nok 1 - First\\nnot ok 2 - Second", flush=True)
+time.sleep(30)
+"""
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(script)):
+            options = InsoCollectionOptions(working_dir="/path", execution_timeout=1)
+            report = runner.run_collection(options)
+
+        assert report.timed_out is True
+        assert report.completed_tests == 2
+        assert [r.status for r in report.results] == [
+            InsoStatus.PASS,
+            InsoStatus.FAIL,
+            InsoStatus.SKIP,
+            InsoStatus.SKIP,
+            InsoStatus.FAIL,
+        ]
+        assert report.results[2].description == "Not run: execution timed out"
+        assert report.results[4].id == 5
+        assert "ok 1 - First" in report.raw_output
+        assert "2 of 4 planned tests completed" in report.raw_output
+
+    def test_collection_timeout_kills_process_group(self, runner):
+        script = """
+import subprocess, sys, time
+subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+print("TAP version 13", flush=True)
+time.sleep(30)
+"""
+        started = time.monotonic()
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(script)):
+            options = InsoCollectionOptions(working_dir="/path", execution_timeout=1)
+            report = runner.run_collection(options)
+
+        assert report.timed_out is True
+        assert time.monotonic() - started < 15
+
+    def test_collection_stall_kills_process(self, runner):
+        script = """
+import time
+print("[log] Running request: Slow endpoint req_slow", flush=True)
+time.sleep(30)
+"""
+        started = time.monotonic()
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(script)):
+            options = InsoCollectionOptions(
+                working_dir="/path", execution_timeout=60, stall_timeout=1
+            )
+            report = runner.run_collection(options)
+
+        assert time.monotonic() - started < 15
+        assert report.stalled is True
+        assert report.timed_out is False
+        assert report.failed_count == 1
+        assert report.results[0].description == (
+            "Inso CLI Error: No output for 1 seconds while running 'Slow endpoint'"
+        )
+
+    def test_collection_stall_fails_in_flight_test(self, runner):
+        script = """
+import time
+print("TAP version 13\\n1..3\\nok 1 - First", flush=True)
+time.sleep(30)
+"""
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(script)):
+            options = InsoCollectionOptions(
+                working_dir="/path", execution_timeout=60, stall_timeout=1
+            )
+            report = runner.run_collection(options)
+
+        assert report.stalled is True
+        assert [(r.id, r.status) for r in report.results] == [
+            (1, InsoStatus.PASS),
+            (2, InsoStatus.FAIL),
+            (3, InsoStatus.SKIP),
+        ]
+        assert report.results[1].description == "Inso CLI Error: No output for 1 seconds"
+        assert report.results[2].description == "Not run: no output for 1 seconds"
+
+    def test_collection_restarts_remaining_items_after_stall(self, runner):
+        script = """
+import time
+print("[log] Running request: First req_1", flush=True)
+print("[log] Running request: Second req_2", flush=True)
+time.sleep(30)
+"""
+        calls = []
+        real_spawn = _spawn_python(script)
+
+        def _popen(cmd, **kwargs):
+            calls.append(cmd)
+            if len(calls) == 1:
+                return real_spawn(cmd, **kwargs)
+            return _fake_process("1..3\nok 1 - First\nok 2 - Third\nok 3 - Fourth\n")
+
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_popen):
+            options = InsoCollectionOptions(
+                working_dir="/path",
+                item=["req_1", "req_2", "req_3", "req_4"],
+                stall_timeout=1,
+                restart_on_stall=True,
+            )
+            report = runner.run_collection(options)
+
+        restart_items = [calls[1][i + 1] for i, arg in enumerate(calls[1]) if arg == "--item"]
+        assert restart_items == ["req_1", "req_3", "req_4"]
+        assert report.stalled is True
+        assert [r.description for r in report.results] == [
+            "Inso CLI Error: No output for 1 seconds while running 'Second'",
+            "First",
+            "Third",
+            "Fourth",
+        ]
+
+    def test_collection_streams_results_to_callback(self):
+        seen = []
+        runner = InsoRunner(on_result=seen.append)
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(
+                "TAP version 13\n1..2\nok 1 - First\nnot ok 2 - Second\n"
+            )
+            report = runner.run_collection(InsoCollectionOptions(working_dir="/path"))
+
+        assert [r.description for r in seen] == ["First", "Second"]
+        assert seen == report.results
+
+    def test_collection_raw_output_includes_stderr(self, runner):
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(
+                "1..1\nok 1 - Test\n", stderr="warning: slow\n"
+            )
+            report = runner.run_collection(InsoCollectionOptions(working_dir="/path"))
+
+        assert report.raw_output == "1..1\nok 1 - Test\nwarning: slow\n"
+
+    def test_collection_cli_error_without_tap_output(self, runner):
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(
+                "", stderr="Error: No collection found\n", returncode=1
+            )
+            report = runner.run_collection(InsoCollectionOptions(working_dir="/path"))
+
+        assert report.results[0].status == InsoStatus.FAIL
+        assert "No collection found" in report.results[0].description
+
+    def test_collection_real_process_output_is_parsed(self, runner):
+        script = 'print("TAP version 13\\n1..1\\nok 1 - Live result", flush=True)'
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(script)):
+            report = runner.run_collection(InsoCollectionOptions(working_dir="/path"))
+
+        assert report.passed_count == 1
+        assert report.results[0].description == "Live result"
+
 
 class TestInsoRunnerTest:
     @pytest.fixture
@@ -212,17 +393,13 @@ class TestInsoRunnerTest:
 
     @pytest.fixture
     def mock_subprocess(self):
-        with patch('insomnia_run.runner.subprocess.run') as mock_run:
-            mock_result = MagicMock()
-            mock_result.stdout = """ok 1 Test Suite Test Name
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("""ok 1 Test Suite Test Name
 # tests 1
 # pass 1
 1..1
-"""
-            mock_result.stderr = ""
-            mock_result.returncode = 0
-            mock_run.return_value = mock_result
-            yield mock_run
+""")
+            yield mock_popen
 
     def test_minimal_test_command(self, runner, mock_subprocess):
         options = InsoTestOptions(working_dir="/path/to/insomnia")
@@ -330,20 +507,421 @@ class TestInsoRunnerTest:
 
         assert report.target_name == "Auth Tests"
 
-    def test_test_with_execution_timeout(self, runner, mock_subprocess):
-        options = InsoTestOptions(
-            working_dir="/path",
-            execution_timeout=456
-        )
-        runner.run_test(options)
-        mock_subprocess.assert_called_once()
-        _, kwargs = mock_subprocess.call_args
-        assert kwargs["timeout"] == 456
-
     def test_test_timeout_error_message(self, runner):
-        from subprocess import TimeoutExpired
-        with patch('insomnia_run.runner.subprocess.run', side_effect=TimeoutExpired(cmd='inso', timeout=88)):
-            options = InsoTestOptions(working_dir="/path", execution_timeout=88)
+        with patch('insomnia_run.runner.subprocess.Popen', side_effect=_spawn_python(_HANGING_SCRIPT)):
+            options = InsoTestOptions(working_dir="/path", execution_timeout=1)
             report = runner.run_test(options)
             assert f"{options.execution_timeout}" in report.raw_output
             assert any(f"{options.execution_timeout}" in r.description for r in report.results)
+
+
+class TestInsoRunnerSharded:
+    def test_shards_explicit_items_across_processes(self):
+        runner = InsoRunner()
+        outputs = iter([
+            "1..2\nok 1 - A\nok 2 - B\n",
+            "1..1\nnot ok 1 - C\n",
+        ])
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process(next(outputs))
+            options = InsoCollectionOptions(
+                working_dir="/path", item=["req_1", "req_2", "req_3"]
+            )
+            report = runner.run_collection_sharded(options, 2)
+
+        commands = [c[0][0] for c in mock_popen.call_args_list]
+        item_sets = sorted(
+            [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "--item"] for cmd in commands
+        )
+        assert item_sets == [["req_1", "req_3"], ["req_2"]]
+        assert report.total_tests == 3
+        assert report.failed_count == 1
+        assert sorted(r.id for r in report.results) == [1, 2, 3]
+
+    def test_discovers_items_from_workspace(self):
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process("1..1\nok 1 - A\n")
+            options = InsoCollectionOptions(working_dir=str(FIXTURES / "mixed_results_suite.yaml"))
+            report = runner.run_collection_sharded(options, 3)
+
+        assert mock_popen.call_count == 3
+        assert report.total_tests == 3
+
+    def test_discovers_items_from_selected_workspace(self, tmp_path):
+        (tmp_path / "a.yaml").write_text("meta:\n  id: wrk_a\n  - id: req_a1\n")
+        (tmp_path / "b.yaml").write_text(
+            "meta:\n  id: wrk_b\n  - id: req_b1\n  - id: req_b2\n"
+        )
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process("1..1\nok 1 - A\n")
+            options = InsoCollectionOptions(working_dir=str(tmp_path), identifier="wrk_b")
+            runner.run_collection_sharded(options, 2)
+
+        items = sorted(
+            cmd[i + 1]
+            for cmd in (c[0][0] for c in mock_popen.call_args_list)
+            for i, arg in enumerate(cmd)
+            if arg == "--item"
+        )
+        assert items == ["req_b1", "req_b2"]
+
+    def test_several_workspaces_need_identifier_or_items(self, tmp_path):
+        (tmp_path / "a.yaml").write_text("meta:\n  id: wrk_a\n  - id: req_a1\n")
+        (tmp_path / "b.yaml").write_text("meta:\n  id: wrk_b\n  - id: req_b1\n")
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            with pytest.raises(ValueError):
+                runner.run_collection_sharded(
+                    InsoCollectionOptions(working_dir=str(tmp_path)), 2
+                )
+
+        mock_popen.assert_not_called()
+
+    def test_single_group_runs_once(self):
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("1..1\nok 1 - A\n")
+            options = InsoCollectionOptions(working_dir="/missing")
+            runner.run_collection_sharded(options, 4)
+
+        mock_popen.assert_called_once()
+        assert "--item" not in mock_popen.call_args[0][0]
+
+    def test_records_timings_and_shard_summaries(self, tmp_path):
+        from insomnia_run.sharding import TimingStore
+
+        runner = InsoRunner()
+        timings = TimingStore(str(tmp_path / "timings.json"))
+        timings.update({"req_1": 5.0, "req_2": 1.0})
+        stdout = (
+            "[log] Running request: First req_1\n"
+            "[log] Running request: Second req_2\n"
+            "1..1\nok 1 - A\n"
+        )
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process(stdout)
+            options = InsoCollectionOptions(
+                working_dir="/path", item=["req_1", "req_2", "req_3"]
+            )
+            report = runner.run_collection_sharded(options, 2, timings=timings)
+
+        assert [s.index for s in report.shards] == [1, 2]
+        assert [s.item_count for s in report.shards] == [1, 2]
+        assert report.shards[0].estimated_time == pytest.approx(5.0)
+        saved = TimingStore.load(str(tmp_path / "timings.json")).durations
+        assert set(saved) == {"req_1", "req_2", "req_3"}
+
+
+class TestInsoRunnerKill:
+    def test_missing_process_group_falls_back_to_kill(self):
+        process = _fake_process("")
+
+        InsoRunner._kill(process)
+
+        process.kill.assert_called_once_with()
+
+
+class TestInsoRunnerRawOutput:
+    def test_large_output_is_bounded_and_spilled(self, tmp_path):
+        runner = InsoRunner(raw_output_limit=200, raw_output_dir=str(tmp_path))
+        noise = "".join(f"[log] noise line {i}\n" for i in range(200))
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(
+                "1..1\n" + noise + "ok 1 - Done\n", stderr="warning\n"
+            )
+            report = runner.run_collection(InsoCollectionOptions(working_dir="/path"))
+
+        assert report.passed_count == 1
+        assert len(report.raw_output) < 400
+        assert report.raw_output.endswith("ok 1 - Done\nwarning\n")
+        full = Path(report.raw_output_file.path).read_text()
+        assert full == "1..1\n" + noise + "ok 1 - Done\nwarning\n"
+        assert report.raw_output_file.size == len(full)
+
+
+class TestInsoRunnerRequestIds:
+    def test_results_are_mapped_to_declaring_requests(self):
+        runner = InsoRunner(resolve_request_ids=True)
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(
+                "1..2\nnot ok 1 - Status code is 404 (intentional failure)\nok 2 - Other\n"
+            )
+            options = InsoCollectionOptions(
+                working_dir=str(FIXTURES / "mixed_results_suite.yaml")
+            )
+            report = runner.run_collection(options)
+
+        assert report.results[0].request_id == "req_fail_001"
+        assert report.results[1].request_id is None
+
+    def test_workspace_is_not_scanned_unless_asked(self):
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen, patch(
+            'insomnia_run.runner.CollectionIndex.load'
+        ) as load:
+            mock_popen.return_value = _fake_process("1..1\nok 1 - Anything\n")
+            report = runner.run_collection(InsoCollectionOptions(working_dir="/path"))
+
+        load.assert_not_called()
+        assert report.results[0].request_id is None
+
+    def test_single_item_run_owns_all_results(self):
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("1..1\nok 1 - Anything\n")
+            options = InsoCollectionOptions(working_dir="/path", item=["fld_auth"])
+            report = runner.run_collection(options)
+
+        assert report.results[0].request_id == "fld_auth"
+
+
+class TestInsoRunnerCache:
+    def test_clean_run_is_served_from_cache(self, tmp_path):
+        from insomnia_run.cache import ResultCache
+
+        workspace = tmp_path / "ws.yaml"
+        workspace.write_text("id: req_1\n")
+        runner = InsoRunner(cache=ResultCache(str(tmp_path / "cache")))
+        runner._inso_version = "12.2.0"
+        options = InsoCollectionOptions(working_dir=str(workspace))
+
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process("1..1\nok 1 - A\n")
+            first = runner.run_collection(options)
+            second = runner.run_collection(options)
+
+        assert mock_popen.call_count == 1
+        assert first.from_cache is False
+        assert second.from_cache is True
+        assert second.passed_count == 1
+
+    def test_failed_run_is_not_cached(self, tmp_path):
+        from insomnia_run.cache import ResultCache
+
+        runner = InsoRunner(cache=ResultCache(str(tmp_path / "cache")))
+        runner._inso_version = "12.2.0"
+        options = InsoCollectionOptions(working_dir=str(tmp_path))
+
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process("1..1\nnot ok 1 - A\n")
+            runner.run_collection(options)
+            runner.run_collection(options)
+
+        assert mock_popen.call_count == 2
+
+
+class TestInsoRunnerDurations:
+    def test_every_result_gets_a_duration(self):
+        runner = InsoRunner()
+        stdout = "1..2\nok 1 - A\n  ---\n  duration_ms: 42\n  ...\nok 2 - B\n"
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(stdout)
+            report = runner.run_test(InsoTestOptions(working_dir="/path"))
+
+        assert report.results[0].duration_ms == pytest.approx(42)
+        assert report.results[1].duration_ms >= 0
+
+    def test_request_durations_take_precedence_over_tap_gaps(self):
+        from insomnia_run.models import InsoResult, InsoRunReport
+
+        from_request = InsoResult(
+            id=1, status=InsoStatus.PASS, description="A", request_id="req_1"
+        )
+        from_gap = InsoResult(id=2, status=InsoStatus.PASS, description="B")
+        from_diagnostic = InsoResult(
+            id=3, status=InsoStatus.PASS, description="C", request_id="req_1", duration_ms=7
+        )
+        report = InsoRunReport(
+            plan_end=3,
+            results=[from_request, from_gap, from_diagnostic],
+            request_durations={"req_1": 1.5},
+        )
+        from_request, from_gap, from_diagnostic = report.results
+
+        InsoRunner._apply_durations(report, [0.01, 0.25, 0.5])
+
+        assert from_request.duration_ms == pytest.approx(1500)
+        assert from_gap.duration_ms == pytest.approx(250)
+        assert from_diagnostic.duration_ms == pytest.approx(7)
+
+    def test_request_duration_is_split_across_its_results(self):
+        from insomnia_run.models import InsoResult, InsoRunReport
+
+        report = InsoRunReport(
+            plan_end=3,
+            results=[
+                InsoResult(
+                    id=test_id, status=InsoStatus.PASS, description=name, request_id=request_id
+                )
+                for test_id, name, request_id in [
+                    (1, "A", "req_1"),
+                    (2, "B", "req_1"),
+                    (3, "C", "req_2"),
+                ]
+            ],
+            request_durations={"req_1": 1.5, "req_2": 0.5},
+        )
+
+        InsoRunner._apply_durations(report, [0.0, 0.0, 0.0])
+
+        assert [r.duration_ms for r in report.results] == pytest.approx([750, 750, 500])
+        assert sum(r.duration_ms for r in report.results) == pytest.approx(2000)
+
+
+class TestInsoRunnerColumnarResults:
+    def test_results_are_stored_in_columns(self):
+        runner = InsoRunner(columnar_results=True)
+        stdout = "1..2\nok 1 - A\nnot ok 2 - B\n"
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(stdout)
+            report = runner.run_collection(
+                InsoCollectionOptions(working_dir="/path", item=["req_1"])
+            )
+
+        assert type(report.results).__name__ == "ColumnarResults"
+        assert report.failed_count == 1
+        assert [r.request_id for r in report.results] == ["req_1", "req_1"]
+        assert all(r.duration_ms is not None for r in report.results)
+
+
+class TestInsoRunnerIterations:
+    def test_iteration_results_are_aggregated(self, tmp_path):
+        runner = InsoRunner(iteration_log_dir=str(tmp_path))
+        stdout = (
+            "[log] Running request: Get user req_1\n"
+            "1..6\n"
+            "ok 1 - Status is 200\nok 2 - Has name\n"
+            "ok 3 - Status is 200\nnot ok 4 - Has name\n"
+            "ok 5 - Status is 200\nok 6 - Has name\n"
+        )
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process(stdout, returncode=1)
+            report = runner.run_collection(
+                InsoCollectionOptions(working_dir="/path", item=["req_1"], iteration_count=3)
+            )
+
+        assert [(r.id, r.status, r.description) for r in report.results] == [
+            (1, InsoStatus.PASS, "Status is 200"),
+            (2, InsoStatus.FAIL, "Has name"),
+        ]
+        assert [(s.runs, s.failed, s.first_failed_iteration) for s in report.iterations] == [
+            (3, 0, None),
+            (3, 1, 2),
+        ]
+        assert all(r.request_id == "req_1" for r in report.results)
+        (log,) = report.iteration_logs
+        assert Path(log).parent == tmp_path
+        assert len(Path(log).read_text().splitlines()) == 6
+
+    def test_single_iteration_is_not_aggregated(self):
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("1..1\nok 1 - A\n")
+            report = runner.run_collection(
+                InsoCollectionOptions(working_dir="/path", iteration_count=1)
+            )
+
+        assert report.iterations == []
+        assert report.iteration_logs == []
+
+
+class TestInsoRunnerDataSharded:
+    def test_data_rows_are_split_across_processes(self, tmp_path):
+        data = tmp_path / "rows.csv"
+        data.write_text("id\n1\n2\n3\n4\n")
+        outputs = {
+            "rows.1.csv": "1..2\nok 1 - Has name\nok 2 - Has name\n",
+            "rows.2.csv": "1..2\nok 1 - Has name\nnot ok 2 - Has name\n",
+        }
+
+        def spawn(cmd, **kwargs):
+            chunk = Path(cmd[cmd.index("--iteration-data") + 1])
+            assert chunk.read_text().splitlines()[0] == "id"
+            return _fake_process(outputs[chunk.name])
+
+        runner = InsoRunner(iteration_log_dir=str(tmp_path))
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = spawn
+            options = InsoCollectionOptions(
+                working_dir="/path",
+                item=["req_1"],
+                iteration_data=str(data),
+                iteration_count=4,
+            )
+            report = runner.run_collection_data_sharded(options, 2)
+
+        assert mock_popen.call_count == 2
+        for call in mock_popen.call_args_list:
+            assert "--iteration-count" not in call[0][0]
+        (summary,) = report.iterations
+        assert (summary.runs, summary.failed, summary.first_failed_iteration) == (4, 1, 4)
+        assert [s.item_count for s in report.shards] == [2, 2]
+        assert report.failed_count == 1
+
+    def test_unsplittable_data_runs_once(self, tmp_path):
+        runner = InsoRunner(iteration_log_dir=str(tmp_path))
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("1..1\nok 1 - A\n")
+            options = InsoCollectionOptions(
+                working_dir="/path", iteration_data="https://example.com/rows.csv"
+            )
+            runner.run_collection_data_sharded(options, 4)
+
+        mock_popen.assert_called_once()
+
+
+class TestInsoRunnerRetries:
+    FAILING = "1..2\nnot ok 1 - Status code is 404 (intentional failure)\nok 2 - Other\n"
+
+    def _options(self):
+        return InsoCollectionOptions(
+            working_dir=str(FIXTURES / "mixed_results_suite.yaml")
+        )
+
+    def test_failure_passing_on_retry_is_flaky(self):
+        runner = InsoRunner(resolve_request_ids=True)
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.side_effect = [
+                _fake_process(self.FAILING),
+                _fake_process("1..1\nok 1 - Status code is 404 (intentional failure)\n"),
+            ]
+            report = runner.run_collection(self._options())
+            report = runner.retry_failed(report, self._options(), retries=2)
+
+        retry_cmd = mock_popen.call_args_list[1][0][0]
+        assert [retry_cmd[i + 1] for i, arg in enumerate(retry_cmd) if arg == "--item"] == [
+            "req_fail_001"
+        ]
+        assert mock_popen.call_count == 2
+        assert report.failed_count == 0
+        assert report.results[0].status == InsoStatus.PASS
+        assert report.results[0].flaky is True
+        assert report.results[1].flaky is False
+        assert report.flaky_count == 1
+
+    def test_persistent_failure_is_retried_with_backoff(self):
+        runner = InsoRunner(resolve_request_ids=True)
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen, patch(
+            'insomnia_run.runner.time.sleep'
+        ) as mock_sleep:
+            mock_popen.side_effect = lambda cmd, **kwargs: _fake_process(
+                "1..1\nnot ok 1 - Status code is 404 (intentional failure)\n"
+            )
+            report = runner.run_collection(self._options())
+            report = runner.retry_failed(report, self._options(), retries=2, backoff=1.5)
+
+        assert mock_popen.call_count == 3
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [1.5, 3.0]
+        assert report.failed_count == 1
+        assert report.flaky_count == 0
+
+    def test_passing_run_is_not_retried(self):
+        runner = InsoRunner()
+        with patch('insomnia_run.runner.subprocess.Popen') as mock_popen:
+            mock_popen.return_value = _fake_process("1..1\nok 1 - Other\n")
+            report = runner.run_collection(self._options())
+            runner.retry_failed(report, self._options(), retries=3)
+
+        assert mock_popen.call_count == 1
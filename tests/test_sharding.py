@@ -0,0 +1,160 @@
+from insomnia_run.models import (
+    InsoResult,
+    InsoRunReport,
+    InsoStatus,
+    RawOutputFile,
+    RunType,
+)
+from insomnia_run.reporter import Reporter
+from insomnia_run.sharding import (
+    TimingStore,
+    balance_items,
+    merge_report_files,
+    merge_reports,
+    partition_items,
+)
+
+
+class TestPartitionItems:
+    def test_round_robin(self):
+        groups = partition_items(["a", "b", "c", "d", "e"], 2)
+        assert groups == [["a", "c", "e"], ["b", "d"]]
+
+    def test_more_shards_than_items(self):
+        assert partition_items(["a", "b"], 5) == [["a"], ["b"]]
+
+    def test_no_items(self):
+        assert partition_items([], 3) == []
+
+
+class TestMergeReports:
+    def test_renumbers_results_and_sums_plans(self):
+        first = InsoRunReport(
+            plan_end=2,
+            raw_output="shard one",
+            results=[
+                InsoResult(id=1, status=InsoStatus.PASS, description="A"),
+                InsoResult(id=2, status=InsoStatus.FAIL, description="B"),
+            ],
+        )
+        second = InsoRunReport(
+            plan_end=1,
+            raw_output="shard two",
+            results=[InsoResult(id=1, status=InsoStatus.PASS, description="C")],
+        )
+
+        merged = merge_reports(
+            [first, second], run_type=RunType.COLLECTION, target_name="API", label="Shard"
+        )
+
+        assert [r.id for r in merged.results] == [1, 2, 3]
+        assert [r.description for r in merged.results] == ["A", "B", "C"]
+        assert merged.plan_end == 3
+        assert merged.failed_count == 1
+        assert merged.target_name == "API"
+        assert "=== Shard 2/2 ===\nshard two" in merged.raw_output
+        assert first.results[0].id == 1
+
+    def test_keeps_raw_output_files_of_parts(self):
+        spilled = RawOutputFile(path="/tmp/two.log", size=9000, head_end=10, tail_start=8000)
+        first = InsoRunReport(plan_end=0)
+        second = InsoRunReport(plan_end=0, raw_output_file=spilled)
+
+        merged = merge_reports([first, second], label="Shard")
+
+        assert merged.raw_output_file is None
+        assert [(f.path, f.label) for f in merged.raw_output_files] == [
+            ("/tmp/two.log", "Shard 2/2")
+        ]
+        markdown = Reporter().generate_markdown(merged)
+        assert "- Full raw output of Shard 2/2: `/tmp/two.log` (9000 bytes)" in markdown
+
+
+class TestMergeReportFiles:
+    def _write(self, tmp_path, name, **fields):
+        path = tmp_path / name
+        path.write_text(InsoRunReport(**fields).model_dump_json())
+        return str(path)
+
+    def test_merges_files_with_sources(self, tmp_path):
+        staging = self._write(
+            tmp_path,
+            "staging.json",
+            plan_end=2,
+            target_name="API",
+            run_type=RunType.TEST,
+            results=[
+                InsoResult(id=1, status=InsoStatus.PASS, description="A"),
+                InsoResult(id=2, status=InsoStatus.FAIL, description="B"),
+            ],
+        )
+        production = self._write(
+            tmp_path,
+            "production.json",
+            plan_end=1,
+            target_name="API",
+            run_type=RunType.TEST,
+            raw_output="prod output",
+            results=[InsoResult(id=1, status=InsoStatus.SKIP, description="C")],
+        )
+
+        merged = merge_report_files([staging, production])
+
+        assert [r.id for r in merged.results] == [1, 2, 3]
+        assert merged.run_type == RunType.TEST
+        assert merged.target_name == "API"
+        assert "=== Source 2/2 ===\nprod output" in merged.raw_output
+        assert [(s.name, s.passed, s.failed, s.skipped) for s in merged.sources] == [
+            (staging, 1, 1, 0),
+            (production, 0, 0, 1),
+        ]
+
+    def test_mixed_sources_keep_defaults(self, tmp_path):
+        first = self._write(tmp_path, "a.json", plan_end=0, target_name="A")
+        second = self._write(
+            tmp_path, "b.json", plan_end=0, target_name="B", run_type=RunType.TEST
+        )
+
+        merged = merge_report_files([first, second])
+
+        assert merged.run_type == RunType.COLLECTION
+        assert merged.target_name is None
+        assert merge_report_files([first, second], target_name="All").target_name == "All"
+
+
+class TestBalanceItems:
+    def test_longest_processing_time_first(self):
+        durations = {"a": 10.0, "b": 7.0, "c": 6.0, "d": 4.0, "e": 3.0}
+        groups, loads = balance_items(list(durations), 2, durations)
+
+        assert groups == [["a", "d"], ["b", "c", "e"]]
+        assert loads == [14.0, 16.0]
+
+    def test_unknown_items_fill_smallest_groups(self):
+        groups, _ = balance_items(["slow", "x", "y", "z"], 2, {"slow": 30.0})
+
+        assert groups[0] == ["slow", "z"]
+        assert groups[1] == ["x", "y"]
+
+    def test_without_history_falls_back_to_equal_counts(self):
+        groups, loads = balance_items(["a", "b", "c"], 2, {})
+
+        assert groups == [["a", "c"], ["b"]]
+        assert loads == [0.0, 0.0]
+
+
+class TestTimingStore:
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "nested" / "timings.json"
+        store = TimingStore.load(str(path))
+        assert store.durations == {}
+
+        store.update({"req_1": 1.5})
+        store.save()
+
+        assert TimingStore.load(str(path)).durations == {"req_1": 1.5}
+
+    def test_corrupt_file_is_ignored(self, tmp_path):
+        path = tmp_path / "timings.json"
+        path.write_text("not json")
+        assert TimingStore.load(str(path)).durations == {}
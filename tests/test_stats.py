@@ -0,0 +1,13 @@
+from insomnia_run.stats import percentile
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        values = [10.0, 20.0, 30.0, 40.0]
+        assert percentile(values, 50) == 20.0
+        assert percentile(values, 95) == 40.0
+
+    def test_single_value(self):
+        assert percentile([5.0], 0) == 5.0
+        assert percentile([5.0], 100) == 5.0
+
@@ -0,0 +1,33 @@
+from insomnia_run.models import InsoResult, InsoStatus
+from insomnia_run.tree import ResultNode
+
+
+def _result(id, status, description, path=None):
+    return InsoResult(id=id, status=status, description=description, path=path or [])
+
+
+class TestResultNode:
+    def test_counts_are_aggregated_per_folder(self):
+        root = ResultNode.build(
+            [
+                _result(1, InsoStatus.PASS, "returns 201", ["Users", "Create"]),
+                _result(2, InsoStatus.FAIL, "has id", ["Users", "Create"]),
+                _result(3, InsoStatus.SKIP, "Users / List / is paged"),
+                _result(4, InsoStatus.PASS, "health check"),
+            ]
+        )
+
+        assert (root.passed, root.failed, root.skipped) == (2, 1, 1)
+        users = root.children["Users"]
+        assert (users.passed, users.failed, users.skipped, users.total) == (1, 1, 1, 3)
+        assert users.children["Create"].failed == 1
+        assert users.children["List"].skipped == 1
+        assert [r.description for r in root.results] == ["health check"]
+
+    def test_split_description(self):
+        result = _result(1, InsoStatus.PASS, "Create / returns 201", ["Users"])
+
+        assert ResultNode.split_description(result) == (
+            ["Users", "Create"],
+            "returns 201",
+        )
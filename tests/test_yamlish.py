@@ -0,0 +1,36 @@
+from insomnia_run import yamlish
+
+
+class TestYamlishLoad:
+    def test_plain_and_quoted_scalars(self):
+        values = yamlish.load(
+            "  ---\n"
+            "  message: expected 200 to equal 404\n"
+            "  expected: '404'\n"
+            '  actual: "200\\tOK"\n'
+            "  ...\n"
+        )
+        assert values == {
+            "message": "expected 200 to equal 404",
+            "expected": "404",
+            "actual": "200\tOK",
+        }
+
+    def test_block_scalars(self):
+        values = yamlish.load(
+            "    stack: |-\n"
+            "      AssertionError: boom\n"
+            "        at test.js:1\n"
+            "    note: >\n"
+            "      folded\n"
+            "      text\n"
+        )
+        assert values["stack"] == "AssertionError: boom\n  at test.js:1"
+        assert values["note"] == "folded text"
+
+    def test_nested_mapping_is_returned_as_text(self):
+        values = yamlish.load("at:\n  file: test.js\n  line: 3\nseverity: fail\n")
+        assert values == {"at": "file: test.js\nline: 3", "severity": "fail"}
+
+    def test_empty(self):
+        assert yamlish.load("  ---\n  ...\n") == {}